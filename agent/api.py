@@ -1,108 +1,417 @@
 from __future__ import annotations
 
-import os
-from fastapi import FastAPI, HTTPException
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, AsyncIterator, Optional
 
-from agent.config import get_settings
-from agent.llm import OllamaClient
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from agent.config import Settings, get_settings
+from agent.metrics import (
+    HTTP_REQUEST_SECONDS,
+    JOB_QUEUE_DEPTH,
+    JOBS_RUNNING,
+    LLM_IN_FLIGHT,
+    LLM_WAITING,
+    REGISTRY,
+)
 from agent.models import (
+    EnvironmentName,
     JobApproveRequest,
+    JobBatchCreateRequest,
+    JobBatchResponse,
     JobCreateRequest,
     JobEvent,
     JobReportResponse,
     JobResponse,
+    JobStatus,
+    OutputStream,
+    OutputUnit,
+    RiskClassificationResult,
+    RiskClassifyRequest,
+    RiskClassifyResponse,
+    RiskPatternMatch,
     SessionCreateRequest,
     SessionMessageRequest,
     SessionMessageResponse,
     SessionResponse,
+    ToolOutputPage,
 )
 from agent.orchestrator import AgentOrchestrator
-from agent.policy import PolicyEngine
-from agent.store import InMemoryStore
-
-
-settings = get_settings()
-policy_engine = PolicyEngine.from_file(settings.policy_path)
-store = InMemoryStore()
-llm = OllamaClient(
-    base_url=settings.ollama_base_url,
-    model=settings.ollama_model,
-    timeout_seconds=settings.ollama_timeout_seconds,
-    api_key=os.getenv("OLLAMA_API_KEY"),
-)
-orchestrator = AgentOrchestrator(
-    settings=settings,
-    policy=policy_engine,
-    store=store,
-    llm=llm,
-)
+from agent.profiler import ProfilerBusyError, SamplingProfiler
+from agent.runtime import AgentRuntime, build_runtime
+from agent.store import JobRecord, _thaw
+
+
+def get_runtime(request: Request) -> AgentRuntime:
+    return request.app.state.runtime
+
+
+def get_profiler(request: Request) -> SamplingProfiler:
+    return request.app.state.profiler
+
+
+Runtime = Annotated[AgentRuntime, Depends(get_runtime)]
+Profiler = Annotated[SamplingProfiler, Depends(get_profiler)]
+
+router = APIRouter()
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or get_settings()
+    runtime = build_runtime(settings)
+    orchestrator, llm = runtime.orchestrator, runtime.llm
+
+    JOB_QUEUE_DEPTH.set_function(lambda: orchestrator.scheduler.stats()["queue_depth"])
+    JOBS_RUNNING.set_function(lambda: orchestrator.scheduler.stats()["running"])
+    LLM_IN_FLIGHT.set_function(lambda: llm.stats()["queue"]["in_flight"])
+    LLM_WAITING.set_function(lambda: llm.stats()["queue"]["waiting"])
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await runtime.start()
+        try:
+            yield
+        finally:
+            await runtime.stop()
+
+    app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
+    app.state.runtime = runtime
+    app.state.profiler = SamplingProfiler(max_seconds=settings.profiler_max_seconds)
+    app.middleware("http")(record_request_latency)
+    app.include_router(router)
+    return app
+
+
+async def record_request_latency(request: Request, call_next: Any) -> Response:
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            status,
+        )
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
-@app.get("/health")
+
+@router.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/agent/sessions", response_model=SessionResponse)
-async def create_session(request: SessionCreateRequest) -> SessionResponse:
-    session = store.create_session(request.user_id, request.metadata)
-    return SessionResponse(**session)
+@router.get("/agent/admin/profile", response_class=PlainTextResponse)
+async def collect_profile(
+    runtime: Runtime,
+    profiler: Profiler,
+    seconds: float = Query(default=5.0, gt=0),
+    interval_ms: float = Query(default=5.0, ge=1),
+    include_idle: bool = False,
+) -> PlainTextResponse:
+    if not runtime.settings.profiler_enabled:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    try:
+        profile = await asyncio.to_thread(
+            profiler.run, seconds, interval_ms / 1000, include_idle
+        )
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={
+            "X-Profile-Samples": str(profile.samples),
+            "X-Profile-Duration-Seconds": str(profile.duration_seconds),
+        },
+    )
+
+
+@router.get("/agent/llm/stats")
+async def llm_stats(runtime: Runtime) -> dict[str, Any]:
+    return runtime.llm.stats()
+
+
+@router.get("/agent/policy/stats")
+async def policy_stats(runtime: Runtime) -> dict[str, Any]:
+    return runtime.policy.stats()
+
+
+@router.post("/agent/risk/classify", response_model=RiskClassifyResponse)
+async def classify_risk(runtime: Runtime, request: RiskClassifyRequest) -> RiskClassifyResponse:
+    classifications = runtime.policy.classify_risk_many(request.texts)
+    return RiskClassifyResponse(
+        results=[
+            RiskClassificationResult(
+                risk_level=classification.risk_level,
+                matches=[
+                    RiskPatternMatch(pattern=match.pattern, risk_level=match.risk_level)
+                    for match in classification.matches
+                ],
+            )
+            for classification in classifications
+        ]
+    )
+
+
+@router.get("/agent/scheduler/stats")
+async def scheduler_stats(runtime: Runtime) -> dict[str, Any]:
+    return {
+        "execution": runtime.settings.job_execution,
+        **runtime.orchestrator.scheduler.stats(),
+    }
+
+
+@router.get("/agent/diagnostics/cache/stats")
+async def diagnostics_cache_stats(runtime: Runtime) -> dict[str, Any]:
+    cache = runtime.orchestrator.diagnostics_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/agent/k8s/cache/stats")
+async def k8s_cache_stats(runtime: Runtime) -> dict[str, Any]:
+    if runtime.cluster_state is None:
+        return {"enabled": False}
+    return {"enabled": True, **runtime.cluster_state.stats()}
+
+
+@router.get("/agent/diagnostics/baselines/stats")
+async def diagnostics_baseline_stats(runtime: Runtime) -> dict[str, Any]:
+    baselines = runtime.orchestrator.diagnostic_baselines
+    if baselines is None:
+        return {"enabled": False}
+    return {"enabled": True, **baselines.stats()}
+
 
+@router.get("/agent/sessions/context/stats")
+async def session_context_stats(runtime: Runtime) -> dict[str, Any]:
+    return runtime.orchestrator.context.stats()
 
-@app.post("/agent/sessions/{session_id}/messages", response_model=SessionMessageResponse)
-async def send_message(session_id: str, request: SessionMessageRequest) -> SessionMessageResponse:
+
+@router.post("/agent/sessions", response_model=SessionResponse)
+async def create_session(runtime: Runtime, request: SessionCreateRequest) -> SessionResponse:
+    session = runtime.store.create_session(request.user_id, request.metadata)
+    return SessionResponse(
+        session_id=session.session_id,
+        created_at=session.created_at,
+        user_id=session.user_id,
+        metadata=_thaw(session.metadata),
+    )
+
+
+@router.post("/agent/sessions/{session_id}/messages", response_model=SessionMessageResponse)
+async def send_message(
+    runtime: Runtime, session_id: str, request: SessionMessageRequest
+) -> SessionMessageResponse:
     try:
-        return await orchestrator.handle_message(session_id, request)
+        return await runtime.orchestrator.handle_message(session_id, request)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
-@app.post("/agent/jobs", response_model=JobResponse)
-async def create_job(request: JobCreateRequest) -> JobResponse:
+@router.post("/agent/sessions/{session_id}/messages/stream")
+async def stream_message(
+    runtime: Runtime, session_id: str, request: SessionMessageRequest
+) -> StreamingResponse:
     try:
-        return await orchestrator.create_job(request)
+        events = runtime.orchestrator.stream_message(session_id, request)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
-@app.post("/agent/jobs/{job_id}/approve", response_model=JobResponse)
-async def approve_job(job_id: str, request: JobApproveRequest) -> JobResponse:
+async def _sse_stream(events: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    async for event in events:
+        yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+@router.post("/agent/jobs", response_model=JobResponse)
+async def create_job(runtime: Runtime, request: JobCreateRequest) -> JobResponse:
     try:
-        return await orchestrator.approve_job(job_id, request)
+        return await runtime.orchestrator.create_job(request)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
-@app.get("/agent/jobs/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str) -> JobResponse:
-    job = store.get_job(job_id)
+@router.post("/agent/jobs/batch", response_model=JobBatchResponse)
+async def create_jobs(runtime: Runtime, request: JobBatchCreateRequest) -> JobBatchResponse:
+    return await runtime.orchestrator.create_jobs(request.jobs)
+
+
+@router.post("/agent/jobs/{job_id}/approve", response_model=JobResponse)
+async def approve_job(runtime: Runtime, job_id: str, request: JobApproveRequest) -> JobResponse:
+    try:
+        return await runtime.orchestrator.approve_job(job_id, request)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@router.get("/agent/jobs", response_model=list[JobResponse])
+async def list_jobs(
+    runtime: Runtime,
+    status: Optional[JobStatus] = None,
+    environment: Optional[EnvironmentName] = None,
+    session_id: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> list[JobResponse]:
+    jobs = runtime.store.list_jobs(
+        status=status, environment=environment, session_id=session_id, limit=limit
+    )
+    return [_job_response(job) for job in jobs]
+
+
+@router.get("/agent/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    runtime: Runtime,
+    job_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Any:
+    job = runtime.store.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    etag = _job_etag(job, "job")
+    if _not_modified(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return _job_response(job)
+
+
+def _job_etag(job: JobRecord, *variant: str) -> str:
+    key = "\0".join((job.job_id, job.updated_at, *variant))
+    return f'"{hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def _not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _job_response(job: JobRecord) -> JobResponse:
     return JobResponse(
-        job_id=job["job_id"],
-        status=job["status"],
-        risk_level=job["risk_level"],
-        required_approvals=job["required_approvals"],
-        environment=job["environment"],
-        created_at=job["created_at"],
-        updated_at=job["updated_at"],
+        job_id=job.job_id,
+        status=job.status,
+        risk_level=job.risk_level,
+        required_approvals=job.required_approvals,
+        environment=job.environment,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
     )
 
 
-@app.get("/agent/jobs/{job_id}/events", response_model=list[JobEvent])
-async def get_job_events(job_id: str) -> list[JobEvent]:
+@router.get("/agent/jobs/{job_id}/events", response_model=list[JobEvent])
+async def get_job_events(
+    runtime: Runtime,
+    job_id: str,
+    since: int = Query(default=0, ge=0),
+    wait: float = Query(default=0.0, ge=0.0, le=60.0),
+) -> list[JobEvent]:
+    orchestrator = runtime.orchestrator
     try:
-        events = orchestrator.get_job_events(job_id)
+        events = orchestrator.get_job_events(job_id, since)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return [JobEvent(**event) for event in events]
+    if not events and wait > 0:
+        events = await orchestrator.wait_for_job_events(job_id, since, wait)
+    return [JobEvent(**event.to_dict()) for event in events]
+
+
+@router.get("/agent/jobs/{job_id}/events/stream")
+async def stream_job_events(
+    runtime: Runtime,
+    job_id: str,
+    since: int = Query(default=0, ge=0),
+    last_event_id: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    if not runtime.store.get_job(job_id):
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if last_event_id and last_event_id.isdigit():
+        since = max(since, int(last_event_id))
+    return StreamingResponse(
+        _job_event_stream(runtime.orchestrator, job_id, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _job_event_stream(
+    orchestrator: AgentOrchestrator, job_id: str, since: int
+) -> AsyncIterator[str]:
+    async for events in orchestrator.watch_job_events(job_id, since):
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        for event in events:
+            yield (
+                f"id: {event.seq}\nevent: {event.event_type}\n"
+                f"data: {json.dumps(event.to_dict())}\n\n"
+            )
+    yield "event: end\ndata: {}\n\n"
 
 
-@app.get("/agent/jobs/{job_id}/report", response_model=JobReportResponse)
-async def get_job_report(job_id: str) -> JobReportResponse:
+@router.get("/agent/jobs/{job_id}/report", response_model=JobReportResponse)
+async def get_job_report(
+    runtime: Runtime,
+    job_id: str,
+    response: Response,
+    include_output: bool = Query(default=True),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Any:
+    job = runtime.store.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    etag = _job_etag(job, "report", "full" if include_output else "summary")
+    if _not_modified(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    try:
+        report = runtime.orchestrator.get_job_report(job_id, include_output=include_output)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    response.headers["ETag"] = etag
+    return report
+
+
+@router.get("/agent/jobs/{job_id}/report/diagnostics/{index}/output", response_model=ToolOutputPage)
+async def get_job_output(
+    runtime: Runtime,
+    job_id: str,
+    index: int,
+    response: Response,
+    stream: OutputStream = Query(default="stdout"),
+    unit: OutputUnit = Query(default="bytes"),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=65536, ge=1, le=1048576),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Any:
+    job = runtime.store.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    etag = _job_etag(job, "output", str(index), stream, unit, str(offset), str(limit))
+    if _not_modified(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     try:
-        return orchestrator.get_job_report(job_id)
+        page = runtime.orchestrator.get_job_output(job_id, index, stream, unit, offset, limit)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    response.headers["ETag"] = etag
+    return page
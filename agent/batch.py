@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+from uuid import uuid4
+
+from agent.models import ToolResult
+
+
+ResultCallback = Callable[[ToolResult], None]
+SnapshotRunner = Callable[[Optional[ResultCallback]], Awaitable[List[ToolResult]]]
+
+
+class DiagnosticsSnapshot:
+    def __init__(self, max_age_seconds: float = 120.0) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._task: Optional[asyncio.Future[List[ToolResult]]] = None
+        self._taken_at = 0.0
+
+    def _reusable(self, task: asyncio.Future[List[ToolResult]]) -> bool:
+        if not task.done():
+            return True
+        if task.cancelled() or task.exception() is not None:
+            return False
+        return time.monotonic() - self._taken_at <= self.max_age_seconds
+
+    async def get(
+        self, runner: SnapshotRunner, on_result: Optional[ResultCallback] = None
+    ) -> List[ToolResult]:
+        task = self._task
+        if task is None or not self._reusable(task):
+            self._taken_at = time.monotonic()
+            task = self._task = asyncio.ensure_future(runner(on_result))
+            return await asyncio.shield(task)
+
+        results = await asyncio.shield(task)
+        age = round(time.monotonic() - self._taken_at, 3)
+        shared = [
+            result.model_copy(
+                update={
+                    "cached": True,
+                    "cache_age_seconds": age,
+                    "stdout_spill_path": None,
+                    "stderr_spill_path": None,
+                }
+            )
+            for result in results
+        ]
+        if on_result is not None:
+            for result in shared:
+                on_result(result)
+        return shared
+
+
+class JobBatch:
+    def __init__(self, summary_concurrency: int = 2, snapshot_max_age_seconds: float = 120.0) -> None:
+        self.batch_id = str(uuid4())
+        self.summary_slots = asyncio.Semaphore(max(1, summary_concurrency))
+        self.snapshot_max_age_seconds = snapshot_max_age_seconds
+        self.created_at = time.monotonic()
+        self._snapshots: Dict[Hashable, DiagnosticsSnapshot] = {}
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.created_at > self.snapshot_max_age_seconds
+
+    def snapshot(self, key: Hashable) -> DiagnosticsSnapshot:
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            snapshot = self._snapshots[key] = DiagnosticsSnapshot(self.snapshot_max_age_seconds)
+        return snapshot
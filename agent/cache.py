@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from agent.models import ToolResult
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    result: ToolResult
+    created_at: float
+    expires_at: float
+
+
+class DiagnosticsCache:
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future[_CacheEntry]] = {}
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    async def get_or_run(
+        self,
+        key: Hashable,
+        ttl_seconds: float,
+        runner: Callable[[], Awaitable[ToolResult]],
+        min_created_at: Optional[float] = None,
+    ) -> ToolResult:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            elif min_created_at is None or entry.created_at >= min_created_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._annotate(entry, now)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+            entry = await asyncio.shield(task)
+            return self._annotate(entry, time.monotonic())
+
+        self._stats["misses"] += 1
+        task = asyncio.ensure_future(self._run(key, ttl_seconds, runner))
+        self._in_flight[key] = task
+        entry = await asyncio.shield(task)
+        return entry.result
+
+    async def _run(
+        self, key: Hashable, ttl_seconds: float, runner: Callable[[], Awaitable[ToolResult]]
+    ) -> _CacheEntry:
+        try:
+            result = await runner()
+        finally:
+            self._in_flight.pop(key, None)
+        created_at = time.monotonic()
+        entry = _CacheEntry(result=result, created_at=created_at, expires_at=created_at + ttl_seconds)
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key: Hashable, entry: _CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _annotate(entry: _CacheEntry, now: float) -> ToolResult:
+        # Spill files belong to the job that ran the command and are pruned with it.
+        return entry.result.model_copy(
+            update={
+                "cached": True,
+                "cache_age_seconds": round(now - entry.created_at, 3),
+                "stdout_spill_path": None,
+                "stderr_spill_path": None,
+            }
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, **self._stats}
+
+
+@dataclass(frozen=True)
+class _ResponseEntry:
+    content: str
+    created_at: float
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 300.0,
+        disk_dir: Optional[Path] = None,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        if disk_dir is not None:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, _ResponseEntry]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future[Optional[str]]] = {}
+        self._disk_writes: Set[asyncio.Future[None]] = set()
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "bypassed": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float) -> str:
+        raw = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def record_bypass(self) -> None:
+        self._stats["bypassed"] += 1
+
+    async def lookup_or_begin(self, key: str) -> Optional[str]:
+        while True:
+            content = self._memory_get(key)
+            if content is not None:
+                self._stats["hits"] += 1
+                return content
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            content = await asyncio.shield(pending)
+            if content is not None:
+                self._stats["coalesced"] += 1
+                return content
+
+        self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            content = await self._disk_get(key)
+        except BaseException:
+            self.finish(key, None)
+            raise
+        if content is not None:
+            self._stats["disk_hits"] += 1
+            self.finish(key, content, persist=False)
+            return content
+
+        self._stats["misses"] += 1
+        return None
+
+    def finish(self, key: str, content: Optional[str], persist: bool = True) -> None:
+        pending = self._in_flight.pop(key, None)
+        if content is not None:
+            self._memory_put(key, _ResponseEntry(content=content, created_at=time.time()))
+            if persist:
+                self._disk_put(key, content)
+        if pending is not None and not pending.done():
+            pending.set_result(content)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.content
+
+    def _memory_put(self, key: str, entry: _ResponseEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / f"{key}.json"
+
+    async def _disk_get(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        entry = await asyncio.to_thread(self._read_disk_entry, path)
+        if entry is None or time.time() - entry.created_at > self.ttl_seconds:
+            return None
+        self._memory_put(key, entry)
+        return entry.content
+
+    @staticmethod
+    def _read_disk_entry(path: Path) -> Optional[_ResponseEntry]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return _ResponseEntry(content=data["content"], created_at=float(data["created_at"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _disk_put(self, key: str, content: str) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        created_at = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_disk_entry(path, content, created_at)
+            return
+        write = asyncio.ensure_future(
+            asyncio.to_thread(self._write_disk_entry, path, content, created_at), loop=loop
+        )
+        self._disk_writes.add(write)
+        write.add_done_callback(self._disk_writes.discard)
+
+    @staticmethod
+    def _write_disk_entry(path: Path, content: str, created_at: float) -> None:
+        tmp_path: Optional[Path] = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+            ) as handle:
+                tmp_path = Path(handle.name)
+                json.dump({"created_at": created_at, "content": content}, handle)
+            tmp_path.replace(path)
+        except OSError:
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+
+    async def drain(self) -> None:
+        if self._disk_writes:
+            await asyncio.gather(*list(self._disk_writes), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["coalesced"]
+        total = lookups + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": self.disk_dir is not None,
+            "in_flight": len(self._in_flight),
+            "hit_ratio": round(lookups / total, 4) if total else 0.0,
+            **self._stats,
+        }
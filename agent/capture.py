@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+import shutil
+import tempfile
+import time
+
+
+DEFAULT_OUTPUT_LIMIT_BYTES = 64 * 1024
+
+
+class BoundedCapture:
+    def __init__(self, limit_bytes: int = DEFAULT_OUTPUT_LIMIT_BYTES) -> None:
+        limit_bytes = max(2, limit_bytes)
+        self.head_limit = limit_bytes // 2
+        self.tail_limit = limit_bytes - self.head_limit
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total_bytes = 0
+        self._newlines = 0
+        self._ends_with_newline = False
+        self._spill: Optional[BinaryIO] = None
+        self.spill_path: Optional[str] = None
+
+    def spill_to(self, directory: Path, prefix: str, suffix: str) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self._spill = tempfile.NamedTemporaryFile(
+            dir=directory, prefix=prefix, suffix=suffix, delete=False
+        )
+        self.spill_path = self._spill.name
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.total_bytes += len(chunk)
+        self._newlines += chunk.count(b"\n")
+        self._ends_with_newline = chunk.endswith(b"\n")
+        if self._spill is not None:
+            self._spill.write(chunk)
+
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self._tail += chunk
+            overflow = len(self._tail) - self.tail_limit
+            if overflow > 0:
+                del self._tail[:overflow]
+
+    def close(self) -> None:
+        if self._spill is None:
+            return
+        self._spill.close()
+        self._spill = None
+        if not self.truncated and self.spill_path:
+            Path(self.spill_path).unlink(missing_ok=True)
+            self.spill_path = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > len(self._head) + len(self._tail)
+
+    @property
+    def total_lines(self) -> int:
+        if not self.total_bytes:
+            return 0
+        return self._newlines + (0 if self._ends_with_newline else 1)
+
+    def text(self) -> str:
+        if not self.truncated:
+            return (bytes(self._head) + bytes(self._tail)).decode("utf-8", errors="replace")
+
+        head = bytes(self._head)
+        cut = head.rfind(b"\n")
+        if cut >= 0:
+            head = head[: cut + 1]
+        tail = bytes(self._tail)
+        cut = tail.find(b"\n")
+        if 0 <= cut < len(tail) - 1:
+            tail = tail[cut + 1 :]
+        dropped = self.total_bytes - len(head) - len(tail)
+        return (
+            head.decode("utf-8", errors="replace")
+            + f"... [{dropped} bytes truncated] ...\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+
+def prune_spill_dirs(root: Path, max_age_seconds: float) -> int:
+    cutoff = time.time() - max_age_seconds
+    try:
+        entries = list(root.iterdir())
+    except OSError:
+        return 0
+    removed = 0
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def slice_output(
+    text: str, unit: str, offset: int, limit: int
+) -> Tuple[str, int, Optional[int]]:
+    if unit == "lines":
+        lines = text.splitlines(keepends=True)
+        end = min(len(lines), offset + limit)
+        page = "".join(lines[offset:end])
+        return page, len(lines), end if end < len(lines) else None
+
+    data = text.encode("utf-8")
+    start = min(offset, len(data))
+    while start < len(data) and data[start] & 0xC0 == 0x80:
+        start += 1
+    end = min(len(data), start + limit)
+    while start < end < len(data) and data[end] & 0xC0 == 0x80:
+        end -= 1
+    if end == start < len(data):
+        end += 1
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end += 1
+    return data[start:end].decode("utf-8"), len(data), end if end < len(data) else None
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 import os
 
 
@@ -9,24 +10,145 @@ import os
 class Settings:
     app_name: str
     policy_path: Path
+    policy_reload_interval_seconds: float
     repo_root: Path
     ollama_base_url: str
+    ollama_base_urls: tuple[str, ...]
     ollama_model: str
     ollama_timeout_seconds: float
     command_timeout_seconds: int
+    ollama_max_connections: int
+    ollama_max_keepalive_connections: int
+    ollama_keepalive_expiry_seconds: float
+    ollama_http2: bool
+    ollama_max_concurrency: int
+    job_workers: int
+    job_drain_timeout_seconds: float
+    job_execution: str
+    executor_poll_interval_seconds: float
+    batch_summary_concurrency: int
+    batch_snapshot_max_age_seconds: float
+    diagnostics_cache_enabled: bool
+    diagnostics_cache_max_entries: int
+    diagnostics_delta_enabled: bool
+    diagnostics_baseline_max_age_seconds: float
+    command_output_limit_bytes: int
+    command_output_spill_dir: Optional[Path]
+    command_output_spill_retention_seconds: float
+    k8s_cache_enabled: bool
+    k8s_api_url: str
+    k8s_ca_file: Optional[Path]
+    llm_cache_enabled: bool
+    llm_cache_max_entries: int
+    llm_cache_ttl_seconds: float
+    llm_cache_dir: Optional[Path]
+    llm_circuit_failure_threshold: int
+    llm_circuit_cooldown_seconds: float
+    llm_health_check_interval_seconds: float
+    llm_hedge_after_seconds: Optional[float]
+    store_backend: str
+    store_path: Path
+    store_event_batch_size: int
+    store_output_compress_min_bytes: int
+    context_budget_tokens: int
+    context_summary_max_tokens: int
+    session_max_messages: int
+    job_timings_enabled: bool
+    profiler_enabled: bool
+    profiler_max_seconds: float
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
 def get_settings() -> Settings:
+    base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1").rstrip("/")
+    base_urls = tuple(
+        url.strip().rstrip("/")
+        for url in os.getenv("OLLAMA_BASE_URLS", "").split(",")
+        if url.strip()
+    ) or (base_url,)
     return Settings(
         app_name=os.getenv("AGENT_APP_NAME", "Karl AI Agent MVP"),
         policy_path=Path(
             os.getenv("AGENT_POLICY_PATH", "docs/ai-agent-policy.yaml")
         ).resolve(),
-        repo_root=Path(os.getenv("AGENT_REPO_ROOT", os.getcwd())).resolve(),
-        ollama_base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1").rstrip(
-            "/"
+        policy_reload_interval_seconds=float(
+            os.getenv("AGENT_POLICY_RELOAD_INTERVAL_SECONDS", "5")
         ),
+        repo_root=Path(os.getenv("AGENT_REPO_ROOT", os.getcwd())).resolve(),
+        ollama_base_url=base_urls[0],
+        ollama_base_urls=base_urls,
         ollama_model=os.getenv("OLLAMA_MODEL", "gpt-oss:20b"),
         ollama_timeout_seconds=float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "60")),
         command_timeout_seconds=int(os.getenv("AGENT_COMMAND_TIMEOUT_SECONDS", "30")),
+        ollama_max_connections=int(os.getenv("OLLAMA_MAX_CONNECTIONS", "20")),
+        ollama_max_keepalive_connections=int(os.getenv("OLLAMA_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        ollama_keepalive_expiry_seconds=float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY_SECONDS", "30")),
+        ollama_http2=_env_flag("OLLAMA_HTTP2", False),
+        ollama_max_concurrency=int(os.getenv("OLLAMA_MAX_CONCURRENCY", "8")),
+        job_workers=int(os.getenv("AGENT_JOB_WORKERS", "4")),
+        job_drain_timeout_seconds=float(os.getenv("AGENT_JOB_DRAIN_TIMEOUT_SECONDS", "30")),
+        job_execution=os.getenv("AGENT_JOB_EXECUTION", "inline").strip().lower(),
+        executor_poll_interval_seconds=float(
+            os.getenv("AGENT_EXECUTOR_POLL_INTERVAL_SECONDS", "0.1")
+        ),
+        batch_summary_concurrency=int(os.getenv("AGENT_BATCH_SUMMARY_CONCURRENCY", "2")),
+        batch_snapshot_max_age_seconds=float(
+            os.getenv("AGENT_BATCH_SNAPSHOT_MAX_AGE_SECONDS", "120")
+        ),
+        diagnostics_cache_enabled=_env_flag("AGENT_DIAGNOSTICS_CACHE_ENABLED", True),
+        diagnostics_cache_max_entries=int(os.getenv("AGENT_DIAGNOSTICS_CACHE_MAX_ENTRIES", "256")),
+        diagnostics_delta_enabled=_env_flag("AGENT_DIAGNOSTICS_DELTA_ENABLED", True),
+        diagnostics_baseline_max_age_seconds=float(
+            os.getenv("AGENT_DIAGNOSTICS_BASELINE_MAX_AGE_SECONDS", "900")
+        ),
+        command_output_limit_bytes=int(os.getenv("AGENT_COMMAND_OUTPUT_LIMIT_BYTES", "65536")),
+        command_output_spill_dir=(
+            Path(os.environ["AGENT_COMMAND_OUTPUT_SPILL_DIR"]).resolve()
+            if os.getenv("AGENT_COMMAND_OUTPUT_SPILL_DIR")
+            else None
+        ),
+        command_output_spill_retention_seconds=float(
+            os.getenv("AGENT_COMMAND_OUTPUT_SPILL_RETENTION_SECONDS", "3600")
+        ),
+        k8s_cache_enabled=_env_flag("AGENT_K8S_CACHE_ENABLED", False),
+        k8s_api_url=os.getenv("AGENT_K8S_API_URL", "http://127.0.0.1:8001"),
+        k8s_ca_file=(
+            Path(os.environ["AGENT_K8S_CA_FILE"]).resolve()
+            if os.getenv("AGENT_K8S_CA_FILE")
+            else None
+        ),
+        llm_cache_enabled=_env_flag("LLM_CACHE_ENABLED", False),
+        llm_cache_max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+        llm_cache_ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "300")),
+        llm_cache_dir=(
+            Path(os.environ["LLM_CACHE_DIR"]).resolve() if os.getenv("LLM_CACHE_DIR") else None
+        ),
+        llm_circuit_failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3")),
+        llm_circuit_cooldown_seconds=float(os.getenv("LLM_CIRCUIT_COOLDOWN_SECONDS", "30")),
+        llm_health_check_interval_seconds=float(
+            os.getenv("LLM_HEALTH_CHECK_INTERVAL_SECONDS", "15")
+        ),
+        llm_hedge_after_seconds=(
+            float(os.environ["LLM_HEDGE_AFTER_SECONDS"])
+            if os.getenv("LLM_HEDGE_AFTER_SECONDS")
+            else None
+        ),
+        store_backend=os.getenv("AGENT_STORE_BACKEND", "memory").strip().lower(),
+        store_path=Path(os.getenv("AGENT_STORE_PATH", "data/agent.sqlite3")).resolve(),
+        store_event_batch_size=int(os.getenv("AGENT_STORE_EVENT_BATCH_SIZE", "64")),
+        store_output_compress_min_bytes=int(
+            os.getenv("AGENT_STORE_OUTPUT_COMPRESS_MIN_BYTES", "4096")
+        ),
+        context_budget_tokens=int(os.getenv("AGENT_CONTEXT_BUDGET_TOKENS", "3000")),
+        context_summary_max_tokens=int(os.getenv("AGENT_CONTEXT_SUMMARY_MAX_TOKENS", "400")),
+        session_max_messages=int(os.getenv("AGENT_SESSION_MAX_MESSAGES", "40")),
+        job_timings_enabled=_env_flag("AGENT_JOB_TIMINGS_ENABLED", False),
+        profiler_enabled=_env_flag("AGENT_PROFILER_ENABLED", False),
+        profiler_max_seconds=float(os.getenv("AGENT_PROFILER_MAX_SECONDS", "60")),
     )
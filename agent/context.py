@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Set
+
+from agent.llm import OllamaClient
+from agent.store import MessageRecord, Store
+
+
+ROLLING_SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of an SRE/coding assistant conversation. Merge the "
+    "previous summary with the new turns. Keep decisions, environments, commands, errors "
+    "and open questions; drop pleasantries. Answer with the summary only."
+)
+MESSAGE_OVERHEAD_TOKENS = 4
+COMPACTION_TARGET_RATIO = 0.75
+MIN_WINDOW_MESSAGES = 2
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: MessageRecord) -> int:
+    return estimate_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass(frozen=True)
+class ConversationContext:
+    system_prompt: str
+    history: List[Dict[str, str]]
+    prompt_tokens: int
+    dropped_messages: int
+
+
+class ContextBuilder:
+    def __init__(
+        self,
+        store: Store,
+        llm: OllamaClient,
+        budget_tokens: int = 3000,
+        summary_max_tokens: int = 400,
+        max_stored_messages: int = 40,
+    ) -> None:
+        self.store = store
+        self.llm = llm
+        self.budget_tokens = max(1, budget_tokens)
+        self.summary_max_tokens = max(1, summary_max_tokens)
+        self.max_stored_messages = max(MIN_WINDOW_MESSAGES, max_stored_messages)
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._stats: Dict[str, int] = {
+            "builds": 0,
+            "compactions": 0,
+            "folded_messages": 0,
+            "summary_fallbacks": 0,
+        }
+
+    def build(self, session_id: str, system_prompt: str, user_message: str) -> ConversationContext:
+        session = self.store.get_session(session_id)
+        if session is None:
+            raise KeyError(f"Session not found: {session_id}")
+        if session.summary:
+            system_prompt = f"{system_prompt}\n\nConversation summary so far:\n{session.summary}"
+
+        remaining = (
+            self.budget_tokens - estimate_tokens(system_prompt) - estimate_tokens(user_message)
+        )
+        messages = self.store.get_session_messages(session_id)
+        start = len(messages)
+        while start > 0:
+            cost = message_tokens(messages[start - 1])
+            if cost > remaining:
+                break
+            remaining -= cost
+            start -= 1
+
+        self._stats["builds"] += 1
+        return ConversationContext(
+            system_prompt=system_prompt,
+            history=[
+                {"role": message.role, "content": message.content} for message in messages[start:]
+            ],
+            prompt_tokens=self.budget_tokens - remaining,
+            dropped_messages=start,
+        )
+
+    def schedule_compaction(self, session_id: str) -> None:
+        task = asyncio.create_task(self.compact(session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def compact(self, session_id: str) -> None:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        async with lock:
+            session = self.store.get_session(session_id)
+            if session is None:
+                return
+            messages = self.store.get_session_messages(session_id)
+            count = self._fold_count(messages)
+            if not count:
+                return
+            summary = await self._summarize(session.summary, messages[:count])
+            self.store.fold_session_messages(session_id, count, summary)
+            self._stats["compactions"] += 1
+            self._stats["folded_messages"] += count
+
+    def _fold_count(self, messages: Sequence[MessageRecord]) -> int:
+        window_budget = self.budget_tokens - self.summary_max_tokens
+        total = sum(message_tokens(message) for message in messages)
+        if total <= window_budget and len(messages) <= self.max_stored_messages:
+            return 0
+
+        target_tokens = int(window_budget * COMPACTION_TARGET_RATIO)
+        target_messages = max(
+            MIN_WINDOW_MESSAGES, int(self.max_stored_messages * COMPACTION_TARGET_RATIO)
+        )
+        count = 0
+        while len(messages) - count > MIN_WINDOW_MESSAGES and (
+            total > target_tokens or len(messages) - count > target_messages
+        ):
+            total -= message_tokens(messages[count])
+            count += 1
+        return count
+
+    async def _summarize(self, previous: str, messages: Sequence[MessageRecord]) -> str:
+        turns = "\n".join(f"{message.role}: {message.content}" for message in messages)
+        prompt = f"Previous summary:\n{previous or '(none)'}\n\nNew turns:\n{turns}"
+        summary = await self.llm.complete(ROLLING_SUMMARY_SYSTEM_PROMPT, prompt)
+        if not summary or not summary.strip():
+            self._stats["summary_fallbacks"] += 1
+            summary = self._extractive_summary(previous, messages)
+        return self._clip(summary.strip())
+
+    def _extractive_summary(self, previous: str, messages: Sequence[MessageRecord]) -> str:
+        lines = [previous] if previous else []
+        for message in messages:
+            first_line = message.content.strip().splitlines()[0] if message.content.strip() else ""
+            lines.append(f"- {message.role}: {first_line[:200]}")
+        return "\n".join(lines)
+
+    def _clip(self, summary: str) -> str:
+        limit = self.summary_max_tokens * 4
+        if len(summary) <= limit:
+            return summary
+        tail = summary[-limit:]
+        _, _, rest = tail.partition("\n")
+        return rest if rest.strip() else tail
+
+    async def aclose(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget_tokens": self.budget_tokens,
+            "summary_max_tokens": self.summary_max_tokens,
+            "max_stored_messages": self.max_stored_messages,
+            "pending_compactions": len(self._tasks),
+            **self._stats,
+        }
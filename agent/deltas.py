@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Optional
+from uuid import uuid4
+
+from agent.reducers import Reduction
+
+
+@dataclass(frozen=True)
+class BaselineSnapshot:
+    job_id: str
+    tools: Dict[str, Reduction]
+    snapshot_id: str = field(default_factory=lambda: str(uuid4()))
+    taken_at: float = field(default_factory=time.monotonic)
+    taken_at_utc: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    tool_taken_at: Dict[str, float] = field(default_factory=dict)
+
+    def reduction(self, command: str) -> Optional[Reduction]:
+        return self.tools.get(command)
+
+    def tool_age(self, command: str) -> float:
+        return time.monotonic() - self.tool_taken_at.get(command, self.taken_at)
+
+    def without_tools_older_than(self, max_age_seconds: float) -> "BaselineSnapshot":
+        tools = {
+            command: reduction
+            for command, reduction in self.tools.items()
+            if self.tool_age(command) <= max_age_seconds
+        }
+        return replace(
+            self,
+            tools=tools,
+            tool_taken_at={
+                command: self.tool_taken_at.get(command, self.taken_at) for command in tools
+            },
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "snapshot_id": self.snapshot_id,
+            "job_id": self.job_id,
+            "taken_at_utc": self.taken_at_utc,
+            "age_seconds": round(time.monotonic() - self.taken_at, 3),
+        }
+
+
+class DiagnosticsBaselines:
+    def __init__(self, max_entries: int = 64, max_age_seconds: float = 900.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.max_age_seconds = max_age_seconds
+        self._snapshots: "OrderedDict[Hashable, BaselineSnapshot]" = OrderedDict()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "expirations": 0, "stored": 0}
+
+    def get(self, key: Hashable) -> Optional[BaselineSnapshot]:
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            fresh = snapshot.without_tools_older_than(self.max_age_seconds)
+            if not fresh.tools:
+                del self._snapshots[key]
+                self._stats["expirations"] += 1
+                snapshot = None
+            elif len(fresh.tools) != len(snapshot.tools):
+                snapshot = self._snapshots[key] = fresh
+        self._stats["hits" if snapshot is not None else "misses"] += 1
+        return snapshot
+
+    def put(self, key: Hashable, snapshot: BaselineSnapshot) -> None:
+        previous = self._snapshots.get(key)
+        kept = (
+            previous.without_tools_older_than(self.max_age_seconds)
+            if previous is not None
+            else None
+        )
+        snapshot = replace(
+            snapshot,
+            tools={**(kept.tools if kept else {}), **snapshot.tools},
+            tool_taken_at={
+                **(kept.tool_taken_at if kept else {}),
+                **{command: snapshot.taken_at for command in snapshot.tools},
+            },
+        )
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        self._stats["stored"] += 1
+        while len(self._snapshots) > self.max_entries:
+            self._snapshots.popitem(last=False)
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._snapshots),
+            "max_entries": self.max_entries,
+            "max_age_seconds": self.max_age_seconds,
+            **self._stats,
+        }
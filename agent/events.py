@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Optional, Protocol, Tuple
+
+
+class JobEventNotifier:
+    def __init__(self) -> None:
+        self._waiters: Dict[str, List[asyncio.Future[None]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def notify(self, job_id: str) -> None:
+        loop = self._loop
+        if loop is None or job_id not in self._waiters:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake(job_id)
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake, job_id)
+        except RuntimeError:
+            pass
+
+    def _wake(self, job_id: str) -> None:
+        for waiter in self._waiters.pop(job_id, []):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def waiter(self, job_id: str) -> asyncio.Future[None]:
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        future: asyncio.Future[None] = loop.create_future()
+        self._waiters.setdefault(job_id, []).append(future)
+        return future
+
+    def discard(self, job_id: str, future: asyncio.Future[None]) -> None:
+        waiters = self._waiters.get(job_id)
+        if not waiters:
+            return
+        if future in waiters:
+            waiters.remove(future)
+        if not waiters:
+            self._waiters.pop(job_id, None)
+
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+
+class EventCursorSource(Protocol):
+    def latest_event_seq(self) -> int: ...
+
+    def jobs_with_events_since(self, seq: int) -> Tuple[List[str], int]: ...
+
+
+class StoreEventRelay:
+    def __init__(
+        self,
+        source: EventCursorSource,
+        notifier: JobEventNotifier,
+        interval_seconds: float = 0.1,
+    ) -> None:
+        self.source = source
+        self.notifier = notifier
+        self.interval_seconds = max(0.01, interval_seconds)
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._relay_loop())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _relay_loop(self) -> None:
+        cursor = await asyncio.to_thread(self.source.latest_event_seq)
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            if not self.notifier.waiting():
+                cursor = await asyncio.to_thread(self.source.latest_event_seq)
+                continue
+            job_ids, cursor = await asyncio.to_thread(self.source.jobs_with_events_since, cursor)
+            for job_id in job_ids:
+                self.notifier.notify(job_id)
@@ -0,0 +1,112 @@
+"""Run job executor processes against the shared SQLite store.
+
+Run with ``python -m agent.executor --processes 2`` next to API processes
+started with ``AGENT_JOB_EXECUTION=executor`` and ``AGENT_STORE_BACKEND=sqlite``.
+Each process claims queued jobs from the store, runs them on its own event loop
+and writes events and reports back to the store.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+from typing import List, Optional
+
+from agent.config import Settings, get_settings
+from agent.orchestrator import AgentOrchestrator
+from agent.runtime import build_runtime
+from agent.sqlite_store import SQLiteStore
+
+
+class JobExecutor:
+    def __init__(
+        self,
+        orchestrator: AgentOrchestrator,
+        store: SQLiteStore,
+        poll_interval_seconds: float = 0.1,
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.store = store
+        self.poll_interval_seconds = max(0.01, poll_interval_seconds)
+        self.claimed = 0
+
+    def free_slots(self) -> int:
+        scheduler = self.orchestrator.scheduler
+        stats = scheduler.stats()
+        return scheduler.workers - stats["running"] - stats["queue_depth"]
+
+    async def run_once(self) -> int:
+        free = self.free_slots()
+        if free <= 0:
+            return 0
+        jobs = await asyncio.to_thread(self.store.claim_jobs, free)
+        for job in jobs:
+            self.orchestrator.scheduler.submit(job.job_id, job.environment, job.risk_level)
+        self.claimed += len(jobs)
+        return len(jobs)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            if await self.run_once():
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def serve(settings: Settings, stop: Optional[asyncio.Event] = None) -> None:
+    if settings.job_execution != "executor":
+        raise ValueError("Job executors require AGENT_JOB_EXECUTION=executor")
+    runtime = build_runtime(settings, execute_jobs=True)
+    assert isinstance(runtime.store, SQLiteStore)
+    stop = stop or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    executor = JobExecutor(
+        runtime.orchestrator, runtime.store, settings.executor_poll_interval_seconds
+    )
+    await runtime.start()
+    try:
+        await executor.run(stop)
+    finally:
+        await runtime.stop()
+
+
+def _run_process() -> None:
+    asyncio.run(serve(get_settings()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=1, help="executor processes to start")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process()
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.process.BaseProcess] = [
+        context.Process(target=_run_process, name=f"job-executor-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum: int, _: object) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+
+RESOURCE_PATHS: Dict[str, Tuple[str, str]] = {
+    "pods": ("/api/v1", "pods"),
+    "deployments": ("/apis/apps/v1", "deployments"),
+    "events": ("/api/v1", "events"),
+}
+RESOURCE_ALIASES = {
+    "pods": "pods",
+    "pod": "pods",
+    "po": "pods",
+    "deployments": "deployments",
+    "deployment": "deployments",
+    "deploy": "deployments",
+    "events": "events",
+    "event": "events",
+    "ev": "events",
+}
+FIELD_SELECTOR_PATHS = {
+    "type": "type",
+    "reason": "reason",
+    "involvedObject.name": "object_name",
+    "involvedObject.kind": "object_kind",
+}
+SET_REQUIREMENT = re.compile(r"^([A-Za-z0-9_./-]+)\s+(in|notin)\s+\(([^)]*)\)$")
+EQUALITY_REQUIREMENT = re.compile(r"^([A-Za-z0-9_./-]+)\s*(==|!=|=)\s*([A-Za-z0-9_.-]*)$")
+EXISTS_REQUIREMENT = re.compile(r"^(!?)([A-Za-z0-9_./-]+)$")
+
+Row = Dict[str, Any]
+LabelPredicate = Callable[[Dict[str, str]], bool]
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def human_age(timestamp: Optional[float], now: Optional[float] = None) -> str:
+    if timestamp is None:
+        return "<unknown>"
+    seconds = max(0, int((now or time.time()) - timestamp))
+    if seconds < 120:
+        return f"{seconds}s"
+    if seconds < 3 * 3600:
+        return f"{seconds // 60}m"
+    if seconds < 48 * 3600:
+        return f"{seconds // 3600}h"
+    return f"{seconds // 86400}d"
+
+
+def _container_reason(statuses: Iterable[Dict[str, Any]]) -> Optional[str]:
+    reason = None
+    for status in statuses:
+        state = status.get("state") or {}
+        waiting, terminated = state.get("waiting"), state.get("terminated")
+        if waiting and waiting.get("reason"):
+            reason = waiting["reason"]
+        elif terminated:
+            reason = terminated.get("reason") or (
+                f"Signal:{terminated['signal']}"
+                if terminated.get("signal")
+                else f"ExitCode:{terminated.get('exitCode', 0)}"
+            )
+    return reason
+
+
+def pod_row(obj: Dict[str, Any]) -> Row:
+    metadata, spec, status = obj.get("metadata", {}), obj.get("spec", {}), obj.get("status", {})
+    containers = status.get("containerStatuses") or []
+    reason = status.get("reason") or status.get("phase") or "Unknown"
+    for init in status.get("initContainerStatuses") or []:
+        state = init.get("state") or {}
+        terminated, waiting = state.get("terminated"), state.get("waiting")
+        if terminated and terminated.get("exitCode", 0) != 0:
+            reason = f"Init:{terminated.get('reason') or 'Error'}"
+            break
+        if waiting and waiting.get("reason") not in (None, "PodInitializing"):
+            reason = f"Init:{waiting['reason']}"
+            break
+    else:
+        reason = _container_reason(containers) or reason
+    if metadata.get("deletionTimestamp"):
+        reason = "Terminating"
+    ready = sum(1 for container in containers if container.get("ready"))
+    total = len(spec.get("containers") or containers)
+    return {
+        "namespace": metadata.get("namespace", ""),
+        "name": metadata.get("name", ""),
+        "labels": dict(metadata.get("labels") or {}),
+        "columns": {
+            "READY": f"{ready}/{total}",
+            "STATUS": reason,
+            "RESTARTS": str(sum(int(c.get("restartCount", 0)) for c in containers)),
+        },
+        "created": _timestamp(metadata.get("creationTimestamp")),
+    }
+
+
+def deployment_row(obj: Dict[str, Any]) -> Row:
+    metadata, spec, status = obj.get("metadata", {}), obj.get("spec", {}), obj.get("status", {})
+    return {
+        "namespace": metadata.get("namespace", ""),
+        "name": metadata.get("name", ""),
+        "labels": dict(metadata.get("labels") or {}),
+        "columns": {
+            "READY": f"{status.get('readyReplicas', 0)}/{spec.get('replicas', 1)}",
+            "UP-TO-DATE": str(status.get("updatedReplicas", 0)),
+            "AVAILABLE": str(status.get("availableReplicas", 0)),
+        },
+        "created": _timestamp(metadata.get("creationTimestamp")),
+    }
+
+
+def event_row(obj: Dict[str, Any]) -> Row:
+    metadata = obj.get("metadata", {})
+    involved = obj.get("involvedObject") or obj.get("regarding") or {}
+    last_seen = (
+        obj.get("lastTimestamp")
+        or (obj.get("series") or {}).get("lastObservedTime")
+        or obj.get("eventTime")
+        or metadata.get("creationTimestamp")
+    )
+    return {
+        "namespace": metadata.get("namespace", ""),
+        "name": metadata.get("name", ""),
+        "labels": dict(metadata.get("labels") or {}),
+        "type": obj.get("type", ""),
+        "reason": obj.get("reason", ""),
+        "object_kind": involved.get("kind", ""),
+        "object_name": involved.get("name", ""),
+        "message": " ".join(str(obj.get("message") or obj.get("note") or "").split()),
+        "last_seen": _timestamp(last_seen),
+    }
+
+
+ROW_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Row]] = {
+    "pods": pod_row,
+    "deployments": deployment_row,
+    "events": event_row,
+}
+
+
+def render_table(headers: Sequence[str], rows: Sequence[Sequence[str]]) -> str:
+    widths = [len(header) for header in headers]
+    for row in rows:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    lines = [
+        "   ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+        for line in [list(headers), *rows]
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def parse_label_selector(selector: str) -> Optional[LabelPredicate]:
+    requirements: List[LabelPredicate] = []
+    for part in re.split(r",(?![^()]*\))", selector):
+        part = part.strip()
+        if not part:
+            continue
+        match = SET_REQUIREMENT.match(part)
+        if match:
+            key, operator = match.group(1), match.group(2)
+            values = {value.strip() for value in match.group(3).split(",") if value.strip()}
+            if operator == "in":
+                requirements.append(lambda labels, k=key, v=values: labels.get(k) in v)
+            else:
+                requirements.append(lambda labels, k=key, v=values: labels.get(k) not in v)
+            continue
+        match = EQUALITY_REQUIREMENT.match(part)
+        if match:
+            key, operator, value = match.groups()
+            if operator == "!=":
+                requirements.append(lambda labels, k=key, v=value: labels.get(k) != v)
+            else:
+                requirements.append(lambda labels, k=key, v=value: labels.get(k) == v)
+            continue
+        match = EXISTS_REQUIREMENT.match(part)
+        if match:
+            negate, key = match.groups()
+            if negate:
+                requirements.append(lambda labels, k=key: k not in labels)
+            else:
+                requirements.append(lambda labels, k=key: k in labels)
+            continue
+        return None
+    return lambda labels: all(requirement(labels) for requirement in requirements)
+
+
+def parse_field_selector(selector: str) -> Optional[Callable[[Row], bool]]:
+    requirements: List[Callable[[Row], bool]] = []
+    for part in selector.split(","):
+        match = EQUALITY_REQUIREMENT.match(part.strip())
+        if not match or match.group(1) not in FIELD_SELECTOR_PATHS:
+            return None
+        key, operator, value = match.groups()
+        column = FIELD_SELECTOR_PATHS[key]
+        if operator == "!=":
+            requirements.append(lambda row, c=column, v=value: row.get(c) != v)
+        else:
+            requirements.append(lambda row, c=column, v=value: row.get(c) == v)
+    return lambda row: all(requirement(row) for requirement in requirements)
+
+
+@dataclass(frozen=True)
+class GetQuery:
+    resource: str
+    namespace: Optional[str]
+    label_selector: Optional[str] = None
+    field_selector: Optional[str] = None
+
+
+def parse_get_command(argv: Sequence[str]) -> Optional[GetQuery]:
+    if len(argv) < 3 or argv[0] != "kubectl" or argv[1] != "get":
+        return None
+    resource = RESOURCE_ALIASES.get(argv[2])
+    if resource is None:
+        return None
+    options: Dict[str, str] = {}
+    all_namespaces = False
+    args = list(argv[3:])
+    while args:
+        arg = args.pop(0)
+        if arg in ("-A", "--all-namespaces"):
+            all_namespaces = True
+            continue
+        name, has_value, value = arg.partition("=")
+        key = {
+            "-n": "namespace",
+            "--namespace": "namespace",
+            "-l": "selector",
+            "--selector": "selector",
+            "--field-selector": "field_selector",
+        }.get(name)
+        if key is None:
+            return None
+        if not has_value:
+            if not args:
+                return None
+            value = args.pop(0)
+        options[key] = value
+    if not all_namespaces and "namespace" not in options:
+        return None
+    return GetQuery(
+        resource=resource,
+        namespace=None if all_namespaces else options["namespace"],
+        label_selector=options.get("selector"),
+        field_selector=options.get("field_selector"),
+    )
+
+
+def render_rows(query: GetQuery, rows: Iterable[Row]) -> Optional[Tuple[str, str]]:
+    labels_match: LabelPredicate = lambda labels: True
+    fields_match: Callable[[Row], bool] = lambda row: True
+    if query.label_selector:
+        parsed = parse_label_selector(query.label_selector)
+        if parsed is None:
+            return None
+        labels_match = parsed
+    if query.field_selector:
+        parsed_fields = parse_field_selector(query.field_selector)
+        if parsed_fields is None or query.resource != "events":
+            return None
+        fields_match = parsed_fields
+
+    selected = [
+        row
+        for row in rows
+        if (query.namespace is None or row["namespace"] == query.namespace)
+        and labels_match(row["labels"])
+        and fields_match(row)
+    ]
+    if not selected:
+        scope = f" in {query.namespace} namespace" if query.namespace else ""
+        return "", f"No resources found{scope}.\n"
+
+    now = time.time()
+    prefix = ["NAMESPACE"] if query.namespace is None else []
+    if query.resource == "events":
+        selected.sort(key=lambda row: row["last_seen"] or 0.0)
+        headers = prefix + ["LAST SEEN", "TYPE", "REASON", "OBJECT", "MESSAGE"]
+        table = [
+            ([row["namespace"]] if prefix else [])
+            + [
+                human_age(row["last_seen"], now),
+                row["type"],
+                row["reason"],
+                f"{row['object_kind'].lower()}/{row['object_name']}",
+                row["message"],
+            ]
+            for row in selected
+        ]
+    else:
+        selected.sort(key=lambda row: (row["namespace"], row["name"]))
+        columns = list(selected[0]["columns"])
+        headers = prefix + ["NAME", *columns, "AGE"]
+        table = [
+            ([row["namespace"]] if prefix else [])
+            + [row["name"], *(row["columns"][column] for column in columns)]
+            + [human_age(row["created"], now)]
+            for row in selected
+        ]
+    return render_table(headers, table), ""
+
+
+@dataclass
+class WatchedResource:
+    name: str
+    path: str
+    rows: Dict[Tuple[str, str], Row] = field(default_factory=dict)
+    resource_version: str = ""
+    synced: bool = False
+    lists: int = 0
+    watch_events: int = 0
+    errors: int = 0
+    last_error: Optional[str] = None
+
+
+class ClusterStateCache:
+    def __init__(
+        self,
+        api_url: str,
+        token: Optional[str] = None,
+        ca_file: Optional[Path] = None,
+        resources: Sequence[str] = tuple(RESOURCE_PATHS),
+        watch_timeout_seconds: int = 300,
+        retry_seconds: float = 1.0,
+    ) -> None:
+        self.api_url = api_url.rstrip("/")
+        self.token = token
+        self.ca_file = ca_file
+        self.watch_timeout_seconds = watch_timeout_seconds
+        self.retry_seconds = retry_seconds
+        self.resources: Dict[str, WatchedResource] = {}
+        for name in resources:
+            prefix, plural = RESOURCE_PATHS[name]
+            self.resources[name] = WatchedResource(name, f"{prefix}/{plural}")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._stats: Dict[str, int] = {"served": 0, "fallbacks": 0}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url,
+            headers=headers,
+            verify=str(self.ca_file) if self.ca_file else True,
+            timeout=httpx.Timeout(10.0, read=self.watch_timeout_seconds + 30.0),
+        )
+        self._tasks = [
+            asyncio.create_task(self._run(resource)) for resource in self.resources.values()
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for resource in self.resources.values():
+            resource.synced = False
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def ready(self) -> bool:
+        return all(resource.synced for resource in self.resources.values())
+
+    async def wait_ready(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self.ready():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def query(self, argv: Sequence[str]) -> Optional[Tuple[str, str]]:
+        query = parse_get_command(argv)
+        resource = self.resources.get(query.resource) if query else None
+        if query is None or resource is None or not resource.synced:
+            self._stats["fallbacks"] += 1
+            return None
+        rendered = render_rows(query, list(resource.rows.values()))
+        self._stats["served" if rendered is not None else "fallbacks"] += 1
+        return rendered
+
+    async def _run(self, resource: WatchedResource) -> None:
+        # A watch that ends normally is resumed from the last resource version;
+        # 410 Gone relists right away; errors mark the resource unsynced so
+        # queries fall back to kubectl until the next successful list.
+        while True:
+            try:
+                await self._list(resource)
+                while await self._watch(resource):
+                    pass
+                continue
+            except asyncio.CancelledError:
+                raise
+            except (httpx.HTTPError, ValueError, KeyError) as exc:
+                resource.errors += 1
+                resource.last_error = f"{type(exc).__name__}: {exc}"
+            resource.synced = False
+            await asyncio.sleep(self.retry_seconds)
+
+    async def _list(self, resource: WatchedResource) -> None:
+        assert self._client is not None
+        response = await self._client.get(resource.path)
+        response.raise_for_status()
+        payload = response.json()
+        build = ROW_BUILDERS[resource.name]
+        resource.rows = {
+            (row["namespace"], row["name"]): row
+            for row in (build(item) for item in payload.get("items") or [])
+        }
+        resource.resource_version = payload.get("metadata", {}).get("resourceVersion", "")
+        resource.lists += 1
+        resource.synced = True
+
+    async def _watch(self, resource: WatchedResource) -> bool:
+        assert self._client is not None
+        params = {
+            "watch": "1",
+            "resourceVersion": resource.resource_version,
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds": str(self.watch_timeout_seconds),
+        }
+        build = ROW_BUILDERS[resource.name]
+        async with self._client.stream("GET", resource.path, params=params) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                kind, obj = event.get("type"), event.get("object") or {}
+                if kind == "ERROR":
+                    if obj.get("code") == 410:
+                        return False
+                    raise ValueError(obj.get("message") or "watch error")
+                version = obj.get("metadata", {}).get("resourceVersion")
+                if version:
+                    resource.resource_version = version
+                if kind == "BOOKMARK":
+                    continue
+                row = build(obj)
+                key = (row["namespace"], row["name"])
+                if kind == "DELETED":
+                    resource.rows.pop(key, None)
+                else:
+                    resource.rows[key] = row
+                resource.watch_events += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "api_url": self.api_url,
+            "ready": self.ready(),
+            **self._stats,
+            "resources": {
+                name: {
+                    "synced": resource.synced,
+                    "objects": len(resource.rows),
+                    "resource_version": resource.resource_version,
+                    "lists": resource.lists,
+                    "watch_events": resource.watch_events,
+                    "errors": resource.errors,
+                    "last_error": resource.last_error,
+                }
+                for name, resource in self.resources.items()
+            },
+        }
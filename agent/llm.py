@@ -1,56 +1,522 @@
 from __future__ import annotations
 
-from typing import List, Dict
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, List, Dict, Optional, Sequence
 
 import httpx
 
+from agent.cache import ResponseCache
+from agent.metrics import LLM_BACKEND_ERRORS, LLM_REQUEST_SECONDS, LLM_TIME_TO_FIRST_TOKEN_SECONDS
+from agent.router import Backend, BackendError, BackendRouter
+
+
+RETRIABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
 
 class OllamaClient:
     def __init__(
-        self, base_url: str, model: str, timeout_seconds: float, api_key: str | None = None
+        self,
+        base_url: str,
+        model: str,
+        timeout_seconds: float,
+        api_key: str | None = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_seconds: float = 30.0,
+        http2: bool = False,
+        max_concurrency: int = 8,
+        response_cache: Optional[ResponseCache] = None,
+        router: Optional[BackendRouter] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
+        self.router = router or BackendRouter([self.base_url])
         self.model = model
         self.timeout_seconds = timeout_seconds
         self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry_seconds = keepalive_expiry_seconds
+        self.http2 = http2 and _http2_available()
+        self.max_concurrency = max(1, max_concurrency)
+        self.response_cache = response_cache
+
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats: Dict[str, float] = {
+            "requests_total": 0,
+            "requests_failed": 0,
+            "connections_opened": 0,
+            "max_in_flight": 0,
+            "max_waiting": 0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+        }
+
+    async def start(self) -> None:
+        self.router.start(self._get_client())
+
+    async def aclose(self) -> None:
+        await self.router.stop()
+        if self.response_cache is not None:
+            await self.response_cache.drain()
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_seconds,
+        )
+        return httpx.AsyncClient(
+            timeout=self.timeout_seconds,
+            limits=limits,
+            http2=self.http2,
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+
+    async def _acquire_slot(self) -> None:
+        self._waiting += 1
+        self._stats["max_waiting"] = max(self._stats["max_waiting"], self._waiting)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - queued_at
+        self._stats["queue_wait_seconds_total"] += waited
+        self._stats["queue_wait_seconds_max"] = max(self._stats["queue_wait_seconds_max"], waited)
+        self._in_flight += 1
+        self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        requests_total = int(self._stats["requests_total"])
+        requests_failed = int(self._stats["requests_failed"])
+        connections_opened = int(self._stats["connections_opened"])
+        completed = requests_total - requests_failed
+        reused = max(0, completed - connections_opened)
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "pool": {
+                "open": self._client is not None,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry_seconds": self.keepalive_expiry_seconds,
+                "connections_opened": connections_opened,
+                "requests_reusing_connection": reused,
+                "connection_reuse_ratio": round(reused / completed, 4) if completed else 0.0,
+            },
+            "queue": {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "max_in_flight": int(self._stats["max_in_flight"]),
+                "max_waiting": int(self._stats["max_waiting"]),
+                "wait_seconds_total": round(self._stats["queue_wait_seconds_total"], 6),
+                "wait_seconds_max": round(self._stats["queue_wait_seconds_max"], 6),
+                "wait_seconds_avg": (
+                    round(self._stats["queue_wait_seconds_total"] / requests_total, 6)
+                    if requests_total
+                    else 0.0
+                ),
+            },
+            "requests_total": requests_total,
+            "requests_failed": requests_failed,
+            "router": self.router.stats(),
+            "cache": self.response_cache.stats() if self.response_cache is not None else None,
+        }
 
-    async def chat(self, system_prompt: str, user_prompt: str) -> str:
+    def _build_payload(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        history: Sequence[Dict[str, str]] = (),
+    ) -> Dict[str, Any]:
         messages: List[Dict[str, str]] = [
             {"role": "system", "content": system_prompt},
+            *history,
             {"role": "user", "content": user_prompt},
         ]
-        payload = {
+        return {
             "model": self.model,
             "messages": messages,
             "temperature": 0.2,
         }
 
+    def _headers(self) -> Dict[str, str]:
         headers = {}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
 
+    def _cache_key(self, payload: Dict[str, Any], bypass_cache: bool) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        if bypass_cache:
+            self.response_cache.record_bypass()
+            return None
+        return ResponseCache.make_key(payload["model"], payload["messages"], payload["temperature"])
+
+    async def chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        bypass_cache: bool = False,
+        history: Sequence[Dict[str, str]] = (),
+    ) -> str:
+        text, _ = await self._chat(system_prompt, user_prompt, bypass_cache, history)
+        return text
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        bypass_cache: bool = False,
+        history: Sequence[Dict[str, str]] = (),
+    ) -> Optional[str]:
+        text, succeeded = await self._chat(system_prompt, user_prompt, bypass_cache, history)
+        return text if succeeded else None
+
+    async def _chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        bypass_cache: bool,
+        history: Sequence[Dict[str, str]],
+    ) -> tuple[str, bool]:
+        started = time.perf_counter()
+        payload = self._build_payload(system_prompt, user_prompt, history)
+        cache_key = self._cache_key(payload, bypass_cache)
+        if cache_key is not None:
+            assert self.response_cache is not None
+            cached = await self.response_cache.lookup_or_begin(cache_key)
+            if cached is not None:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, "chat", "cached")
+                return cached, True
+
+        content: Optional[str] = None
         try:
-            async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    json=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
-                data = response.json()
+            text, succeeded = await self._request_completion(payload)
+            if succeeded:
+                content = text
+        finally:
+            if cache_key is not None:
+                assert self.response_cache is not None
+                self.response_cache.finish(cache_key, content)
+        LLM_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, "chat", "ok" if succeeded else "error"
+        )
+        return text, succeeded
+
+    async def _request_completion(self, payload: Dict[str, Any]) -> tuple[str, bool]:
+        await self._acquire_slot()
+        self._stats["requests_total"] += 1
+        try:
+            data = await self._post_with_failover(payload)
         except Exception as exc:  # noqa: BLE001
+            self._stats["requests_failed"] += 1
             return (
                 "LLM endpoint not reachable. Returning deterministic fallback. "
                 f"Reason: {exc}"
-            )
+            ), False
+        finally:
+            self._release_slot()
 
         choices = data.get("choices", [])
         if not choices:
-            return "LLM returned no choices. Please check runtime logs."
+            return "LLM returned no choices. Please check runtime logs.", False
 
         message = choices[0].get("message", {})
         content = message.get("content")
         if isinstance(content, str):
-            return content
+            return content, True
+
+        return "LLM returned an unexpected response format.", False
+
+    async def _post_with_failover(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        tried: set[str] = set()
+        last_error: Optional[Exception] = None
+        for attempt in range(self.router.max_attempts):
+            backend = self.router.pick(exclude=tried)
+            if backend is None:
+                break
+            tried.add(backend.base_url)
+            if attempt:
+                self.router.record_retry()
+            try:
+                if self.router.hedge_after_seconds is not None:
+                    return await self._post_hedged(backend, payload, tried)
+                return await self._post_once(backend, payload)
+            except BackendError as exc:
+                last_error = exc
+        raise last_error or BackendError("No LLM backend available")
+
+    async def _post_hedged(
+        self, backend: Backend, payload: Dict[str, Any], tried: set[str]
+    ) -> Dict[str, Any]:
+        primary = asyncio.ensure_future(self._post_once(backend, payload))
+        done, _ = await asyncio.wait({primary}, timeout=self.router.hedge_after_seconds)
+        if done:
+            return primary.result()
+
+        hedge_backend = self.router.pick(exclude=tried)
+        if hedge_backend is None:
+            return await primary
+        tried.add(hedge_backend.base_url)
+        hedge = asyncio.ensure_future(self._post_once(hedge_backend, payload))
+
+        pending = {primary, hedge}
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        self.router.record_hedge(won=task is hedge)
+                        return task.result()
+                    last_error = error
+        finally:
+            for task in pending:
+                task.cancel()
+        self.router.record_hedge(won=False)
+        assert last_error is not None
+        raise last_error
+
+    async def _post_once(self, backend: Backend, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.router.begin(backend)
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().post(
+                backend.chat_url,
+                json=payload,
+                headers=self._headers(),
+                extensions={"trace": self._trace},
+            )
+            if response.status_code in RETRIABLE_STATUS_CODES:
+                self.router.record_failure(backend)
+                LLM_BACKEND_ERRORS.inc(backend.base_url, f"http_{response.status_code}")
+                raise BackendError(f"{backend.base_url} returned HTTP {response.status_code}")
+            response.raise_for_status()
+            data = response.json()
+        except httpx.TransportError as exc:
+            self.router.record_failure(backend)
+            LLM_BACKEND_ERRORS.inc(backend.base_url, type(exc).__name__)
+            raise BackendError(f"{backend.base_url}: {exc}") from exc
+        finally:
+            self.router.end(backend)
+        self.router.record_success(backend, time.perf_counter() - started)
+        return data
+
+    async def _stream_with_failover(
+        self, payload: Dict[str, Any], headers: Dict[str, str], usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        tried: set[str] = set()
+        last_error: Optional[Exception] = None
+        for attempt in range(self.router.max_attempts):
+            backend = self.router.pick(exclude=tried)
+            if backend is None:
+                break
+            tried.add(backend.base_url)
+            if attempt:
+                self.router.record_retry()
+            emitted = False
+            self.router.begin(backend)
+            started = time.perf_counter()
+            try:
+                async with self._get_client().stream(
+                    "POST",
+                    backend.chat_url,
+                    json=payload,
+                    headers=headers,
+                    extensions={"trace": self._trace},
+                ) as response:
+                    if response.status_code in RETRIABLE_STATUS_CODES:
+                        LLM_BACKEND_ERRORS.inc(backend.base_url, f"http_{response.status_code}")
+                        raise BackendError(
+                            f"{backend.base_url} returned HTTP {response.status_code}"
+                        )
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        chunk_usage = chunk.get("usage") or {}
+                        if isinstance(chunk_usage.get("completion_tokens"), int):
+                            usage["completion_tokens"] = chunk_usage["completion_tokens"]
+                        for choice in chunk.get("choices") or []:
+                            delta = (choice.get("delta") or {}).get("content")
+                            if isinstance(delta, str) and delta:
+                                emitted = True
+                                yield delta
+                self.router.record_success(backend, time.perf_counter() - started)
+                return
+            except (httpx.TransportError, BackendError) as exc:
+                self.router.record_failure(backend)
+                if isinstance(exc, httpx.TransportError):
+                    LLM_BACKEND_ERRORS.inc(backend.base_url, type(exc).__name__)
+                if emitted:
+                    raise
+                last_error = exc
+            finally:
+                self.router.end(backend)
+        raise last_error or BackendError("No LLM backend available")
+
+    def chat_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        bypass_cache: bool = False,
+        history: Sequence[Dict[str, str]] = (),
+    ) -> "ChatStream":
+        payload = self._build_payload(system_prompt, user_prompt, history)
+        cache_key = self._cache_key(payload, bypass_cache)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        return ChatStream(self, payload, self._headers(), cache_key=cache_key)
+
+
+class ChatStream:
+    def __init__(
+        self,
+        client: OllamaClient,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        cache_key: Optional[str] = None,
+    ) -> None:
+        self._client = client
+        self._payload = payload
+        self._headers = headers
+        self._cache_key = cache_key
+        self.cache_hit = False
+        self._chunks: List[str] = []
+        self.completion_tokens = 0
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def time_to_first_token_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.first_token_at is None:
+            return None
+        return round(self.first_token_at - self.started_at, 6)
+
+    @property
+    def elapsed_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if self.first_token_at is None or self.finished_at is None or not self.completion_tokens:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        if elapsed <= 0:
+            return None
+        return round(self.completion_tokens / elapsed, 3)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "time_to_first_token_seconds": self.time_to_first_token_seconds,
+            "tokens_per_second": self.tokens_per_second,
+            "completion_tokens": self.completion_tokens,
+            "cache_hit": self.cache_hit,
+        }
+
+    def _emit(self, delta: str, from_model: bool = True) -> str:
+        if from_model and self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self._chunks.append(delta)
+        return delta
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        client = self._client
+        cache = client.response_cache
+        self.started_at = time.perf_counter()
+        if self._cache_key is not None and cache is not None:
+            cached = await cache.lookup_or_begin(self._cache_key)
+            if cached is not None:
+                self.cache_hit = True
+                yield self._emit(cached)
+                self.finished_at = time.perf_counter()
+                LLM_REQUEST_SECONDS.observe(self.finished_at - self.started_at, "stream", "cached")
+                return
+
+        try:
+            await client._acquire_slot()
+        except BaseException:
+            if self._cache_key is not None and cache is not None:
+                cache.finish(self._cache_key, None)
+            raise
+        client._stats["requests_total"] += 1
+        usage: Dict[str, int] = {}
+        streamed_chunks = 0
+        succeeded = False
+        try:
+            chunks = client._stream_with_failover(self._payload, self._headers, usage)
+            async with aclosing(chunks):
+                async for delta in chunks:
+                    streamed_chunks += 1
+                    yield self._emit(delta)
+            succeeded = bool(self._chunks)
+        except Exception as exc:  # noqa: BLE001
+            client._stats["requests_failed"] += 1
+            if self._chunks:
+                yield self._emit(f"\n[stream interrupted: {exc}]")
+            else:
+                yield self._emit(
+                    "LLM endpoint not reachable. Returning deterministic fallback. "
+                    f"Reason: {exc}",
+                    from_model=False,
+                )
+        finally:
+            self.finished_at = time.perf_counter()
+            self.completion_tokens = usage.get("completion_tokens", streamed_chunks)
+            client._release_slot()
+            if self._cache_key is not None and cache is not None:
+                cache.finish(self._cache_key, self.text if succeeded else None)
+            LLM_REQUEST_SECONDS.observe(
+                self.finished_at - self.started_at, "stream", "ok" if succeeded else "error"
+            )
+            if succeeded and self.first_token_at is not None:
+                LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(self.first_token_at - self.started_at)
+
+        if not self._chunks:
+            yield self._emit(
+                "LLM returned no choices. Please check runtime logs.", from_model=False
+            )
+
 
-        return "LLM returned an unexpected response format."
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+LOCK_BUCKETS: Tuple[float, ...] = (
+    0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[object]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(label) for label in labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: object, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Optional[Callable[[], float]] = None,
+    ) -> None:
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._callback = callback
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        self._callback = callback
+
+    def render(self) -> List[str]:
+        value = self._callback() if self._callback is not None else self._value
+        return [*super().render(), f"{self.name} {_format_value(float(value))}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: object) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        names = (*self.labelnames, "le")
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                labels = _format_labels(names, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(
+        self, name: str, documentation: str, callback: Optional[Callable[[], float]] = None
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, callback))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "agent_http_request_duration_seconds",
+    "HTTP request latency until response headers, by route template.",
+    ("method", "route", "status"),
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "agent_llm_request_duration_seconds",
+    "LLM chat latency by mode (chat, stream) and outcome (ok, error, cached).",
+    ("mode", "outcome"),
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "agent_llm_time_to_first_token_seconds",
+    "Time to the first streamed token of an uncached LLM stream.",
+)
+LLM_BACKEND_ERRORS = REGISTRY.counter(
+    "agent_llm_backend_errors_total",
+    "Failed LLM backend attempts by replica and reason.",
+    ("backend", "reason"),
+)
+COMMAND_SECONDS = REGISTRY.histogram(
+    "agent_command_duration_seconds",
+    "Diagnostic subprocess wall time by tool.",
+    ("tool_name",),
+)
+COMMAND_EXITS = REGISTRY.counter(
+    "agent_command_exit_total",
+    "Diagnostic subprocess exit codes by tool.",
+    ("tool_name", "exit_code"),
+)
+JOB_TRANSITIONS = REGISTRY.counter(
+    "agent_job_transitions_total",
+    "Job status transitions by target status.",
+    ("status",),
+)
+JOB_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "agent_job_queue_wait_seconds",
+    "Time jobs spend queued before a worker picks them up.",
+    ("environment",),
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "agent_job_queue_depth",
+    "Jobs waiting in the scheduler queue.",
+)
+JOBS_RUNNING = REGISTRY.gauge(
+    "agent_jobs_running",
+    "Jobs currently executing on scheduler workers.",
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    "agent_llm_in_flight_requests",
+    "LLM requests holding a concurrency slot.",
+)
+LLM_WAITING = REGISTRY.gauge(
+    "agent_llm_waiting_requests",
+    "LLM requests waiting for a concurrency slot.",
+)
+STORE_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "agent_store_lock_wait_seconds",
+    "Time spent waiting to acquire in-memory store locks.",
+    ("lock",),
+    buckets=LOCK_BUCKETS,
+)
+STORE_LOCK_HOLD_SECONDS = REGISTRY.histogram(
+    "agent_store_lock_hold_seconds",
+    "Time in-memory store locks are held.",
+    ("lock",),
+    buckets=LOCK_BUCKETS,
+)
+
+
+@contextmanager
+def timed_lock(lock: threading.Lock, name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    lock.acquire()
+    acquired = time.perf_counter()
+    try:
+        yield
+    finally:
+        lock.release()
+        STORE_LOCK_WAIT_SECONDS.observe(acquired - started, name)
+        STORE_LOCK_HOLD_SECONDS.observe(time.perf_counter() - acquired, name)
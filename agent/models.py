@@ -8,6 +8,11 @@ from pydantic import BaseModel, Field
 RiskLevel = Literal["R0", "R1", "R2", "R3"]
 EnvironmentName = Literal["dev", "stage", "prod"]
 JobStatus = Literal["queued", "running", "awaiting_approval", "done", "failed"]
+OutputStream = Literal["stdout", "stderr"]
+OutputUnit = Literal["bytes", "lines"]
+
+K8S_NAME_PATTERN = r"^[a-z0-9](?:[-a-z0-9]{0,61}[a-z0-9])?$"
+LABEL_SELECTOR_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_./=!, ()-]*$"
 
 
 def utc_now_iso() -> str:
@@ -30,6 +35,7 @@ class SessionMessageRequest(BaseModel):
     message: str = Field(min_length=1)
     environment: EnvironmentName = "dev"
     requested_risk: Optional[RiskLevel] = None
+    bypass_cache: bool = False
 
 
 class SessionMessageResponse(BaseModel):
@@ -39,6 +45,27 @@ class SessionMessageResponse(BaseModel):
     requires_approval: bool
     required_approvals: int
     timestamp_utc: str
+    matched_risk_patterns: List[str] = Field(default_factory=list)
+    time_to_first_token_seconds: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+
+
+class RiskClassifyRequest(BaseModel):
+    texts: List[str] = Field(min_length=1, max_length=1000)
+
+
+class RiskPatternMatch(BaseModel):
+    pattern: str
+    risk_level: RiskLevel
+
+
+class RiskClassificationResult(BaseModel):
+    risk_level: RiskLevel
+    matches: List[RiskPatternMatch] = Field(default_factory=list)
+
+
+class RiskClassifyResponse(BaseModel):
+    results: List[RiskClassificationResult]
 
 
 class ToolResult(BaseModel):
@@ -49,6 +76,17 @@ class ToolResult(BaseModel):
     stderr: str
     started_at_utc: str
     finished_at_utc: str
+    stdout_total_bytes: int = 0
+    stdout_total_lines: int = 0
+    stderr_total_bytes: int = 0
+    stderr_total_lines: int = 0
+    output_truncated: bool = False
+    source: str = "subprocess"
+    stdout_spill_path: Optional[str] = Field(default=None, exclude=True)
+    stderr_spill_path: Optional[str] = Field(default=None, exclude=True)
+    cached: bool = False
+    cache_age_seconds: Optional[float] = None
+    duration_seconds: Optional[float] = None
 
 
 class JobCreateRequest(BaseModel):
@@ -57,6 +95,12 @@ class JobCreateRequest(BaseModel):
     session_id: Optional[str] = None
     requested_risk: Optional[RiskLevel] = None
     run_diagnostics: bool = True
+    force_refresh: bool = False
+    namespace: Optional[str] = Field(default=None, pattern=K8S_NAME_PATTERN)
+    release: Optional[str] = Field(default=None, pattern=K8S_NAME_PATTERN)
+    label_selector: Optional[str] = Field(
+        default=None, max_length=256, pattern=LABEL_SELECTOR_PATTERN
+    )
 
 
 class JobResponse(BaseModel):
@@ -69,12 +113,22 @@ class JobResponse(BaseModel):
     updated_at: str
 
 
+class JobBatchCreateRequest(BaseModel):
+    jobs: List[JobCreateRequest] = Field(min_length=1, max_length=200)
+
+
+class JobBatchResponse(BaseModel):
+    batch_id: str
+    jobs: List[JobResponse]
+
+
 class JobApproveRequest(BaseModel):
     approver: str = Field(min_length=1)
     comment: Optional[str] = None
 
 
 class JobEvent(BaseModel):
+    seq: int
     timestamp_utc: str
     event_type: str
     message: str
@@ -89,3 +143,22 @@ class JobReportResponse(BaseModel):
     diagnostics: List[ToolResult] = Field(default_factory=list)
     approvals: List[Dict[str, Any]] = Field(default_factory=list)
     updated_at: str
+    time_to_first_token_seconds: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    diagnostics_snapshot_id: Optional[str] = None
+    diagnostics_baseline: Optional[Dict[str, Any]] = None
+    diagnostics_plan: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, Any]] = None
+
+
+class ToolOutputPage(BaseModel):
+    job_id: str
+    index: int
+    tool_name: str
+    stream: OutputStream
+    unit: OutputUnit
+    offset: int
+    total: int
+    next_offset: Optional[int] = None
+    content: str
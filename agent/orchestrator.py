@@ -1,23 +1,70 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+from agent.batch import JobBatch, ResultCallback
+from agent.cache import DiagnosticsCache
+from agent.capture import prune_spill_dirs, slice_output
 from agent.config import Settings
-from agent.llm import OllamaClient
+from agent.context import ContextBuilder, estimate_tokens
+from agent.deltas import BaselineSnapshot, DiagnosticsBaselines
+from agent.events import JobEventNotifier
+from agent.k8s import ClusterStateCache
+from agent.llm import ChatStream, OllamaClient
+from agent.metrics import JOB_TRANSITIONS
 from agent.models import (
     EnvironmentName,
     JobApproveRequest,
+    JobBatchResponse,
     JobCreateRequest,
     JobReportResponse,
     JobResponse,
+    JobStatus,
     RiskLevel,
     SessionMessageRequest,
     SessionMessageResponse,
+    ToolOutputPage,
+    ToolResult,
     utc_now_iso,
 )
+from agent.plans import DiagnosticPlan, plan_diagnostics
 from agent.policy import PolicyEngine
-from agent.store import InMemoryStore
-from agent.tools import run_read_only_diagnostics
+from agent.reducers import Reduction, capped, diff_reductions, reduce_output
+from agent.risk import RiskClassification
+from agent.scheduler import JobScheduler
+from agent.store import OUTPUT_STREAMS, EventRecord, JobRecord, Store, _thaw
+from agent.timing import DISABLED_TIMER, JobTimer, current_job_timer
+from agent.tools import KUBECTL_CONTEXT, run_read_only_diagnostics
+
+
+SESSION_SYSTEM_PROMPT = (
+    "You are a pragmatic SRE/coding assistant. Provide concise, evidence-driven "
+    "next steps and mention rollback considerations when relevant."
+)
+SUMMARY_SYSTEM_PROMPT = (
+    "You summarize diagnostics for SRE and coding teams with concise action items."
+)
+SUMMARY_EVENT_FLUSH_CHARS = 200
+SUMMARY_EVENT_FLUSH_SECONDS = 0.5
+TERMINAL_JOB_STATUSES = frozenset({"done", "failed"})
+TERMINAL_EVENT_TYPES = frozenset({"job_done", "job_failed"})
+TERMINAL_EVENT_GRACE_SECONDS = 2.0
+
+DiagnosticsRunner = Callable[..., Awaitable[List[ToolResult]]]
 
 
 class AgentOrchestrator:
@@ -25,30 +72,72 @@ class AgentOrchestrator:
         self,
         settings: Settings,
         policy: PolicyEngine,
-        store: InMemoryStore,
+        store: Store,
         llm: OllamaClient,
+        diagnostics_runner: DiagnosticsRunner = run_read_only_diagnostics,
+        execute_jobs: bool = True,
+        cluster_state: Optional[ClusterStateCache] = None,
     ) -> None:
         self.settings = settings
         self.policy = policy
         self.store = store
         self.llm = llm
+        self.diagnostics_runner = diagnostics_runner
+        self.cluster_state = cluster_state
+        self.execute_jobs = execute_jobs
+        self._job_batches: Dict[str, JobBatch] = {}
+        self.events = JobEventNotifier()
+        self.store.subscribe(self.events.notify)
+        self.scheduler = JobScheduler(self._execute_job, workers=settings.job_workers)
+        self.context = ContextBuilder(
+            store,
+            llm,
+            budget_tokens=settings.context_budget_tokens,
+            summary_max_tokens=settings.context_summary_max_tokens,
+            max_stored_messages=settings.session_max_messages,
+        )
+        self.diagnostics_cache: Optional[DiagnosticsCache] = (
+            DiagnosticsCache(max_entries=settings.diagnostics_cache_max_entries)
+            if settings.diagnostics_cache_enabled
+            else None
+        )
+        self.diagnostic_baselines: Optional[DiagnosticsBaselines] = (
+            DiagnosticsBaselines(max_age_seconds=settings.diagnostics_baseline_max_age_seconds)
+            if settings.diagnostics_delta_enabled
+            else None
+        )
 
-    def classify_risk(self, text: str, explicit_risk: Optional[RiskLevel] = None) -> RiskLevel:
-        if explicit_risk:
-            return explicit_risk
+    async def start(self) -> None:
+        self.events.bind(asyncio.get_running_loop())
+        if self.execute_jobs:
+            self.scheduler.start()
 
-        lowered = text.lower()
-        r3_keywords = ("wipe", "purge", "delete all", "drop database", "destroy", "format disk")
-        r2_keywords = ("prod deploy", "production deploy", "ingress change", "schema migration")
-        r1_keywords = ("restart", "scale", "patch", "update dependency", "upgrade")
+    async def stop(self) -> None:
+        undrained, interrupted = await self.scheduler.stop(
+            self.settings.job_drain_timeout_seconds
+        )
+        for job_id in interrupted:
+            self._set_status(job_id, "failed")
+            self._add_event(
+                job_id,
+                "job_failed",
+                "Job cancelled during shutdown",
+                {"error": "drain timeout exceeded while running"},
+            )
+        for job_id in undrained:
+            self._set_status(job_id, "failed")
+            self._add_event(
+                job_id, "job_failed", "Job dropped during shutdown", {"error": "scheduler stopped"}
+            )
+        self._job_batches.clear()
+        await self.context.aclose()
 
-        if any(keyword in lowered for keyword in r3_keywords):
-            return "R3"
-        if any(keyword in lowered for keyword in r2_keywords):
-            return "R2"
-        if any(keyword in lowered for keyword in r1_keywords):
-            return "R1"
-        return "R0"
+    def classify_risk(
+        self, text: str, explicit_risk: Optional[RiskLevel] = None
+    ) -> RiskClassification:
+        if explicit_risk:
+            return RiskClassification(risk_level=explicit_risk)
+        return self.policy.classify_risk(text)
 
     async def handle_message(
         self, session_id: str, request: SessionMessageRequest
@@ -57,36 +146,142 @@ class AgentOrchestrator:
         if not session:
             raise KeyError(f"Session not found: {session_id}")
 
-        risk_level = self.classify_risk(request.message, request.requested_risk)
+        classification = self.classify_risk(request.message, request.requested_risk)
+        risk_level = classification.risk_level
         required_approvals = self.policy.required_approvals(risk_level, request.environment)
         requires_approval = required_approvals > 0
 
+        context = self.context.build(session_id, SESSION_SYSTEM_PROMPT, request.message)
         self.store.append_session_message(session_id, "user", request.message)
         if requires_approval:
-            response = (
-                f"Request classified as {risk_level} in {request.environment}. "
-                f"This requires {required_approvals} approval(s). "
-                "Create a job via POST /agent/jobs to continue."
-            )
+            response = self._approval_notice(risk_level, request.environment, required_approvals)
         else:
-            system_prompt = (
-                "You are a pragmatic SRE/coding assistant. Provide concise, evidence-driven "
-                "next steps and mention rollback considerations when relevant."
+            response = await self.llm.chat(
+                context.system_prompt,
+                request.message,
+                bypass_cache=request.bypass_cache,
+                history=context.history,
             )
-            response = await self.llm.chat(system_prompt, request.message)
 
         self.store.append_session_message(session_id, "assistant", response)
+        self.context.schedule_compaction(session_id)
         return SessionMessageResponse(
             session_id=session_id,
             response=response,
             risk_level=risk_level,
             requires_approval=requires_approval,
             required_approvals=required_approvals,
+            matched_risk_patterns=classification.matched_patterns,
             timestamp_utc=utc_now_iso(),
         )
 
+    def stream_message(
+        self, session_id: str, request: SessionMessageRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        session = self.store.get_session(session_id)
+        if not session:
+            raise KeyError(f"Session not found: {session_id}")
+        return self._stream_message(session_id, request)
+
+    async def _stream_message(
+        self, session_id: str, request: SessionMessageRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        classification = self.classify_risk(request.message, request.requested_risk)
+        risk_level = classification.risk_level
+        required_approvals = self.policy.required_approvals(risk_level, request.environment)
+        requires_approval = required_approvals > 0
+
+        context = self.context.build(session_id, SESSION_SYSTEM_PROMPT, request.message)
+        self.store.append_session_message(session_id, "user", request.message)
+        yield {
+            "event": "meta",
+            "data": {
+                "session_id": session_id,
+                "risk_level": risk_level,
+                "requires_approval": requires_approval,
+                "required_approvals": required_approvals,
+                "matched_risk_patterns": classification.matched_patterns,
+            },
+        }
+
+        metrics: Dict[str, Any] = {}
+        if requires_approval:
+            response = self._approval_notice(risk_level, request.environment, required_approvals)
+            self.store.append_session_message(session_id, "assistant", response)
+            yield {"event": "token", "data": {"delta": response}}
+        else:
+            stream = self.llm.chat_stream(
+                context.system_prompt,
+                request.message,
+                bypass_cache=request.bypass_cache,
+                history=context.history,
+            )
+            try:
+                async for delta in stream:
+                    yield {"event": "token", "data": {"delta": delta}}
+            finally:
+                response = stream.text
+                self.store.append_session_message(session_id, "assistant", response)
+            metrics = stream.metrics()
+        self.context.schedule_compaction(session_id)
+
+        result = SessionMessageResponse(
+            session_id=session_id,
+            response=response,
+            risk_level=risk_level,
+            requires_approval=requires_approval,
+            required_approvals=required_approvals,
+            matched_risk_patterns=classification.matched_patterns,
+            timestamp_utc=utc_now_iso(),
+            time_to_first_token_seconds=metrics.get("time_to_first_token_seconds"),
+            tokens_per_second=metrics.get("tokens_per_second"),
+        )
+        yield {"event": "done", "data": result.model_dump()}
+
+    @staticmethod
+    def _approval_notice(
+        risk_level: RiskLevel, environment: EnvironmentName, required_approvals: int
+    ) -> str:
+        return (
+            f"Request classified as {risk_level} in {environment}. "
+            f"This requires {required_approvals} approval(s). "
+            "Create a job via POST /agent/jobs to continue."
+        )
+
     async def create_job(self, request: JobCreateRequest) -> JobResponse:
-        risk_level = self.classify_risk(request.goal, request.requested_risk)
+        return self._create_job(
+            request, self.classify_risk(request.goal, request.requested_risk)
+        )
+
+    async def create_jobs(self, requests: Sequence[JobCreateRequest]) -> JobBatchResponse:
+        classifications = iter(
+            self.policy.classify_risk_many(
+                [request.goal for request in requests if not request.requested_risk]
+            )
+        )
+        batch = JobBatch(
+            summary_concurrency=self.settings.batch_summary_concurrency,
+            snapshot_max_age_seconds=self.settings.batch_snapshot_max_age_seconds,
+        )
+        jobs = [
+            self._create_job(
+                request,
+                RiskClassification(risk_level=request.requested_risk)
+                if request.requested_risk
+                else next(classifications),
+                batch,
+            )
+            for request in requests
+        ]
+        return JobBatchResponse(batch_id=batch.batch_id, jobs=jobs)
+
+    def _create_job(
+        self,
+        request: JobCreateRequest,
+        classification: RiskClassification,
+        batch: Optional[JobBatch] = None,
+    ) -> JobResponse:
+        risk_level = classification.risk_level
         required_approvals = self.policy.required_approvals(risk_level, request.environment)
         status = "awaiting_approval" if required_approvals > 0 else "queued"
 
@@ -99,32 +294,49 @@ class AgentOrchestrator:
                 "session_id": request.session_id,
                 "required_approvals": required_approvals,
                 "run_diagnostics": request.run_diagnostics,
+                "force_refresh": request.force_refresh,
+                "targets": {
+                    key: value
+                    for key, value in (
+                        ("namespace", request.namespace),
+                        ("release", request.release),
+                        ("label_selector", request.label_selector),
+                    )
+                    if value
+                },
             }
         )
-        self.store.add_job_event(
-            job["job_id"],
-            "job_created",
-            "Job created",
-            {
-                "risk_level": risk_level,
-                "required_approvals": required_approvals,
-                "environment": request.environment,
-            },
-        )
+        JOB_TRANSITIONS.inc(status)
+        details: Dict[str, Any] = {
+            "risk_level": risk_level,
+            "required_approvals": required_approvals,
+            "environment": request.environment,
+            "matched_risk_patterns": classification.matched_patterns,
+        }
+        if batch is not None:
+            details["batch_id"] = batch.batch_id
+            if self.execute_jobs:
+                self._prune_job_batches()
+                self._job_batches[job.job_id] = batch
+        self._add_event(job.job_id, "job_created", "Job created", details)
 
         if status != "awaiting_approval":
-            await self._execute_job(job["job_id"])
-            job = self.store.get_job(job["job_id"]) or job
+            job = self._enqueue_job(job)
 
         return self._to_job_response(job)
 
+    def _prune_job_batches(self) -> None:
+        expired = [job_id for job_id, batch in self._job_batches.items() if batch.expired()]
+        for job_id in expired:
+            del self._job_batches[job_id]
+
     async def approve_job(self, job_id: str, request: JobApproveRequest) -> JobResponse:
         job = self.store.get_job(job_id)
         if not job:
             raise KeyError(f"Job not found: {job_id}")
 
         job = self.store.add_job_approval(job_id, request.approver, request.comment)
-        self.store.add_job_event(
+        self._add_event(
             job_id,
             "job_approved",
             "Approval registered",
@@ -132,74 +344,315 @@ class AgentOrchestrator:
         )
 
         if (
-            job["status"] == "awaiting_approval"
-            and len(job["approvals"]) >= job["required_approvals"]
+            job.status == "awaiting_approval"
+            and len(job.approvals) >= job.required_approvals
         ):
-            await self._execute_job(job_id)
-            job = self.store.get_job(job_id) or job
+            job = self._enqueue_job(job)
 
         return self._to_job_response(job)
 
-    async def _execute_job(self, job_id: str) -> None:
-        job = self.store.set_job_status(job_id, "running")
-        self.store.add_job_event(job_id, "job_started", "Job execution started")
+    def _set_status(self, job_id: str, status: JobStatus) -> JobRecord:
+        with current_job_timer.get().measure("store_write_seconds"):
+            job = self.store.set_job_status(job_id, status)
+        JOB_TRANSITIONS.inc(status)
+        return job
+
+    def _add_event(
+        self, job_id: str, event_type: str, message: str, details: Optional[Dict[str, Any]] = None
+    ) -> None:
+        with current_job_timer.get().measure("store_write_seconds"):
+            self.store.add_job_event(job_id, event_type, message, details)
+
+    def _set_report(self, job_id: str, report: Dict[str, Any]) -> None:
+        timer = current_job_timer.get()
+        with timer.measure("store_write_seconds"):
+            report["timings"] = timer.breakdown()
+            self.store.set_job_report(job_id, report)
+
+    def _enqueue_job(self, job: JobRecord) -> JobRecord:
+        job_id = job.job_id
+        if job.status != "queued":
+            job = self._set_status(job_id, "queued")
+        if not self.execute_jobs:
+            self._add_event(
+                job_id, "job_queued", "Job queued for an executor", {"execution": "executor"}
+            )
+            return job
+        depth = self.scheduler.submit(job_id, job.environment, job.risk_level)
+        self._add_event(job_id, "job_queued", "Job queued for execution", {"queue_depth": depth})
+        return job
+
+    async def _execute_job(self, job_id: str, queue_wait_seconds: float = 0.0) -> None:
+        timer = (
+            JobTimer(queue_wait_seconds) if self.settings.job_timings_enabled else DISABLED_TIMER
+        )
+        token = current_job_timer.set(timer)
+        try:
+            await self._run_job(job_id, queue_wait_seconds, timer)
+        finally:
+            current_job_timer.reset(token)
+            self._job_batches.pop(job_id, None)
+            self._prune_job_batches()
+        spill_dir = self.settings.command_output_spill_dir
+        if spill_dir is not None:
+            await asyncio.to_thread(
+                prune_spill_dirs, spill_dir, self.settings.command_output_spill_retention_seconds
+            )
+
+    async def _run_job(self, job_id: str, queue_wait_seconds: float, timer: JobTimer) -> None:
+        job = self._set_status(job_id, "running")
+        self._add_event(
+            job_id,
+            "job_started",
+            "Job execution started",
+            {"queue_wait_seconds": round(queue_wait_seconds, 6)},
+        )
 
         diagnostics = []
+        plan: Optional[DiagnosticPlan] = None
         try:
-            if job.get("run_diagnostics", True):
-                diagnostics = await run_read_only_diagnostics(
-                    repo_root=self.settings.repo_root,
-                    timeout=self.settings.command_timeout_seconds,
-                )
-                self.store.add_job_event(
-                    job_id,
-                    "diagnostics_completed",
-                    "Read-only diagnostics completed",
-                    {"checks": len(diagnostics)},
+            batch = self._job_batches.get(job_id)
+            if job.run_diagnostics:
+                plan = plan_diagnostics(job.goal, job.targets)
+                with timer.measure("diagnostics_seconds"):
+                    diagnostics = await self._collect_diagnostics(job, plan, batch)
+                details: Dict[str, Any] = {"checks": len(diagnostics), "plan": plan.to_dict()}
+                if batch is not None:
+                    details["batch_id"] = batch.batch_id
+                self._add_event(
+                    job_id, "diagnostics_completed", "Read-only diagnostics completed", details
                 )
 
-            summary_prompt = self._build_summary_prompt(job["goal"], diagnostics)
-            summary = await self.llm.chat(
-                "You summarize diagnostics for SRE and coding teams with concise action items.",
-                summary_prompt,
+            with timer.measure("prompt_build_seconds"):
+                reductions = self._reduce_diagnostics(diagnostics)
+                baseline_key = self._baseline_key(job, diagnostics)
+                baseline = (
+                    self.diagnostic_baselines.get(baseline_key)
+                    if self.diagnostic_baselines is not None
+                    and reductions
+                    and not job.force_refresh
+                    else None
+                )
+                summary_prompt = self._build_summary_prompt(
+                    job.goal, diagnostics, reductions, baseline
+                )
+            summary_slot: AsyncContextManager[Any] = (
+                batch.summary_slots if batch is not None else nullcontext()
             )
+            async with summary_slot:
+                summary_stream = self.llm.chat_stream(
+                    SUMMARY_SYSTEM_PROMPT,
+                    summary_prompt,
+                    bypass_cache=job.force_refresh,
+                )
+                summary = await self._stream_summary(job_id, summary_stream)
+            llm_metrics = summary_stream.metrics()
+            snapshot: Optional[BaselineSnapshot] = None
+            if self.diagnostic_baselines is not None and reductions:
+                snapshot = BaselineSnapshot(
+                    job_id=job_id,
+                    tools={
+                        item.command: reductions[item.tool_name]
+                        for item in diagnostics
+                        if item.tool_name in reductions and not item.output_truncated
+                    },
+                )
+                self.diagnostic_baselines.put(baseline_key, snapshot)
+            timer.add("llm_time_to_first_token_seconds", llm_metrics["time_to_first_token_seconds"])
+            timer.add("llm_total_seconds", summary_stream.elapsed_seconds)
 
             report = {
                 "job_id": job_id,
                 "status": "done",
-                "risk_level": job["risk_level"],
+                "risk_level": job.risk_level,
                 "summary": summary,
                 "diagnostics": [result.model_dump() for result in diagnostics],
-                "approvals": job.get("approvals", []),
+                "approvals": [approval.to_dict() for approval in job.approvals],
                 "updated_at": utc_now_iso(),
+                "time_to_first_token_seconds": llm_metrics["time_to_first_token_seconds"],
+                "tokens_per_second": llm_metrics["tokens_per_second"],
+                "prompt_tokens": estimate_tokens(summary_prompt),
+                "diagnostics_snapshot_id": snapshot.snapshot_id if snapshot else None,
+                "diagnostics_baseline": baseline.describe() if baseline else None,
+                "diagnostics_plan": plan.to_dict() if plan else None,
             }
-            self.store.set_job_report(job_id, report)
-            self.store.set_job_status(job_id, "done")
-            self.store.add_job_event(job_id, "job_done", "Job completed successfully")
+            self._set_report(job_id, report)
+            self._set_status(job_id, "done")
+            self._add_event(job_id, "job_done", "Job completed successfully")
         except Exception as exc:  # noqa: BLE001
             report = {
                 "job_id": job_id,
                 "status": "failed",
-                "risk_level": job["risk_level"],
+                "risk_level": job.risk_level,
                 "summary": f"Execution failed: {exc}",
                 "diagnostics": [result.model_dump() for result in diagnostics],
-                "approvals": job.get("approvals", []),
+                "approvals": [approval.to_dict() for approval in job.approvals],
                 "updated_at": utc_now_iso(),
             }
-            self.store.set_job_report(job_id, report)
-            self.store.set_job_status(job_id, "failed")
-            self.store.add_job_event(
+            self._set_report(job_id, report)
+            self._set_status(job_id, "failed")
+            self._add_event(
                 job_id, "job_failed", "Job failed", {"error": str(exc)}
             )
 
+    async def _collect_diagnostics(
+        self, job: JobRecord, plan: DiagnosticPlan, batch: Optional[JobBatch]
+    ) -> List[ToolResult]:
+        job_id = job.job_id
+
+        def run(on_result: Optional[ResultCallback]) -> Awaitable[List[ToolResult]]:
+            return self.diagnostics_runner(
+                repo_root=self.settings.repo_root,
+                timeout=self.settings.command_timeout_seconds,
+                max_parallel=self.policy.max_parallel_commands(),
+                on_result=on_result,
+                cache=self.diagnostics_cache,
+                force_refresh=job.force_refresh,
+                output_limit_bytes=self.settings.command_output_limit_bytes,
+                spill_dir=(
+                    self.settings.command_output_spill_dir / job_id
+                    if self.settings.command_output_spill_dir is not None
+                    else None
+                ),
+                policy=self.policy,
+                commands=plan.commands,
+                cluster_state=self.cluster_state,
+            )
+
+        def on_result(result: ToolResult) -> None:
+            self._record_diagnostic(job_id, result)
+
+        if batch is None:
+            return await run(on_result)
+        snapshot = batch.snapshot(
+            (job.environment, str(self.settings.repo_root), job.force_refresh, plan.commands)
+        )
+        return await snapshot.get(run, on_result)
+
+    def _record_diagnostic(self, job_id: str, result: ToolResult) -> None:
+        current_job_timer.get().record_diagnostic(result)
+        self._add_event(
+            job_id,
+            "diagnostic_completed",
+            f"Diagnostic {result.tool_name} finished",
+            {
+                "tool_name": result.tool_name,
+                "exit_code": result.exit_code,
+                "cached": result.cached,
+                "started_at_utc": result.started_at_utc,
+                "finished_at_utc": result.finished_at_utc,
+            },
+        )
+
+    async def _stream_summary(self, job_id: str, stream: ChatStream) -> str:
+        pending: list[str] = []
+        pending_chars = 0
+        last_flush = time.monotonic()
+
+        def flush() -> None:
+            nonlocal pending_chars, last_flush
+            self._add_event(
+                job_id,
+                "summary_partial",
+                "Partial summary received",
+                {"delta": "".join(pending)},
+            )
+            pending.clear()
+            pending_chars = 0
+            last_flush = time.monotonic()
+
+        async for delta in stream:
+            pending.append(delta)
+            pending_chars += len(delta)
+            if (
+                pending_chars >= SUMMARY_EVENT_FLUSH_CHARS
+                or time.monotonic() - last_flush >= SUMMARY_EVENT_FLUSH_SECONDS
+            ):
+                flush()
+        if pending:
+            flush()
+        return stream.text
+
     @staticmethod
-    def _build_summary_prompt(goal: str, diagnostics: list[Any]) -> str:
-        lines = [f"Goal: {goal}", "", "Diagnostics:"]
+    def _reduce_diagnostics(diagnostics: list[Any]) -> Dict[str, Reduction]:
+        reductions: Dict[str, Reduction] = {}
         for item in diagnostics:
+            if item.exit_code != 0:
+                continue
+            reduction = reduce_output(item.command, item.stdout or "")
+            if reduction is not None:
+                reductions[item.tool_name] = reduction
+        return reductions
+
+    @staticmethod
+    def _baseline_key(job: JobRecord, diagnostics: list[Any]) -> Tuple[str, str]:
+        kube_context = next(
+            (
+                item.stdout.strip()
+                for item in diagnostics
+                if item.tool_name == KUBECTL_CONTEXT.tool_name and item.exit_code == 0
+            ),
+            "",
+        )
+        return job.environment, kube_context
+
+    @staticmethod
+    def _build_summary_prompt(
+        goal: str,
+        diagnostics: list[Any],
+        reductions: Optional[Dict[str, Reduction]] = None,
+        baseline: Optional[BaselineSnapshot] = None,
+    ) -> str:
+        reductions = reductions or {}
+        lines = [f"Goal: {goal}", ""]
+        if baseline is not None:
+            age = max(
+                (
+                    baseline.tool_age(item.command)
+                    for item in diagnostics
+                    if baseline.reduction(item.command) is not None
+                ),
+                default=baseline.describe()["age_seconds"],
+            )
+            lines.append(f"Compared with the diagnostics snapshot taken {age:.0f}s ago.")
+            lines.append("")
+        lines.append("Diagnostics:")
+        for item in diagnostics:
+            reduced = reductions.get(item.tool_name)
+            previous = (
+                baseline.reduction(item.command)
+                if baseline is not None and reduced is not None and not item.output_truncated
+                else None
+            )
             stdout_excerpt = (item.stdout or "").strip().splitlines()[:6]
             stderr_excerpt = (item.stderr or "").strip().splitlines()[:6]
             lines.append(f"- {item.tool_name} | exit={item.exit_code}")
-            if stdout_excerpt:
+            if reduced is not None:
+                summary = reduced.summary
+                if item.output_truncated:
+                    summary += f" (output truncated, {item.stdout_total_lines} lines total)"
+                if previous is not None:
+                    changes = diff_reductions(previous, reduced)
+                    still_flagged = [
+                        key
+                        for key in reduced.flagged_keys
+                        if previous.state.get(key) == reduced.state.get(key)
+                    ]
+                    if changes:
+                        lines.append("  changes since baseline:")
+                        lines.append(f"    baseline {previous.summary}")
+                        lines.append(f"    now {summary}")
+                        lines.extend(f"    {line}" for line in capped(changes))
+                    else:
+                        lines.append("  unchanged since baseline:")
+                        lines.append(f"    {summary}")
+                    if still_flagged:
+                        lines.append(f"    still flagged: {', '.join(capped(still_flagged))}")
+                else:
+                    lines.append("  summary:")
+                    lines.append(f"    {summary}")
+                    lines.extend(f"    {line}" for line in capped(reduced.flagged))
+            elif stdout_excerpt:
                 lines.append("  stdout:")
                 lines.extend(f"    {line}" for line in stdout_excerpt)
             if stderr_excerpt:
@@ -209,36 +662,118 @@ class AgentOrchestrator:
         lines.append("Provide: likely root cause, safe next actions, and rollback notes.")
         return "\n".join(lines)
 
-    def _to_job_response(self, job: Dict[str, Any]) -> JobResponse:
+    def _to_job_response(self, job: JobRecord) -> JobResponse:
         return JobResponse(
-            job_id=job["job_id"],
-            status=job["status"],
-            risk_level=job["risk_level"],
-            required_approvals=job["required_approvals"],
-            environment=job["environment"],
-            created_at=job["created_at"],
-            updated_at=job["updated_at"],
+            job_id=job.job_id,
+            status=job.status,
+            risk_level=job.risk_level,
+            required_approvals=job.required_approvals,
+            environment=job.environment,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
         )
 
-    def get_job_report(self, job_id: str) -> JobReportResponse:
+    def get_job_report(self, job_id: str, include_output: bool = True) -> JobReportResponse:
         job = self.store.get_job(job_id)
         if not job:
             raise KeyError(f"Job not found: {job_id}")
-        report = job.get("report")
-        if not report:
+        report = _thaw(self.store.get_job_report(job_id))
+        if report:
+            diagnostics = []
+            for index, item in enumerate(report.get("diagnostics") or []):
+                result = dict(item)
+                stored = result.pop("stored_outputs", ())
+                for stream in OUTPUT_STREAMS:
+                    if not include_output:
+                        result[stream] = ""
+                    elif stream in stored:
+                        result[stream] = self.store.get_job_output(job_id, index, stream) or ""
+                diagnostics.append(result)
+            report = {**report, "diagnostics": diagnostics}
+        else:
             report = {
                 "job_id": job_id,
-                "status": job["status"],
-                "risk_level": job["risk_level"],
+                "status": job.status,
+                "risk_level": job.risk_level,
                 "summary": "Job report is not available yet.",
                 "diagnostics": [],
-                "approvals": job.get("approvals", []),
-                "updated_at": job["updated_at"],
+                "approvals": [approval.to_dict() for approval in job.approvals],
+                "updated_at": job.updated_at,
             }
         return JobReportResponse(**report)
 
-    def get_job_events(self, job_id: str) -> list[Dict[str, Any]]:
+    def get_job_output(
+        self, job_id: str, index: int, stream: str, unit: str, offset: int, limit: int
+    ) -> ToolOutputPage:
         job = self.store.get_job(job_id)
         if not job:
             raise KeyError(f"Job not found: {job_id}")
-        return self.store.get_job_events(job_id)
+        diagnostics = (self.store.get_job_report(job_id) or {}).get("diagnostics") or []
+        if not 0 <= index < len(diagnostics):
+            raise KeyError(f"Job {job_id} has no diagnostic result {index}")
+        text = self.store.get_job_output(job_id, index, stream) or ""
+        content, total, next_offset = slice_output(text, unit, offset, limit)
+        return ToolOutputPage(
+            job_id=job_id,
+            index=index,
+            tool_name=diagnostics[index].get("tool_name", ""),
+            stream=stream,
+            unit=unit,
+            offset=offset,
+            total=total,
+            next_offset=next_offset,
+            content=content,
+        )
+
+    def get_job_events(self, job_id: str, since: int = 0) -> list[EventRecord]:
+        job = self.store.get_job(job_id)
+        if not job:
+            raise KeyError(f"Job not found: {job_id}")
+        return self.store.get_job_events(job_id, since)
+
+    async def wait_for_job_events(
+        self, job_id: str, since: int, timeout: float
+    ) -> list[EventRecord]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            waiter = self.events.waiter(job_id)
+            try:
+                events = self.store.get_job_events(job_id, since)
+                remaining = deadline - loop.time()
+                if events or remaining <= 0:
+                    return events
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return []
+            finally:
+                self.events.discard(job_id, waiter)
+
+    async def watch_job_events(
+        self, job_id: str, since: int = 0, keepalive_seconds: float = 15.0
+    ) -> AsyncIterator[list[EventRecord]]:
+        while True:
+            events = self.store.get_job_events(job_id, since)
+            if not events:
+                job = self.store.get_job(job_id)
+                if job is None:
+                    return
+                if job.status in TERMINAL_JOB_STATUSES:
+                    # The terminal event is written after the status, possibly by an executor
+                    # process that has not flushed it yet.
+                    history = self.store.get_job_events(job_id)
+                    if not history or history[-1].event_type in TERMINAL_EVENT_TYPES:
+                        return
+                    events = await self.wait_for_job_events(
+                        job_id, since, TERMINAL_EVENT_GRACE_SECONDS
+                    )
+                    if not events:
+                        return
+                else:
+                    events = await self.wait_for_job_events(job_id, since, keepalive_seconds)
+            if events:
+                since = events[-1].seq
+            yield events
+            if any(event.event_type in TERMINAL_EVENT_TYPES for event in events):
+                return
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from agent.tools import KUBECTL_CONTEXT, DiagnosticCommand
+
+
+DOMAINS = ("repo", "kube", "helm")
+CLUSTER_COST = 5
+
+K8S_NAME = r"[a-z0-9](?:[-a-z0-9]{0,61}[a-z0-9])?"
+
+DOMAIN_TERMS: Dict[str, FrozenSet[str]] = {
+    "repo": frozenset(
+        {
+            "git", "commit", "commits", "branch", "merge", "rebase", "diff", "code", "test",
+            "tests", "build", "ci", "pr", "refactor", "lint", "compile", "repo", "repository",
+            "module", "function", "dockerfile", "makefile", "changelog",
+        }
+    ),
+    "kube": frozenset(
+        {
+            "pod", "pods", "deployment", "deployments", "crashloop", "crashloopbackoff",
+            "imagepullbackoff", "oom", "oomkilled", "evicted", "kubectl", "k8s", "kubernetes",
+            "container", "containers", "node", "nodes", "service", "ingress", "replica",
+            "replicas", "rollout", "probe", "statefulset", "daemonset", "cronjob", "hpa",
+            "cluster", "namespace", "restart", "restarts", "configmap",
+        }
+    ),
+    "helm": frozenset(
+        {"helm", "release", "releases", "chart", "charts", "upgrade", "rollback", "values"}
+    ),
+}
+WORD = re.compile(r"[a-z0-9][a-z0-9-]*")
+NOT_A_NAME = frozenset(
+    {
+        "a", "an", "the", "this", "that", "these", "each", "every", "all", "any", "some",
+        "same", "which", "what", "my", "our", "its", "their", "one", "per", "other",
+        "another", "new", "wrong", "target", "current", "given", "is", "was", "are", "in",
+        "of", "for", "to", "from", "on", "and", "or", "with", "where",
+    }
+)
+NAMESPACE_PATTERNS = (
+    re.compile(rf"\bnamespace[s]?\s+[`'\"]?({K8S_NAME})\b"),
+    re.compile(rf"(?:^|\s)(?:-n|--namespace[= ])\s*({K8S_NAME})\b"),
+    re.compile(rf"\bns[/ ]({K8S_NAME})\b"),
+    re.compile(rf"\b({K8S_NAME})\s+namespace\b"),
+)
+RELEASE_PATTERNS = (
+    re.compile(rf"\bhelm\s+release\s+[`'\"]?({K8S_NAME})\b"),
+    re.compile(rf"\brelease\s+[`'\"]({K8S_NAME})[`'\"]"),
+    re.compile(rf"\brelease[=:]\s*({K8S_NAME})\b"),
+)
+
+
+@dataclass(frozen=True)
+class DiagnosticTarget:
+    namespace: Optional[str] = None
+    release: Optional[str] = None
+    label_selector: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            key: value
+            for key, value in (
+                ("namespace", self.namespace),
+                ("release", self.release),
+                ("label_selector", self.label_selector),
+            )
+            if value
+        }
+
+
+@dataclass(frozen=True)
+class DiagnosticTool:
+    tool_name: str
+    domain: str
+    scope: str
+    cost: int
+    command: Tuple[str, ...]
+    cache_ttl: float = 0.0
+    selector: bool = False
+
+    def build(self, target: DiagnosticTarget) -> Optional[DiagnosticCommand]:
+        if self.scope == "namespace" and not target.namespace:
+            return None
+        if self.scope == "release" and not target.release:
+            return None
+        argv = [
+            part.format(namespace=target.namespace or "", release=target.release or "")
+            for part in self.command
+        ]
+        if self.scope == "release" and target.namespace:
+            argv.append(f"--namespace={target.namespace}")
+        if self.selector and target.label_selector:
+            argv.append(f"--selector={target.label_selector}")
+        return DiagnosticCommand(
+            self.tool_name,
+            tuple(argv),
+            cache_ttl=self.cache_ttl,
+            cluster_scoped=self.domain != "repo",
+        )
+
+
+DIAGNOSTIC_TOOLS: Tuple[DiagnosticTool, ...] = (
+    DiagnosticTool("git_status", "repo", "repo", 1, ("git", "status", "--short"), cache_ttl=2.0),
+    DiagnosticTool(
+        "git_branch", "repo", "repo", 1, ("git", "branch", "--show-current"), cache_ttl=5.0
+    ),
+    DiagnosticTool(
+        "git_last_commit", "repo", "repo", 1, ("git", "log", "-1", "--oneline"), cache_ttl=5.0
+    ),
+    DiagnosticTool("git_diff_stat", "repo", "repo", 2, ("git", "diff", "--stat"), cache_ttl=2.0),
+    DiagnosticTool(
+        "kubectl_pods",
+        "kube",
+        "namespace",
+        2,
+        ("kubectl", "get", "pods", "--namespace={namespace}"),
+        cache_ttl=15.0,
+        selector=True,
+    ),
+    DiagnosticTool(
+        "kubectl_warning_events",
+        "kube",
+        "namespace",
+        2,
+        ("kubectl", "get", "events", "--namespace={namespace}", "--field-selector=type=Warning"),
+        cache_ttl=15.0,
+    ),
+    DiagnosticTool(
+        "kubectl_deployments",
+        "kube",
+        "namespace",
+        2,
+        ("kubectl", "get", "deployments", "--namespace={namespace}"),
+        cache_ttl=15.0,
+        selector=True,
+    ),
+    DiagnosticTool(
+        "kubectl_pods_all",
+        "kube",
+        "cluster",
+        CLUSTER_COST,
+        ("kubectl", "get", "pods", "-A"),
+        cache_ttl=15.0,
+        selector=True,
+    ),
+    DiagnosticTool(
+        "helm_history", "helm", "release", 2, ("helm", "history", "{release}", "--max", "5"),
+        cache_ttl=30.0,
+    ),
+    DiagnosticTool(
+        "helm_list", "helm", "namespace", 2, ("helm", "list", "--namespace={namespace}"),
+        cache_ttl=30.0,
+    ),
+    DiagnosticTool(
+        "helm_list_all", "helm", "cluster", CLUSTER_COST, ("helm", "list", "-A"), cache_ttl=30.0
+    ),
+)
+
+
+@dataclass(frozen=True)
+class DiagnosticPlan:
+    domains: Tuple[str, ...]
+    target: DiagnosticTarget
+    commands: Tuple[DiagnosticCommand, ...]
+    skipped: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def cost(self) -> int:
+        costs = {tool.tool_name: tool.cost for tool in DIAGNOSTIC_TOOLS}
+        return sum(costs.get(command.tool_name, 1) for command in self.commands)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "domains": list(self.domains),
+            "targets": self.target.to_dict(),
+            "tools": [command.tool_name for command in self.commands],
+            "skipped": list(self.skipped),
+            "cost": self.cost,
+        }
+
+
+def _first_match(patterns: Tuple[re.Pattern[str], ...], text: str) -> Optional[str]:
+    for pattern in patterns:
+        for match in pattern.finditer(text):
+            if match.group(1) not in NOT_A_NAME:
+                return match.group(1)
+    return None
+
+
+def resolve_target(goal: str, targets: Optional[Mapping[str, Any]] = None) -> DiagnosticTarget:
+    targets = targets or {}
+    text = goal.lower()
+    return DiagnosticTarget(
+        namespace=targets.get("namespace") or _first_match(NAMESPACE_PATTERNS, text),
+        release=targets.get("release") or _first_match(RELEASE_PATTERNS, text),
+        label_selector=targets.get("label_selector"),
+    )
+
+
+def goal_domains(goal: str, target: DiagnosticTarget) -> Tuple[str, ...]:
+    words = set(WORD.findall(goal.lower()))
+    selected = {domain for domain, terms in DOMAIN_TERMS.items() if words & terms}
+    if target.namespace or target.label_selector:
+        selected.add("kube")
+    if target.release:
+        selected.add("helm")
+    return tuple(domain for domain in DOMAINS if domain in selected) or DOMAINS
+
+
+def plan_diagnostics(
+    goal: str,
+    targets: Optional[Mapping[str, Any]] = None,
+    tools: Tuple[DiagnosticTool, ...] = DIAGNOSTIC_TOOLS,
+) -> DiagnosticPlan:
+    target = resolve_target(goal, targets)
+    domains = goal_domains(goal, target)
+    commands: List[DiagnosticCommand] = []
+    skipped: List[str] = []
+    if "kube" in domains or "helm" in domains:
+        commands.append(KUBECTL_CONTEXT)
+    for domain in domains:
+        scoped = [
+            command
+            for tool in tools
+            if tool.domain == domain and tool.scope != "cluster"
+            for command in [tool.build(target)]
+            if command is not None
+        ]
+        commands.extend(scoped)
+        for tool in tools:
+            if tool.domain != domain or tool.scope != "cluster":
+                continue
+            if scoped:
+                skipped.append(tool.tool_name)
+                continue
+            command = tool.build(target)
+            if command is not None:
+                commands.append(command)
+    planned = {command.tool_name for command in commands}
+    skipped.extend(
+        tool.tool_name
+        for tool in tools
+        if tool.tool_name not in planned and tool.tool_name not in skipped
+    )
+    return DiagnosticPlan(
+        domains=domains, target=target, commands=tuple(commands), skipped=tuple(skipped)
+    )
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import re
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple, Union
 
 import yaml
 
 from agent.models import EnvironmentName, RiskLevel
+from agent.risk import DEFAULT_RISK_KEYWORDS, RiskClassification, RiskClassifier
 
 
 RISK_ORDER: Dict[RiskLevel, int] = {"R0": 0, "R1": 1, "R2": 2, "R3": 3}
+KNOWN_ENVIRONMENTS: Tuple[str, ...] = ("dev", "stage", "prod")
+_GLOB_CHARS = frozenset("*?[")
 
 
 def _ensure_risk(value: str) -> RiskLevel:
@@ -17,55 +24,248 @@ def _ensure_risk(value: str) -> RiskLevel:
     return value  # type: ignore[return-value]
 
 
+def _normalize_command(command: Union[str, Sequence[str]]) -> str:
+    text = command if isinstance(command, str) else " ".join(command)
+    return " ".join(text.split())
+
+
+def _glob_to_regex(pattern: str) -> str:
+    body, tail = pattern, ""
+    if pattern.endswith(" *"):
+        body, tail = pattern[:-2], "(?: .*)?"
+    parts: List[str] = []
+    for char in body:
+        if char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts) + tail
+
+
+class CommandMatcher:
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = [_normalize_command(pattern) for pattern in patterns]
+        grouped: Dict[str, List[int]] = {}
+        for index, pattern in enumerate(self.patterns):
+            head = pattern.split(" ", 1)[0]
+            key = "" if _GLOB_CHARS.intersection(head) else head
+            grouped.setdefault(key, []).append(index)
+        self._buckets: Dict[str, Pattern[str]] = {
+            key: re.compile(
+                "|".join(f"(?P<p{index}>{_glob_to_regex(self.patterns[index])})" for index in indexes),
+                re.DOTALL,
+            )
+            for key, indexes in grouped.items()
+        }
+        self._wildcard = self._buckets.pop("", None)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def match(self, command: str) -> Optional[str]:
+        head = command.split(" ", 1)[0]
+        for regex in (self._buckets.get(head), self._wildcard):
+            if regex is None:
+                continue
+            found = regex.fullmatch(command)
+            if found is not None and found.lastgroup is not None:
+                return self.patterns[int(found.lastgroup[1:])]
+        return None
+
+
+@dataclass(frozen=True)
+class Authorization:
+    allowed: bool
+    command: str
+    reason: str
+    pattern: Optional[str] = None
+
+
+class CompiledPolicy:
+    def __init__(self, policy_data: Dict[str, Any]) -> None:
+        self.data = policy_data
+        self.environment_controls: Dict[str, Any] = policy_data.get("environment_controls", {}) or {}
+        self.approval_rules: List[Dict[str, Any]] = policy_data.get("approval_rules", []) or []
+        tool_controls = policy_data.get("tool_controls", {}) or {}
+        self.allowlist: List[str] = list(tool_controls.get("allowlist", []) or [])
+        self.denylist: List[str] = list(tool_controls.get("denylist", []) or [])
+        self.allow = CommandMatcher(self.allowlist)
+        self.deny = CommandMatcher(self.denylist)
+        risk_config = policy_data.get("risk_classification", {}) or {}
+        self.risk = RiskClassifier(risk_config.get("keywords") or DEFAULT_RISK_KEYWORDS)
+
+        defaults = policy_data.get("defaults", {}) or {}
+        self.max_parallel_commands = max(1, int(defaults.get("max_parallel_commands", 1)))
+
+        self.max_auto_risk: Dict[str, RiskLevel] = {
+            env: _ensure_risk((cfg or {}).get("max_auto_risk", "R0"))
+            for env, cfg in self.environment_controls.items()
+        }
+        self._rules: List[Tuple[Optional[str], int, int]] = [
+            (
+                (rule.get("when", {}) or {}).get("environment"),
+                RISK_ORDER[_ensure_risk((rule.get("when", {}) or {}).get("min_risk", "R0"))],
+                int(rule.get("required_approvals", 0)),
+            )
+            for rule in self.approval_rules
+        ]
+        environments = set(KNOWN_ENVIRONMENTS) | set(self.max_auto_risk)
+        environments |= {env for env, _, _ in self._rules if env}
+        self.approvals: Dict[Tuple[str, str], int] = {
+            (risk, env): self._compute_approvals(risk, env)
+            for risk in RISK_ORDER
+            for env in environments
+        }
+
+    def _compute_approvals(self, risk: RiskLevel, environment: str) -> int:
+        level = RISK_ORDER[risk]
+        max_required = 0
+        for env, min_risk, required in self._rules:
+            if (not env or env == environment) and level >= min_risk:
+                max_required = max(max_required, required)
+        if level > RISK_ORDER[self.max_auto_risk.get(environment, "R0")]:
+            max_required = max(max_required, 1)
+        return max_required
+
+    def required_approvals(self, risk: RiskLevel, environment: str) -> int:
+        required = self.approvals.get((risk, environment))
+        if required is None:
+            required = self._compute_approvals(_ensure_risk(risk), environment)
+        return required
+
+    def authorize(self, command: Union[str, Sequence[str]]) -> Authorization:
+        normalized = _normalize_command(command)
+        denied_by = self.deny.match(normalized)
+        if denied_by is not None:
+            return Authorization(False, normalized, "denylist", denied_by)
+        if not self.allowlist:
+            return Authorization(True, normalized, "no allowlist configured")
+        allowed_by = self.allow.match(normalized)
+        if allowed_by is None:
+            return Authorization(False, normalized, "not in allowlist")
+        return Authorization(True, normalized, "allowlist", allowed_by)
+
+
+def _load_policy_data(policy_path: Path) -> Dict[str, Any]:
+    with policy_path.open("r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _file_signature(policy_path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = policy_path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 class PolicyEngine:
-    def __init__(self, policy_data: Dict[str, Any]):
-        self.policy = policy_data
-        self.environment_controls = policy_data.get("environment_controls", {})
-        self.approval_rules = policy_data.get("approval_rules", [])
+    def __init__(self, policy_data: Dict[str, Any], path: Optional[Path] = None):
+        self._compiled = CompiledPolicy(policy_data)
+        self.path = path
+        self._signature = _file_signature(path) if path is not None else None
+        self._watch_task: Optional[asyncio.Task[None]] = None
+        self._stats: Dict[str, Any] = {
+            "reloads": 0,
+            "reload_errors": 0,
+            "last_error": None,
+            "loaded_at": time.time(),
+        }
 
     @classmethod
     def from_file(cls, policy_path: Path) -> "PolicyEngine":
         if not policy_path.exists():
             raise FileNotFoundError(f"Policy file not found: {policy_path}")
+        return cls(_load_policy_data(policy_path), path=policy_path)
+
+    @property
+    def policy(self) -> Dict[str, Any]:
+        return self._compiled.data
 
-        with policy_path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-        return cls(data)
+    @property
+    def environment_controls(self) -> Dict[str, Any]:
+        return self._compiled.environment_controls
+
+    @property
+    def approval_rules(self) -> List[Dict[str, Any]]:
+        return self._compiled.approval_rules
 
     @staticmethod
     def compare_risk(left: RiskLevel, right: RiskLevel) -> int:
         return RISK_ORDER[left] - RISK_ORDER[right]
 
     def max_auto_risk(self, environment: EnvironmentName) -> RiskLevel:
-        env_cfg = self.environment_controls.get(environment, {})
-        return _ensure_risk(env_cfg.get("max_auto_risk", "R0"))
+        return self._compiled.max_auto_risk.get(environment, "R0")
 
     def required_approvals(self, risk: RiskLevel, environment: EnvironmentName) -> int:
-        max_required = 0
-        for rule in self.approval_rules:
-            if self._rule_matches(rule, risk, environment):
-                max_required = max(max_required, int(rule.get("required_approvals", 0)))
-
-        if self.compare_risk(risk, self.max_auto_risk(environment)) > 0:
-            max_required = max(max_required, 1)
-        return max_required
+        return self._compiled.required_approvals(risk, environment)
 
     def requires_approval(self, risk: RiskLevel, environment: EnvironmentName) -> bool:
         return self.required_approvals(risk, environment) > 0
 
-    def _rule_matches(
-        self, rule: Dict[str, Any], risk: RiskLevel, environment: EnvironmentName
-    ) -> bool:
-        when = rule.get("when", {})
-        env = when.get("environment")
-        if env and env != environment:
-            return False
-
-        min_risk = _ensure_risk(when.get("min_risk", "R0"))
-        return self.compare_risk(risk, min_risk) >= 0
+    def max_parallel_commands(self) -> int:
+        return self._compiled.max_parallel_commands
 
     def allowed_tools(self) -> Iterable[str]:
-        return self.policy.get("tool_controls", {}).get("allowlist", [])
+        return self._compiled.allowlist
 
     def denied_tools(self) -> Iterable[str]:
-        return self.policy.get("tool_controls", {}).get("denylist", [])
+        return self._compiled.denylist
+
+    def authorize(self, command: Union[str, Sequence[str]]) -> Authorization:
+        return self._compiled.authorize(command)
+
+    def classify_risk(self, text: str) -> RiskClassification:
+        return self._compiled.risk.classify(text)
+
+    def classify_risk_many(self, texts: Sequence[str]) -> List[RiskClassification]:
+        return self._compiled.risk.classify_many(texts)
+
+    def reload_if_changed(self) -> bool:
+        if self.path is None:
+            return False
+        signature = _file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            compiled = CompiledPolicy(_load_policy_data(self.path))
+        except (OSError, yaml.YAMLError, ValueError, TypeError, AttributeError) as exc:
+            self._stats["reload_errors"] += 1
+            self._stats["last_error"] = f"{type(exc).__name__}: {exc}"
+            return False
+        self._compiled = compiled
+        self._stats["reloads"] += 1
+        self._stats["last_error"] = None
+        self._stats["loaded_at"] = time.time()
+        return True
+
+    def start(self, reload_interval_seconds: float) -> None:
+        if self._watch_task is None and self.path is not None and reload_interval_seconds > 0:
+            self._watch_task = asyncio.create_task(self._watch_loop(reload_interval_seconds))
+
+    async def stop(self) -> None:
+        task, self._watch_task = self._watch_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _watch_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload_if_changed)
+
+    def stats(self) -> Dict[str, Any]:
+        compiled = self._compiled
+        return {
+            "path": str(self.path) if self.path is not None else None,
+            "policy_name": compiled.data.get("policy_name"),
+            "version": compiled.data.get("version"),
+            "watching": self._watch_task is not None,
+            "allow_patterns": len(compiled.allow),
+            "deny_patterns": len(compiled.deny),
+            "risk_patterns": len(compiled.risk),
+            **self._stats,
+        }
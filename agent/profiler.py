@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import FrameType
+from typing import Dict, List, Optional
+
+
+IDLE_LEAF_FUNCTIONS = frozenset({"select", "poll", "wait", "_wait_for_tstate_lock", "get"})
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Profile:
+    samples: int
+    duration_seconds: float
+    interval_seconds: float
+    stacks: Dict[str, int]
+
+    def collapsed(self) -> str:
+        ordered = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in ordered)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _stack(frame: Optional[FrameType]) -> List[str]:
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    def __init__(self, max_seconds: float = 60.0) -> None:
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def run(
+        self, seconds: float, interval_seconds: float = 0.005, include_idle: bool = False
+    ) -> Profile:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already being collected")
+        try:
+            return self._sample(
+                min(max(seconds, 0.0), self.max_seconds), max(interval_seconds, 0.001), include_idle
+            )
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval_seconds: float, include_idle: bool) -> Profile:
+        own_thread = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if not include_idle and frame.f_code.co_name in IDLE_LEAF_FUNCTIONS:
+                    continue
+                thread_name = names.get(thread_id, str(thread_id))
+                stacks[";".join([thread_name, *_stack(frame)])] += 1
+            samples += 1
+            if time.perf_counter() >= deadline:
+                break
+            time.sleep(interval_seconds)
+        return Profile(
+            samples=samples,
+            duration_seconds=round(time.perf_counter() - started, 3),
+            interval_seconds=interval_seconds,
+            stacks=dict(stacks),
+        )
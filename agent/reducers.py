@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import re
+import shlex
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+MAX_REDUCED_RECORDS = 20
+HEALTHY_POD_STATUSES = frozenset({"Running", "Completed", "Succeeded"})
+HEALTHY_RELEASE_STATUSES = frozenset({"deployed"})
+COLUMN_GAP = re.compile(r"\t+ *|  +")
+RESTARTS = re.compile(r"^(\d+)")
+
+
+@dataclass(frozen=True)
+class Reduction:
+    summary: str
+    flagged: List[str] = field(default_factory=list)
+    flagged_keys: List[str] = field(default_factory=list)
+    state: Dict[str, str] = field(default_factory=dict)
+
+
+Reducer = Callable[[str], Optional[Reduction]]
+
+
+def _columns(header: str) -> List[Tuple[str, int]]:
+    columns: List[Tuple[str, int]] = []
+    position = 0
+    for gap in COLUMN_GAP.finditer(header.rstrip()):
+        name = header[position : gap.start()].strip()
+        if name:
+            columns.append((name.upper(), position))
+        position = gap.end()
+    name = header[position:].strip()
+    if name:
+        columns.append((name.upper(), position))
+    return columns
+
+
+def parse_table(text: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return [], []
+    header = lines[0]
+    columns = _columns(header)
+    names = [name for name, _ in columns]
+    rows: List[Dict[str, str]] = []
+    bounds = [start for _, start in columns[1:]]
+    for line in lines[1:]:
+        values = [value.strip() for value in COLUMN_GAP.split(line.strip())]
+        if len(values) != len(columns):
+            values = [
+                line[start:end].strip()
+                for (_, start), end in zip(columns, bounds + [len(line)])
+            ]
+        rows.append(dict(zip(names, values)))
+    return names, rows
+
+
+def capped(records: List[str]) -> List[str]:
+    if len(records) <= MAX_REDUCED_RECORDS:
+        return records
+    hidden = len(records) - MAX_REDUCED_RECORDS
+    return records[:MAX_REDUCED_RECORDS] + [f"... {hidden} more not shown"]
+
+
+def _counts(counter: Counter) -> str:
+    return ", ".join(f"{key}={value}" for key, value in counter.most_common())
+
+
+def _restarts(value: str) -> int:
+    match = RESTARTS.match(value)
+    return int(match.group(1)) if match else 0
+
+
+def _ready_short(value: str) -> bool:
+    ready, _, total = value.partition("/")
+    return ready.isdigit() and total.isdigit() and int(ready) < int(total)
+
+
+def reduce_kubectl_pods(stdout: str) -> Optional[Reduction]:
+    names, rows = parse_table(stdout)
+    if not {"NAME", "READY", "STATUS"} <= set(names):
+        return None
+    statuses: Counter = Counter()
+    state: Dict[str, str] = {}
+    flagged: List[Tuple[int, str, str]] = []
+    for row in rows:
+        status = row.get("STATUS", "")
+        statuses[status] += 1
+        restarts = _restarts(row.get("RESTARTS", ""))
+        name = row["NAME"]
+        if row.get("NAMESPACE"):
+            name = f"{row['NAMESPACE']}/{name}"
+        state[name] = f"status={status} ready={row.get('READY', '')} restarts={restarts}"
+        unhealthy = status not in HEALTHY_POD_STATUSES
+        not_ready = status == "Running" and _ready_short(row.get("READY", ""))
+        if not (unhealthy or not_ready or restarts):
+            continue
+        flagged.append(
+            (
+                0 if unhealthy else 1 if not_ready else 2,
+                name,
+                f"{name} {state[name]}" + (f" age={row['AGE']}" if row.get("AGE") else ""),
+            )
+        )
+    flagged.sort(key=lambda item: item[0])
+    return Reduction(
+        summary=f"pods: {len(rows)} total ({_counts(statuses)}); {len(flagged)} flagged",
+        flagged=[record for _, _, record in flagged],
+        flagged_keys=[key for _, key, _ in flagged],
+        state=state,
+    )
+
+
+def reduce_kubectl_deployments(stdout: str) -> Optional[Reduction]:
+    names, rows = parse_table(stdout)
+    if not {"NAME", "READY"} <= set(names):
+        return None
+    state: Dict[str, str] = {}
+    flagged: List[str] = []
+    flagged_keys: List[str] = []
+    for row in rows:
+        name = row["NAME"]
+        if row.get("NAMESPACE"):
+            name = f"{row['NAMESPACE']}/{name}"
+        ready = row.get("READY", "")
+        available = row.get("AVAILABLE", "")
+        state[name] = f"ready={ready} up_to_date={row.get('UP-TO-DATE', '')} available={available}"
+        desired = ready.partition("/")[2]
+        unavailable = available.isdigit() and desired.isdigit() and int(available) < int(desired)
+        if _ready_short(ready) or unavailable:
+            flagged.append(f"{name} {state[name]}")
+            flagged_keys.append(name)
+    return Reduction(
+        summary=f"deployments: {len(rows)} total; {len(flagged)} not fully available",
+        flagged=flagged,
+        flagged_keys=flagged_keys,
+        state=state,
+    )
+
+
+def reduce_helm_list(stdout: str) -> Optional[Reduction]:
+    names, rows = parse_table(stdout)
+    if not {"NAME", "STATUS"} <= set(names):
+        return None
+    statuses: Counter = Counter()
+    state: Dict[str, str] = {}
+    flagged: List[str] = []
+    flagged_keys: List[str] = []
+    for row in rows:
+        status = row.get("STATUS", "").lower()
+        statuses[status] += 1
+        name = row["NAME"]
+        if row.get("NAMESPACE"):
+            name = f"{row['NAMESPACE']}/{name}"
+        details = [f"status={status}"]
+        for column, label in (("REVISION", "revision"), ("CHART", "chart")):
+            if row.get(column):
+                details.append(f"{label}={row[column]}")
+        state[name] = " ".join(details)
+        if status in HEALTHY_RELEASE_STATUSES:
+            continue
+        if row.get("UPDATED"):
+            details.append(f"updated={row['UPDATED']}")
+        flagged.append(f"{name} " + " ".join(details))
+        flagged_keys.append(name)
+    return Reduction(
+        summary=f"releases: {len(rows)} total ({_counts(statuses)}); {len(flagged)} flagged",
+        flagged=flagged,
+        flagged_keys=flagged_keys,
+        state=state,
+    )
+
+
+GIT_STATUS_KINDS = {
+    "M": "modified",
+    "A": "added",
+    "D": "deleted",
+    "R": "renamed",
+    "C": "copied",
+    "T": "typechange",
+}
+GIT_STATUS_CODES = frozenset(" MADRCTU?!")
+
+
+def _git_change(code: str) -> str:
+    if code == "??":
+        return "untracked"
+    if code == "!!":
+        return "ignored"
+    if "U" in code or code in ("AA", "DD"):
+        return "conflicted"
+    for flag in code:
+        if flag in GIT_STATUS_KINDS:
+            return GIT_STATUS_KINDS[flag]
+    return "changed"
+
+
+def reduce_git_status(stdout: str) -> Optional[Reduction]:
+    lines = [line for line in stdout.splitlines() if line.strip()]
+    if not lines:
+        return Reduction(summary="working tree clean")
+    changes: Counter = Counter()
+    state: Dict[str, str] = {}
+    ranked: List[Tuple[int, str]] = []
+    order = ("conflicted", "deleted", "modified", "renamed", "added", "untracked")
+    for line in lines:
+        if len(line) < 4 or line[2] != " " or not set(line[:2]) <= GIT_STATUS_CODES:
+            return None
+        kind = _git_change(line[:2])
+        changes[kind] += 1
+        state[line[3:]] = kind
+        ranked.append((order.index(kind) if kind in order else len(order), line[3:]))
+    ranked.sort(key=lambda item: item[0])
+    return Reduction(
+        summary=f"working tree dirty: {len(lines)} paths ({_counts(changes)})",
+        flagged=[f"{state[path]} {path}" for _, path in ranked],
+        flagged_keys=[path for _, path in ranked],
+        state=state,
+    )
+
+
+def diff_reductions(previous: Reduction, current: Reduction) -> List[str]:
+    changes: List[str] = []
+    for key, value in current.state.items():
+        before = previous.state.get(key)
+        if before is None:
+            changes.append(f"added {key} {value}")
+        elif before != value:
+            changes.append(f"changed {key} {before} -> {value}")
+    changes.extend(f"removed {key}" for key in previous.state if key not in current.state)
+    return changes
+
+
+REDUCERS: Tuple[Tuple[Tuple[str, ...], Reducer], ...] = (
+    (("kubectl", "get", "pods"), reduce_kubectl_pods),
+    (("kubectl", "get", "pod"), reduce_kubectl_pods),
+    (("kubectl", "get", "po"), reduce_kubectl_pods),
+    (("kubectl", "get", "deployments"), reduce_kubectl_deployments),
+    (("kubectl", "get", "deployment"), reduce_kubectl_deployments),
+    (("kubectl", "get", "deploy"), reduce_kubectl_deployments),
+    (("helm", "list"), reduce_helm_list),
+    (("helm", "ls"), reduce_helm_list),
+    (("git", "status"), reduce_git_status),
+)
+TABLE_OUTPUT_FORMATS = ("", "wide", "table")
+GIT_SHORT_FLAGS = ("-s", "--short", "--porcelain", "--porcelain=v1")
+
+
+def _output_format(argv: Sequence[str]) -> str:
+    for index, arg in enumerate(argv):
+        if arg in ("-o", "--output") and index + 1 < len(argv):
+            return argv[index + 1]
+        if arg.startswith("--output="):
+            return arg.split("=", 1)[1]
+        if arg.startswith("-o") and not arg.startswith("--"):
+            return arg[2:]
+    return ""
+
+
+def reducer_for(command: str) -> Optional[Reducer]:
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if argv[:2] == ["git", "status"]:
+        if "-z" in argv or not any(arg in GIT_SHORT_FLAGS for arg in argv):
+            return None
+    elif _output_format(argv) not in TABLE_OUTPUT_FORMATS:
+        return None
+    for prefix, reducer in REDUCERS:
+        if tuple(argv[: len(prefix)]) == prefix:
+            return reducer
+    return None
+
+
+def reduce_output(command: str, stdout: str) -> Optional[Reduction]:
+    reducer = reducer_for(command)
+    if reducer is None:
+        return None
+    try:
+        return reducer(stdout)
+    except (IndexError, KeyError, ValueError):
+        return None
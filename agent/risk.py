@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from agent.models import RiskLevel
+
+
+RISK_SEVERITY: Dict[RiskLevel, int] = {"R0": 0, "R1": 1, "R2": 2, "R3": 3}
+
+DEFAULT_RISK_KEYWORDS: Dict[RiskLevel, Tuple[str, ...]] = {
+    "R3": (
+        "wipe*",
+        "wiping",
+        "purge*",
+        "purging",
+        "delete all",
+        "deleting all",
+        "drop database",
+        "dropping database",
+        "destroy*",
+        "format disk",
+        "formatting disk",
+    ),
+    "R2": (
+        "prod deploy",
+        "production deploy",
+        "ingress change",
+        "schema migration",
+        "force push",
+        "force-push",
+        "push --force",
+        "rewrite history",
+        "leaked secret",
+    ),
+    "R1": (
+        "restart*",
+        "scale*",
+        "scaling",
+        "patch*",
+        "update dependency",
+        "updating dependency",
+        "upgrade*",
+        "upgrading",
+    ),
+}
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+@dataclass(frozen=True)
+class RiskMatch:
+    pattern: str
+    risk_level: RiskLevel
+
+
+@dataclass(frozen=True)
+class RiskClassification:
+    risk_level: RiskLevel
+    matches: Tuple[RiskMatch, ...] = ()
+
+    @property
+    def matched_patterns(self) -> List[str]:
+        return [match.pattern for match in self.matches]
+
+
+class RiskClassifier:
+    def __init__(self, keywords: Mapping[RiskLevel, Iterable[str]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self.patterns: List[Tuple[str, RiskLevel]] = []
+        self._lengths: List[int] = []
+        self._prefix: List[bool] = []
+        seen: Dict[str, int] = {}
+        for risk_level, words in keywords.items():
+            if risk_level not in RISK_SEVERITY:
+                raise ValueError(f"Invalid risk level: {risk_level}")
+            for word in words:
+                pattern = " ".join(str(word).lower().split())
+                prefix = pattern.endswith("*")
+                text = pattern.rstrip("*").rstrip()
+                if not text:
+                    continue
+                existing = seen.get(pattern)
+                if existing is not None:
+                    if RISK_SEVERITY[risk_level] > RISK_SEVERITY[self.patterns[existing][1]]:
+                        self.patterns[existing] = (pattern, risk_level)
+                    continue
+                seen[pattern] = len(self.patterns)
+                self.patterns.append((pattern, risk_level))
+                self._lengths.append(len(text))
+                self._prefix.append(prefix)
+                self._insert(text, len(self.patterns) - 1)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _insert(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def classify(self, text: str) -> RiskClassification:
+        lowered = " ".join(text.lower().split())
+        goto, fail, output = self._goto, self._fail, self._output
+        matches: Dict[int, RiskMatch] = {}
+        highest: RiskLevel = "R0"
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            mid_word = end < len(lowered) and _is_word_char(lowered[end])
+            for index in output[state]:
+                if index in matches or (mid_word and not self._prefix[index]):
+                    continue
+                start = end - self._lengths[index]
+                if start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                pattern, risk_level = self.patterns[index]
+                matches[index] = RiskMatch(pattern, risk_level)
+                if RISK_SEVERITY[risk_level] > RISK_SEVERITY[highest]:
+                    highest = risk_level
+        return RiskClassification(risk_level=highest, matches=tuple(matches.values()))
+
+    def classify_many(self, texts: Sequence[str]) -> List[RiskClassification]:
+        return [self.classify(text) for text in texts]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+import httpx
+
+
+class BackendError(Exception):
+    pass
+
+
+@dataclass
+class Backend:
+    base_url: str
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    circuit_open_until: float = 0.0
+    latency_ewma: Optional[float] = None
+    last_health_check_ok: Optional[bool] = None
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    @property
+    def models_url(self) -> str:
+        return f"{self.base_url}/models"
+
+    def circuit_open(self, now: float) -> bool:
+        return self.circuit_open_until > now
+
+
+class BackendRouter:
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        failure_threshold: int = 3,
+        circuit_cooldown_seconds: float = 30.0,
+        health_check_interval_seconds: float = 0.0,
+        health_check_timeout_seconds: float = 2.0,
+        hedge_after_seconds: Optional[float] = None,
+    ) -> None:
+        urls = [url.rstrip("/") for url in base_urls if url]
+        if not urls:
+            raise ValueError("At least one LLM backend URL is required")
+        self.backends: List[Backend] = [Backend(base_url=url) for url in dict.fromkeys(urls)]
+        self.failure_threshold = max(1, failure_threshold)
+        self.circuit_cooldown_seconds = circuit_cooldown_seconds
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.health_check_timeout_seconds = health_check_timeout_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self._tie_breaker = itertools.count()
+        self._health_task: Optional[asyncio.Task[None]] = None
+        self._stats: Dict[str, int] = {"retries": 0, "hedged": 0, "hedge_wins": 0}
+
+    @property
+    def max_attempts(self) -> int:
+        return len(self.backends)
+
+    def pick(self, exclude: Collection[str] = ()) -> Optional[Backend]:
+        candidates = [backend for backend in self.backends if backend.base_url not in exclude]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        closed = [backend for backend in candidates if not backend.circuit_open(now)]
+        if not closed:
+            return min(candidates, key=lambda backend: backend.circuit_open_until)
+        turn = next(self._tie_breaker)
+        return min(
+            closed,
+            key=lambda backend: (
+                backend.outstanding,
+                backend.latency_ewma or 0.0,
+                (self.backends.index(backend) - turn) % len(self.backends),
+            ),
+        )
+
+    def begin(self, backend: Backend) -> None:
+        backend.outstanding += 1
+        backend.requests += 1
+
+    def end(self, backend: Backend) -> None:
+        backend.outstanding -= 1
+
+    def record_success(self, backend: Backend, latency_seconds: float) -> None:
+        backend.consecutive_failures = 0
+        backend.circuit_open_until = 0.0
+        if backend.latency_ewma is None:
+            backend.latency_ewma = latency_seconds
+        else:
+            backend.latency_ewma = 0.8 * backend.latency_ewma + 0.2 * latency_seconds
+
+    def record_failure(self, backend: Backend) -> None:
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.failure_threshold:
+            backend.circuit_open_until = time.monotonic() + self.circuit_cooldown_seconds
+
+    def record_retry(self) -> None:
+        self._stats["retries"] += 1
+
+    def record_hedge(self, won: bool) -> None:
+        self._stats["hedged"] += 1
+        if won:
+            self._stats["hedge_wins"] += 1
+
+    def start(self, client: httpx.AsyncClient) -> None:
+        if self._health_task is None and self.health_check_interval_seconds > 0:
+            self._health_task = asyncio.create_task(self._health_loop(client))
+
+    async def stop(self) -> None:
+        task, self._health_task = self._health_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _health_loop(self, client: httpx.AsyncClient) -> None:
+        while True:
+            await self.check_health(client)
+            await asyncio.sleep(self.health_check_interval_seconds)
+
+    async def check_health(self, client: httpx.AsyncClient) -> None:
+        await asyncio.gather(*(self._probe(client, backend) for backend in self.backends))
+
+    async def _probe(self, client: httpx.AsyncClient, backend: Backend) -> None:
+        try:
+            response = await client.get(
+                backend.models_url, timeout=self.health_check_timeout_seconds
+            )
+            healthy = response.status_code < 500
+        except httpx.HTTPError:
+            healthy = False
+        backend.last_health_check_ok = healthy
+        if healthy:
+            backend.consecutive_failures = 0
+            backend.circuit_open_until = 0.0
+        else:
+            backend.failures += 1
+            backend.consecutive_failures = max(
+                backend.consecutive_failures + 1, self.failure_threshold
+            )
+            backend.circuit_open_until = time.monotonic() + self.circuit_cooldown_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "hedge_after_seconds": self.hedge_after_seconds,
+            **self._stats,
+            "backends": [
+                {
+                    "base_url": backend.base_url,
+                    "outstanding": backend.outstanding,
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "circuit_open": backend.circuit_open(now),
+                    "latency_ewma_seconds": (
+                        round(backend.latency_ewma, 6) if backend.latency_ewma is not None else None
+                    ),
+                    "last_health_check_ok": backend.last_health_check_ok,
+                }
+                for backend in self.backends
+            ],
+        }
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from agent.cache import ResponseCache
+from agent.config import Settings
+from agent.events import StoreEventRelay
+from agent.k8s import ClusterStateCache
+from agent.llm import OllamaClient
+from agent.orchestrator import AgentOrchestrator
+from agent.policy import PolicyEngine
+from agent.router import BackendRouter
+from agent.sqlite_store import SQLiteStore
+from agent.store import InMemoryStore, Store
+
+
+JOB_EXECUTION_MODES = ("inline", "executor")
+
+
+def create_store(settings: Settings) -> Store:
+    if settings.store_backend == "memory":
+        return InMemoryStore(output_compress_min_bytes=settings.store_output_compress_min_bytes)
+    if settings.store_backend == "sqlite":
+        flush_interval = (
+            settings.executor_poll_interval_seconds
+            if settings.job_execution == "executor"
+            else 0.2
+        )
+        return SQLiteStore(
+            settings.store_path,
+            event_batch_size=settings.store_event_batch_size,
+            event_flush_interval_seconds=flush_interval,
+            output_compress_min_bytes=settings.store_output_compress_min_bytes,
+        )
+    raise ValueError(f"Unsupported store backend: {settings.store_backend}")
+
+
+def create_llm(settings: Settings) -> OllamaClient:
+    return OllamaClient(
+        base_url=settings.ollama_base_url,
+        model=settings.ollama_model,
+        timeout_seconds=settings.ollama_timeout_seconds,
+        api_key=os.getenv("OLLAMA_API_KEY"),
+        max_connections=settings.ollama_max_connections,
+        max_keepalive_connections=settings.ollama_max_keepalive_connections,
+        keepalive_expiry_seconds=settings.ollama_keepalive_expiry_seconds,
+        http2=settings.ollama_http2,
+        max_concurrency=settings.ollama_max_concurrency,
+        response_cache=(
+            ResponseCache(
+                max_entries=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                disk_dir=settings.llm_cache_dir,
+            )
+            if settings.llm_cache_enabled
+            else None
+        ),
+        router=BackendRouter(
+            settings.ollama_base_urls,
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            circuit_cooldown_seconds=settings.llm_circuit_cooldown_seconds,
+            health_check_interval_seconds=settings.llm_health_check_interval_seconds,
+            hedge_after_seconds=settings.llm_hedge_after_seconds,
+        ),
+    )
+
+
+@dataclass
+class AgentRuntime:
+    settings: Settings
+    policy: PolicyEngine
+    store: Store
+    llm: OllamaClient
+    orchestrator: AgentOrchestrator
+    event_relay: Optional[StoreEventRelay] = None
+    cluster_state: Optional[ClusterStateCache] = None
+
+    async def start(self) -> None:
+        if self.cluster_state is not None:
+            self.cluster_state.start()
+        await self.llm.start()
+        await self.orchestrator.start()
+        self.policy.start(self.settings.policy_reload_interval_seconds)
+        if self.event_relay is not None:
+            self.event_relay.start()
+
+    async def stop(self) -> None:
+        if self.event_relay is not None:
+            await self.event_relay.stop()
+        await self.policy.stop()
+        await self.orchestrator.stop()
+        await self.llm.aclose()
+        if self.cluster_state is not None:
+            await self.cluster_state.stop()
+        self.store.close()
+
+
+def build_runtime(settings: Settings, execute_jobs: Optional[bool] = None) -> AgentRuntime:
+    if settings.job_execution not in JOB_EXECUTION_MODES:
+        raise ValueError(f"Unsupported job execution mode: {settings.job_execution}")
+    if settings.job_execution == "executor" and settings.store_backend != "sqlite":
+        raise ValueError("AGENT_JOB_EXECUTION=executor requires AGENT_STORE_BACKEND=sqlite")
+    if execute_jobs is None:
+        execute_jobs = settings.job_execution == "inline"
+    policy = PolicyEngine.from_file(settings.policy_path)
+    store = create_store(settings)
+    llm = create_llm(settings)
+    cluster_state = (
+        ClusterStateCache(
+            settings.k8s_api_url,
+            token=os.getenv("AGENT_K8S_API_TOKEN"),
+            ca_file=settings.k8s_ca_file,
+        )
+        if settings.k8s_cache_enabled and execute_jobs
+        else None
+    )
+    orchestrator = AgentOrchestrator(
+        settings=settings,
+        policy=policy,
+        store=store,
+        llm=llm,
+        execute_jobs=execute_jobs,
+        cluster_state=cluster_state,
+    )
+    event_relay = (
+        StoreEventRelay(store, orchestrator.events, settings.executor_poll_interval_seconds)
+        if isinstance(store, SQLiteStore) and not execute_jobs
+        else None
+    )
+    return AgentRuntime(
+        settings=settings,
+        policy=policy,
+        store=store,
+        llm=llm,
+        orchestrator=orchestrator,
+        event_relay=event_relay,
+        cluster_state=cluster_state,
+    )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from agent.metrics import JOB_QUEUE_WAIT_SECONDS
+from agent.models import EnvironmentName, RiskLevel
+
+
+ENVIRONMENT_PRIORITY: Dict[str, int] = {"prod": 0, "stage": 1, "dev": 2}
+RISK_PRIORITY: Dict[str, int] = {"R3": 0, "R2": 1, "R1": 2, "R0": 3}
+
+JobHandler = Callable[[str, float], Awaitable[None]]
+
+
+def job_priority(environment: EnvironmentName, risk_level: RiskLevel) -> tuple[int, int]:
+    return (
+        ENVIRONMENT_PRIORITY.get(environment, len(ENVIRONMENT_PRIORITY)),
+        RISK_PRIORITY.get(risk_level, len(RISK_PRIORITY)),
+    )
+
+
+@dataclass(order=True)
+class _QueuedJob:
+    priority: tuple[int, int]
+    sequence: int
+    job_id: str = field(compare=False)
+    environment: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class JobScheduler:
+    def __init__(self, handler: JobHandler, workers: int = 4) -> None:
+        self.handler = handler
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.PriorityQueue[_QueuedJob]] = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._in_flight: Set[str] = set()
+        self._accepting = True
+        self._stats: Dict[str, float] = {
+            "submitted": 0,
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "max_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+        self._depth_by_environment: Dict[str, int] = {}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._accepting = True
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+
+    def submit(self, job_id: str, environment: EnvironmentName, risk_level: RiskLevel) -> int:
+        if not self._accepting:
+            raise RuntimeError("Job scheduler is shutting down")
+        if not self._tasks:
+            self.start()
+        assert self._queue is not None
+        self._queue.put_nowait(
+            _QueuedJob(
+                priority=job_priority(environment, risk_level),
+                sequence=next(self._sequence),
+                job_id=job_id,
+                environment=environment,
+                enqueued_at=time.monotonic(),
+            )
+        )
+        self._stats["submitted"] += 1
+        self._depth_by_environment[environment] = self._depth_by_environment.get(environment, 0) + 1
+        depth = self._queue.qsize()
+        self._stats["max_depth"] = max(self._stats["max_depth"], depth)
+        return depth
+
+    async def stop(self, drain_timeout: float = 30.0) -> Tuple[List[str], List[str]]:
+        self._accepting = False
+        if not self._tasks or self._queue is None:
+            return [], []
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        interrupted = sorted(self._in_flight)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        undrained: List[str] = []
+        while not self._queue.empty():
+            undrained.append(self._queue.get_nowait().job_id)
+        self._queue = None
+        self._in_flight.clear()
+        self._depth_by_environment.clear()
+        return undrained, interrupted
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            item = await queue.get()
+            waited = time.monotonic() - item.enqueued_at
+            self._depth_by_environment[item.environment] -= 1
+            self._stats["started"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            JOB_QUEUE_WAIT_SECONDS.observe(waited, item.environment)
+            self._running += 1
+            self._in_flight.add(item.job_id)
+            try:
+                await self.handler(item.job_id, waited)
+                self._stats["completed"] += 1
+            except Exception:  # noqa: BLE001
+                self._stats["failed"] += 1
+            finally:
+                self._running -= 1
+                self._in_flight.discard(item.job_id)
+                queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        started = int(self._stats["started"])
+        return {
+            "workers": self.workers,
+            "accepting": self._accepting,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_depth_by_environment": {
+                env: depth for env, depth in self._depth_by_environment.items() if depth
+            },
+            "running": self._running,
+            "max_queue_depth": int(self._stats["max_depth"]),
+            "submitted": int(self._stats["submitted"]),
+            "started": started,
+            "completed": int(self._stats["completed"]),
+            "failed": int(self._stats["failed"]),
+            "wait_seconds_avg": (
+                round(self._stats["wait_seconds_total"] / started, 6) if started else 0.0
+            ),
+            "wait_seconds_max": round(self._stats["wait_seconds_max"], 6),
+        }
@@ -0,0 +1,501 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from uuid import uuid4
+
+from agent.models import JobStatus, utc_now_iso
+from agent.scheduler import ENVIRONMENT_PRIORITY, RISK_PRIORITY
+from agent.store import (
+    DEFAULT_OUTPUT_COMPRESS_MIN_BYTES,
+    ApprovalRecord,
+    EventListener,
+    EventRecord,
+    JobRecord,
+    MessageRecord,
+    SessionRecord,
+    _freeze,
+    _inline_output,
+    _split_outputs,
+    _thaw,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    user_id TEXT,
+    metadata TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_messages INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS session_messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp_utc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_messages_session ON session_messages(session_id, seq);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    risk_level TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    goal TEXT NOT NULL,
+    session_id TEXT,
+    required_approvals INTEGER NOT NULL,
+    run_diagnostics INTEGER NOT NULL,
+    force_refresh INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    approvals TEXT NOT NULL,
+    report BLOB,
+    targets TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_environment ON jobs(environment);
+CREATE INDEX IF NOT EXISTS idx_jobs_session ON jobs(session_id);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    timestamp_utc TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, seq);
+CREATE TABLE IF NOT EXISTS job_outputs (
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    result_index INTEGER NOT NULL,
+    stream TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, result_index, stream)
+);
+"""
+
+REPORT_CACHE_ENTRIES = 256
+
+JOB_COLUMNS = (
+    "job_id, status, risk_level, environment, goal, session_id, required_approvals, "
+    "run_diagnostics, force_refresh, created_at, updated_at, approvals, targets"
+)
+
+
+def _priority_case(column: str, priorities: Dict[str, int]) -> str:
+    whens = " ".join(f"WHEN '{key}' THEN {value}" for key, value in priorities.items())
+    return f"CASE {column} {whens} ELSE {len(priorities)} END"
+
+
+CLAIM_ORDER = (
+    f"{_priority_case('environment', ENVIRONMENT_PRIORITY)}, "
+    f"{_priority_case('risk_level', RISK_PRIORITY)}, updated_at"
+)
+
+
+def _compress(report: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(report, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _decompress(blob: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class SQLiteStore:
+    def __init__(
+        self,
+        path: Path,
+        event_batch_size: int = 64,
+        event_flush_interval_seconds: float = 0.2,
+        output_compress_min_bytes: int = DEFAULT_OUTPUT_COMPRESS_MIN_BYTES,
+    ) -> None:
+        self.path = path
+        self.output_compress_min_bytes = output_compress_min_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.event_batch_size = max(1, event_batch_size)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.RLock()
+        self._pending_events: List[Tuple[str, str, str, str, str]] = []
+        self._pending_lock = threading.Lock()
+        self._listeners: List[EventListener] = []
+        self._report_cache: "OrderedDict[str, Tuple[str, Optional[Mapping[str, Any]]]]" = OrderedDict()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            args=(event_flush_interval_seconds,),
+            name="sqlite-event-flusher",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join(timeout=5)
+        self.flush_events()
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "summary" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+        if "summarized_messages" not in columns:
+            self._conn.execute(
+                "ALTER TABLE sessions ADD COLUMN summarized_messages INTEGER NOT NULL DEFAULT 0"
+            )
+        job_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "targets" not in job_columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN targets TEXT NOT NULL DEFAULT '{}'")
+
+    def subscribe(self, listener: EventListener) -> None:
+        self._listeners.append(listener)
+
+    def _flush_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self.flush_events()
+
+    def flush_events(self) -> None:
+        with self._pending_lock:
+            batch, self._pending_events = self._pending_events, []
+        if not batch:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO job_events (job_id, timestamp_utc, event_type, message, details) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+
+    def create_session(self, user_id: Optional[str], metadata: Dict[str, Any]) -> SessionRecord:
+        session = SessionRecord(
+            session_id=str(uuid4()),
+            created_at=utc_now_iso(),
+            user_id=user_id,
+            metadata=_freeze(metadata),
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, created_at, user_id, metadata) VALUES (?, ?, ?, ?)",
+                (session.session_id, session.created_at, user_id, json.dumps(metadata)),
+            )
+        return session
+
+    def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id, created_at, user_id, metadata, summary, summarized_messages "
+                "FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(
+            session_id=row[0],
+            created_at=row[1],
+            user_id=row[2],
+            metadata=_freeze(json.loads(row[3])),
+            summary=row[4],
+            summarized_messages=row[5],
+        )
+
+    def append_session_message(self, session_id: str, role: str, content: str) -> None:
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if exists is None:
+                raise KeyError(session_id)
+            self._conn.execute(
+                "INSERT INTO session_messages (session_id, role, content, timestamp_utc) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, role, content, utc_now_iso()),
+            )
+
+    def get_session_messages(self, session_id: str) -> List[MessageRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content, timestamp_utc FROM session_messages "
+                "WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+        return [MessageRecord(role=row[0], content=row[1], timestamp_utc=row[2]) for row in rows]
+
+    def fold_session_messages(self, session_id: str, count: int, summary: str) -> SessionRecord:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                folded = self._conn.execute(
+                    "DELETE FROM session_messages WHERE seq IN ("
+                    "SELECT seq FROM session_messages WHERE session_id = ? ORDER BY seq LIMIT ?)",
+                    (session_id, max(0, count)),
+                ).rowcount
+                updated = self._conn.execute(
+                    "UPDATE sessions SET summary = ?, summarized_messages = summarized_messages + ? "
+                    "WHERE session_id = ?",
+                    (summary, folded, session_id),
+                ).rowcount
+                if not updated:
+                    raise KeyError(session_id)
+        session = self.get_session(session_id)
+        assert session is not None
+        return session
+
+    def create_job(self, payload: Dict[str, Any]) -> JobRecord:
+        now = utc_now_iso()
+        job = JobRecord(
+            job_id=str(uuid4()),
+            status=payload["status"],
+            risk_level=payload["risk_level"],
+            environment=payload["environment"],
+            goal=payload["goal"],
+            session_id=payload.get("session_id"),
+            required_approvals=payload["required_approvals"],
+            run_diagnostics=payload.get("run_diagnostics", True),
+            force_refresh=payload.get("force_refresh", False),
+            created_at=now,
+            updated_at=now,
+            targets=_freeze(payload.get("targets")),
+        )
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({JOB_COLUMNS}, report) VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                (
+                    job.job_id,
+                    job.status,
+                    job.risk_level,
+                    job.environment,
+                    job.goal,
+                    job.session_id,
+                    job.required_approvals,
+                    int(job.run_diagnostics),
+                    int(job.force_refresh),
+                    job.created_at,
+                    job.updated_at,
+                    "[]",
+                    json.dumps(_thaw(job.targets)),
+                ),
+            )
+        return job
+
+    def get_job(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._row_to_job(row)
+
+    def get_job_report(self, job_id: str) -> Optional[Mapping[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated_at, report FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(job_id)
+            cached = self._report_cache.get(job_id)
+            if cached is not None and cached[0] == row[0]:
+                self._report_cache.move_to_end(job_id)
+                return cached[1]
+            report = _decompress(row[1])
+            frozen = _freeze(report) if report is not None else None
+            self._report_cache[job_id] = (row[0], frozen)
+            while len(self._report_cache) > REPORT_CACHE_ENTRIES:
+                self._report_cache.popitem(last=False)
+        return frozen
+
+    @staticmethod
+    def _row_to_job(row: Tuple[Any, ...]) -> JobRecord:
+        return JobRecord(
+            job_id=row[0],
+            status=row[1],
+            risk_level=row[2],
+            environment=row[3],
+            goal=row[4],
+            session_id=row[5],
+            required_approvals=row[6],
+            run_diagnostics=bool(row[7]),
+            force_refresh=bool(row[8]),
+            created_at=row[9],
+            updated_at=row[10],
+            approvals=tuple(ApprovalRecord(**item) for item in json.loads(row[11])),
+            targets=_freeze(json.loads(row[12])),
+        )
+
+    def list_jobs(
+        self,
+        status: Optional[JobStatus] = None,
+        environment: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[JobRecord]:
+        clauses = []
+        params: List[Any] = []
+        for column, value in (
+            ("status", status),
+            ("environment", environment),
+            ("session_id", session_id),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs {where} ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def _update_job(self, job_id: str, assignments: str, params: Tuple[Any, ...]) -> JobRecord:
+        self.flush_events()
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                (*params, utc_now_iso(), job_id),
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(job_id)
+            job = self.get_job(job_id)
+        assert job is not None
+        return job
+
+    def set_job_status(self, job_id: str, status: JobStatus) -> JobRecord:
+        return self._update_job(job_id, "status = ?", (status,))
+
+    def set_job_report(self, job_id: str, report: Dict[str, Any]) -> JobRecord:
+        report, outputs = _split_outputs(report, self.output_compress_min_bytes)
+        self.flush_events()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM job_outputs WHERE job_id = ?", (job_id,))
+                self._conn.executemany(
+                    "INSERT INTO job_outputs (job_id, result_index, stream, data) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(job_id, index, stream, data) for (index, stream), data in outputs.items()],
+                )
+                updated = self._conn.execute(
+                    "UPDATE jobs SET report = ?, updated_at = ? WHERE job_id = ?",
+                    (_compress(report), utc_now_iso(), job_id),
+                ).rowcount
+                if not updated:
+                    raise KeyError(job_id)
+            job = self.get_job(job_id)
+        assert job is not None
+        return job
+
+    def get_job_output(self, job_id: str, index: int, stream: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM job_outputs WHERE job_id = ? AND result_index = ? AND stream = ?",
+                (job_id, index, stream),
+            ).fetchone()
+            if row is not None:
+                return zlib.decompress(row[0]).decode("utf-8")
+        return _inline_output(self.get_job_report(job_id), index, stream)
+
+    def add_job_approval(self, job_id: str, approver: str, comment: Optional[str]) -> JobRecord:
+        approval = ApprovalRecord(approver=approver, comment=comment, timestamp_utc=utc_now_iso())
+        self.flush_events()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute(
+                    "SELECT approvals FROM jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(job_id)
+                approvals = json.loads(row[0])
+                approvals.append(approval.to_dict())
+                self._conn.execute(
+                    "UPDATE jobs SET approvals = ?, updated_at = ? WHERE job_id = ?",
+                    (json.dumps(approvals), utc_now_iso(), job_id),
+                )
+            job = self.get_job(job_id)
+        assert job is not None
+        return job
+
+    def add_job_event(
+        self, job_id: str, event_type: str, message: str, details: Optional[Dict[str, Any]] = None
+    ) -> None:
+        row = (job_id, utc_now_iso(), event_type, message, json.dumps(details or {}))
+        with self._pending_lock:
+            self._pending_events.append(row)
+            full = len(self._pending_events) >= self.event_batch_size
+        if full:
+            self.flush_events()
+        for listener in self._listeners:
+            listener(job_id)
+
+    def claim_jobs(self, limit: int) -> List[JobRecord]:
+        if limit <= 0:
+            return []
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                job_ids = [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT job_id FROM jobs WHERE status = 'queued' AND EXISTS ("
+                        "SELECT 1 FROM job_events WHERE job_events.job_id = jobs.job_id "
+                        "AND event_type = 'job_queued') "
+                        f"ORDER BY {CLAIM_ORDER} LIMIT ?",
+                        (limit,),
+                    )
+                ]
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ?",
+                    [(utc_now_iso(), job_id) for job_id in job_ids],
+                )
+            jobs = [self.get_job(job_id) for job_id in job_ids]
+        return [job for job in jobs if job is not None]
+
+    def latest_event_seq(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM job_events").fetchone()
+        return row[0] or 0
+
+    def jobs_with_events_since(self, seq: int) -> Tuple[List[str], int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, MAX(seq) FROM job_events WHERE seq > ? GROUP BY job_id", (seq,)
+            ).fetchall()
+        return [row[0] for row in rows], max((row[1] for row in rows), default=seq)
+
+    def get_job_events(self, job_id: str, since: int = 0) -> List[EventRecord]:
+        self.flush_events()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, timestamp_utc, event_type, message, details FROM job_events "
+                "WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, since),
+            ).fetchall()
+        return [
+            EventRecord(
+                seq=row[0],
+                timestamp_utc=row[1],
+                event_type=row[2],
+                message=row[3],
+                details=_freeze(json.loads(row[4])),
+            )
+            for row in rows
+        ]
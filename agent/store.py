@@ -1,37 +1,219 @@
 from __future__ import annotations
 
-from copy import deepcopy
+import zlib
+from dataclasses import dataclass, field, replace
 from threading import Lock
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Protocol, Tuple
 from uuid import uuid4
 
+from agent.metrics import timed_lock
 from agent.models import JobStatus, utc_now_iso
 
 
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+EventListener = Callable[[str], None]
+
+OUTPUT_STREAMS = ("stdout", "stderr")
+DEFAULT_OUTPUT_COMPRESS_MIN_BYTES = 4096
+OutputKey = Tuple[int, str]
+
+
+def _freeze_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze_value(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(item) for item in value)
+    return value
+
+
+def _freeze(data: Optional[Mapping[str, Any]]) -> Mapping[str, Any]:
+    if not data:
+        return _EMPTY
+    return _freeze_value(data)
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _split_outputs(
+    report: Mapping[str, Any], min_bytes: int
+) -> Tuple[Dict[str, Any], Dict[OutputKey, bytes]]:
+    diagnostics: List[Dict[str, Any]] = []
+    outputs: Dict[OutputKey, bytes] = {}
+    for index, result in enumerate(report.get("diagnostics") or []):
+        result = dict(result)
+        stored = []
+        for stream in OUTPUT_STREAMS:
+            encoded = (result.get(stream) or "").encode("utf-8")
+            if len(encoded) >= min_bytes:
+                outputs[(index, stream)] = zlib.compress(encoded, 6)
+                result[stream] = ""
+                stored.append(stream)
+        if stored:
+            result["stored_outputs"] = stored
+        diagnostics.append(result)
+    return {**report, "diagnostics": diagnostics}, outputs
+
+
+def _inline_output(report: Optional[Mapping[str, Any]], index: int, stream: str) -> Optional[str]:
+    diagnostics = (report or {}).get("diagnostics") or []
+    if stream not in OUTPUT_STREAMS or not 0 <= index < len(diagnostics):
+        return None
+    return diagnostics[index].get(stream) or ""
+
+
+@dataclass(frozen=True, slots=True)
+class SessionRecord:
+    session_id: str
+    created_at: str
+    user_id: Optional[str]
+    metadata: Mapping[str, Any]
+    summary: str = ""
+    summarized_messages: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class MessageRecord:
+    role: str
+    content: str
+    timestamp_utc: str
+
+
+@dataclass(frozen=True, slots=True)
+class ApprovalRecord:
+    approver: str
+    comment: Optional[str]
+    timestamp_utc: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "approver": self.approver,
+            "comment": self.comment,
+            "timestamp_utc": self.timestamp_utc,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class JobRecord:
+    job_id: str
+    status: JobStatus
+    risk_level: str
+    environment: str
+    goal: str
+    session_id: Optional[str]
+    required_approvals: int
+    run_diagnostics: bool
+    force_refresh: bool
+    created_at: str
+    updated_at: str
+    approvals: tuple[ApprovalRecord, ...] = ()
+    report: Optional[Mapping[str, Any]] = None
+    targets: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+
+@dataclass(frozen=True, slots=True)
+class EventRecord:
+    seq: int
+    timestamp_utc: str
+    event_type: str
+    message: str
+    details: Mapping[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "timestamp_utc": self.timestamp_utc,
+            "event_type": self.event_type,
+            "message": self.message,
+            "details": _thaw(self.details),
+        }
+
+
+class Store(Protocol):
+    def create_session(self, user_id: Optional[str], metadata: Dict[str, Any]) -> SessionRecord: ...
+
+    def get_session(self, session_id: str) -> Optional[SessionRecord]: ...
+
+    def append_session_message(self, session_id: str, role: str, content: str) -> None: ...
+
+    def get_session_messages(self, session_id: str) -> List[MessageRecord]: ...
+
+    def fold_session_messages(self, session_id: str, count: int, summary: str) -> SessionRecord: ...
+
+    def create_job(self, payload: Dict[str, Any]) -> JobRecord: ...
+
+    def get_job(self, job_id: str) -> Optional[JobRecord]: ...
+
+    def list_jobs(
+        self,
+        status: Optional[JobStatus] = None,
+        environment: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[JobRecord]: ...
+
+    def set_job_status(self, job_id: str, status: JobStatus) -> JobRecord: ...
+
+    def set_job_report(self, job_id: str, report: Dict[str, Any]) -> JobRecord: ...
+
+    def get_job_report(self, job_id: str) -> Optional[Mapping[str, Any]]: ...
+
+    def get_job_output(self, job_id: str, index: int, stream: str) -> Optional[str]: ...
+
+    def add_job_approval(
+        self, job_id: str, approver: str, comment: Optional[str]
+    ) -> JobRecord: ...
+
+    def add_job_event(
+        self, job_id: str, event_type: str, message: str, details: Optional[Dict[str, Any]] = None
+    ) -> None: ...
+
+    def get_job_events(self, job_id: str, since: int = 0) -> List[EventRecord]: ...
+
+    def subscribe(self, listener: EventListener) -> None: ...
+
+    def close(self) -> None: ...
+
+
 class InMemoryStore:
-    def __init__(self) -> None:
-        self._sessions: Dict[str, Dict[str, Any]] = {}
-        self._jobs: Dict[str, Dict[str, Any]] = {}
-        self._job_events: Dict[str, List[Dict[str, Any]]] = {}
+    def __init__(self, output_compress_min_bytes: int = DEFAULT_OUTPUT_COMPRESS_MIN_BYTES) -> None:
+        self.output_compress_min_bytes = output_compress_min_bytes
+        self._sessions: Dict[str, SessionRecord] = {}
+        self._session_messages: Dict[str, List[MessageRecord]] = {}
+        self._jobs: Dict[str, JobRecord] = {}
+        self._job_events: Dict[str, List[EventRecord]] = {}
+        self._job_outputs: Dict[str, Dict[OutputKey, bytes]] = {}
+        self._job_locks: Dict[str, Lock] = {}
+        self._listeners: List[EventListener] = []
         self._lock = Lock()
 
-    def create_session(self, user_id: Optional[str], metadata: Dict[str, Any]) -> Dict[str, Any]:
-        with self._lock:
-            session_id = str(uuid4())
-            session = {
-                "session_id": session_id,
-                "created_at": utc_now_iso(),
-                "user_id": user_id,
-                "metadata": metadata,
-                "messages": [],
-            }
-            self._sessions[session_id] = session
-            return deepcopy(session)
+    def close(self) -> None:
+        pass
+
+    def subscribe(self, listener: EventListener) -> None:
+        self._listeners.append(listener)
 
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            session = self._sessions.get(session_id)
-            return deepcopy(session) if session else None
+    def create_session(self, user_id: Optional[str], metadata: Dict[str, Any]) -> SessionRecord:
+        session = SessionRecord(
+            session_id=str(uuid4()),
+            created_at=utc_now_iso(),
+            user_id=user_id,
+            metadata=_freeze(metadata),
+        )
+        with timed_lock(self._lock, "store"):
+            self._sessions[session.session_id] = session
+            self._session_messages[session.session_id] = []
+        return session
+
+    def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        return self._sessions.get(session_id)
 
     def append_session_message(
         self,
@@ -39,81 +221,129 @@ class InMemoryStore:
         role: str,
         content: str,
     ) -> None:
-        with self._lock:
+        messages = self._session_messages[session_id]
+        messages.append(MessageRecord(role=role, content=content, timestamp_utc=utc_now_iso()))
+
+    def get_session_messages(self, session_id: str) -> List[MessageRecord]:
+        return list(self._session_messages.get(session_id, ()))
+
+    def fold_session_messages(self, session_id: str, count: int, summary: str) -> SessionRecord:
+        with timed_lock(self._lock, "store"):
+            messages = self._session_messages[session_id]
+            folded = min(count, len(messages))
+            del messages[:folded]
             session = self._sessions[session_id]
-            session["messages"].append(
-                {"role": role, "content": content, "timestamp_utc": utc_now_iso()}
+            session = replace(
+                session,
+                summary=summary,
+                summarized_messages=session.summarized_messages + folded,
             )
+            self._sessions[session_id] = session
+            return session
+
+    def create_job(self, payload: Dict[str, Any]) -> JobRecord:
+        now = utc_now_iso()
+        job = JobRecord(
+            job_id=str(uuid4()),
+            status=payload["status"],
+            risk_level=payload["risk_level"],
+            environment=payload["environment"],
+            goal=payload["goal"],
+            session_id=payload.get("session_id"),
+            required_approvals=payload["required_approvals"],
+            run_diagnostics=payload.get("run_diagnostics", True),
+            force_refresh=payload.get("force_refresh", False),
+            created_at=now,
+            updated_at=now,
+            targets=_freeze(payload.get("targets")),
+        )
+        with timed_lock(self._lock, "store"):
+            self._job_locks[job.job_id] = Lock()
+            self._job_events[job.job_id] = []
+            self._jobs[job.job_id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[JobRecord]:
+        return self._jobs.get(job_id)
 
-    def create_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        with self._lock:
-            job_id = str(uuid4())
-            now = utc_now_iso()
-            job = {
-                "job_id": job_id,
-                "status": payload["status"],
-                "risk_level": payload["risk_level"],
-                "environment": payload["environment"],
-                "goal": payload["goal"],
-                "session_id": payload.get("session_id"),
-                "required_approvals": payload["required_approvals"],
-                "run_diagnostics": payload.get("run_diagnostics", True),
-                "approvals": [],
-                "created_at": now,
-                "updated_at": now,
-                "report": None,
-            }
+    def list_jobs(
+        self,
+        status: Optional[JobStatus] = None,
+        environment: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[JobRecord]:
+        matches = [
+            job
+            for job in list(self._jobs.values())
+            if (status is None or job.status == status)
+            and (environment is None or job.environment == environment)
+            and (session_id is None or job.session_id == session_id)
+        ]
+        matches.sort(key=lambda job: job.created_at, reverse=True)
+        return matches[:limit]
+
+    def _update_job(self, job_id: str, **changes: Any) -> JobRecord:
+        with timed_lock(self._job_locks[job_id], "job"):
+            job = replace(self._jobs[job_id], updated_at=utc_now_iso(), **changes)
             self._jobs[job_id] = job
-            self._job_events[job_id] = []
-            return deepcopy(job)
+            return job
 
-    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            job = self._jobs.get(job_id)
-            return deepcopy(job) if job else None
+    def set_job_status(self, job_id: str, status: JobStatus) -> JobRecord:
+        return self._update_job(job_id, status=status)
 
-    def set_job_status(self, job_id: str, status: JobStatus) -> Dict[str, Any]:
-        with self._lock:
-            job = self._jobs[job_id]
-            job["status"] = status
-            job["updated_at"] = utc_now_iso()
-            return deepcopy(job)
+    def set_job_report(self, job_id: str, report: Dict[str, Any]) -> JobRecord:
+        report, outputs = _split_outputs(report, self.output_compress_min_bytes)
+        with timed_lock(self._job_locks[job_id], "job"):
+            job = replace(self._jobs[job_id], updated_at=utc_now_iso(), report=_freeze(report))
+            self._job_outputs[job_id] = outputs
+            self._jobs[job_id] = job
+            return job
 
-    def set_job_report(self, job_id: str, report: Dict[str, Any]) -> Dict[str, Any]:
-        with self._lock:
-            job = self._jobs[job_id]
-            job["report"] = report
-            job["updated_at"] = utc_now_iso()
-            return deepcopy(job)
+    def get_job_report(self, job_id: str) -> Optional[Mapping[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job.report
+
+    def get_job_output(self, job_id: str, index: int, stream: str) -> Optional[str]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        blob = self._job_outputs.get(job_id, {}).get((index, stream))
+        if blob is not None:
+            return zlib.decompress(blob).decode("utf-8")
+        return _inline_output(job.report, index, stream)
 
     def add_job_approval(
         self, job_id: str, approver: str, comment: Optional[str]
-    ) -> Dict[str, Any]:
-        with self._lock:
+    ) -> JobRecord:
+        approval = ApprovalRecord(approver=approver, comment=comment, timestamp_utc=utc_now_iso())
+        with timed_lock(self._job_locks[job_id], "job"):
             job = self._jobs[job_id]
-            job["approvals"].append(
-                {
-                    "approver": approver,
-                    "comment": comment,
-                    "timestamp_utc": utc_now_iso(),
-                }
-            )
-            job["updated_at"] = utc_now_iso()
-            return deepcopy(job)
+            job = replace(job, approvals=job.approvals + (approval,), updated_at=utc_now_iso())
+            self._jobs[job_id] = job
+            return job
 
     def add_job_event(
         self, job_id: str, event_type: str, message: str, details: Optional[Dict[str, Any]] = None
     ) -> None:
-        with self._lock:
-            self._job_events[job_id].append(
-                {
-                    "timestamp_utc": utc_now_iso(),
-                    "event_type": event_type,
-                    "message": message,
-                    "details": details or {},
-                }
+        with timed_lock(self._job_locks[job_id], "job"):
+            events = self._job_events[job_id]
+            events.append(
+                EventRecord(
+                    seq=len(events) + 1,
+                    timestamp_utc=utc_now_iso(),
+                    event_type=event_type,
+                    message=message,
+                    details=_freeze(details),
+                )
             )
+        for listener in self._listeners:
+            listener(job_id)
 
-    def get_job_events(self, job_id: str) -> List[Dict[str, Any]]:
-        with self._lock:
-            return deepcopy(self._job_events.get(job_id, []))
+    def get_job_events(self, job_id: str, since: int = 0) -> List[EventRecord]:
+        events = self._job_events.get(job_id)
+        if events is None:
+            return []
+        return events[max(0, since):]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from agent.models import ToolResult
+
+
+class JobTimer:
+    def __init__(self, queue_wait_seconds: float = 0.0) -> None:
+        self._started = time.perf_counter()
+        self.stages: Dict[str, float] = {"queue_wait_seconds": queue_wait_seconds}
+        self.diagnostics: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def add(self, stage: str, seconds: Optional[float]) -> None:
+        if seconds is not None:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def record_diagnostic(self, result: ToolResult) -> None:
+        self.diagnostics.append(
+            {
+                "tool_name": result.tool_name,
+                "seconds": 0.0 if result.cached else result.duration_seconds,
+                "cached": result.cached,
+                "exit_code": result.exit_code,
+            }
+        )
+
+    def breakdown(self) -> Optional[Dict[str, Any]]:
+        return {
+            **{stage: round(seconds, 6) for stage, seconds in self.stages.items()},
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "diagnostics": list(self.diagnostics),
+        }
+
+
+class _DisabledJobTimer(JobTimer):
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        yield
+
+    def add(self, stage: str, seconds: Optional[float]) -> None:
+        pass
+
+    def record_diagnostic(self, result: ToolResult) -> None:
+        pass
+
+    def breakdown(self) -> Optional[Dict[str, Any]]:
+        return None
+
+
+DISABLED_TIMER: JobTimer = _DisabledJobTimer()
+
+current_job_timer: ContextVar[JobTimer] = ContextVar("current_job_timer", default=DISABLED_TIMER)
@@ -1,44 +1,121 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Sequence
+from typing import Callable, List, Optional, Sequence
 
+from agent.cache import DiagnosticsCache
+from agent.capture import DEFAULT_OUTPUT_LIMIT_BYTES, BoundedCapture
+from agent.k8s import ClusterStateCache
+from agent.metrics import COMMAND_EXITS, COMMAND_SECONDS
 from agent.models import ToolResult
+from agent.policy import PolicyEngine
+
+
+OUTPUT_READ_CHUNK_BYTES = 64 * 1024
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-async def _run_command(command: Sequence[str], cwd: Path, tool_name: str, timeout: int) -> ToolResult:
+async def _pump(stream: Optional[asyncio.StreamReader], capture: BoundedCapture) -> None:
+    if stream is None:
+        return
+    while True:
+        chunk = await stream.read(OUTPUT_READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        capture.feed(chunk)
+
+
+def _denied_result(
+    command: Sequence[str], tool_name: str, policy: PolicyEngine
+) -> Optional[ToolResult]:
+    decision = policy.authorize(command)
+    if decision.allowed:
+        return None
+    reason = f"{decision.reason}: {decision.pattern}" if decision.pattern else decision.reason
+    started_at = _now_iso()
+    COMMAND_EXITS.inc(tool_name, 126)
+    return ToolResult(
+        tool_name=tool_name,
+        command=" ".join(command),
+        exit_code=126,
+        stdout="",
+        stderr=f"Command denied by policy ({reason})",
+        started_at_utc=started_at,
+        finished_at_utc=started_at,
+        duration_seconds=0.0,
+    )
+
+
+async def _run_command(
+    command: Sequence[str],
+    cwd: Path,
+    tool_name: str,
+    timeout: int,
+    output_limit_bytes: int = DEFAULT_OUTPUT_LIMIT_BYTES,
+    spill_dir: Optional[Path] = None,
+    policy: Optional[PolicyEngine] = None,
+) -> ToolResult:
+    if policy is not None:
+        denied = _denied_result(command, tool_name, policy)
+        if denied is not None:
+            return denied
     started_at = _now_iso()
+    started = time.perf_counter()
+    stdout_capture = BoundedCapture(output_limit_bytes)
+    stderr_capture = BoundedCapture(output_limit_bytes)
+    process: Optional[asyncio.subprocess.Process] = None
+    reason = ""
     try:
+        if spill_dir is not None:
+            stdout_capture.spill_to(spill_dir, f"{tool_name}-", ".stdout")
+            stderr_capture.spill_to(spill_dir, f"{tool_name}-", ".stderr")
         process = await asyncio.create_subprocess_exec(
             *command,
             cwd=str(cwd),
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
-        stdout_bytes, stderr_bytes = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        await asyncio.wait_for(
+            asyncio.gather(
+                _pump(process.stdout, stdout_capture),
+                _pump(process.stderr, stderr_capture),
+                process.wait(),
+            ),
+            timeout=timeout,
+        )
         exit_code = process.returncode or 0
-        stdout = stdout_bytes.decode("utf-8", errors="replace")
-        stderr = stderr_bytes.decode("utf-8", errors="replace")
     except FileNotFoundError:
         exit_code = 127
-        stdout = ""
-        stderr = f"Command not found: {command[0]}"
+        reason = f"Command not found: {command[0]}"
     except asyncio.TimeoutError:
         exit_code = 124
-        stdout = ""
-        stderr = f"Command timed out after {timeout}s"
+        reason = f"Command timed out after {timeout}s"
     except Exception as exc:  # noqa: BLE001
         exit_code = 1
-        stdout = ""
-        stderr = f"Execution failed: {exc}"
+        reason = f"Execution failed: {exc}"
+    finally:
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        stdout_capture.close()
+        stderr_capture.close()
+
+    stdout = stdout_capture.text()
+    stderr = stderr_capture.text()
+    if reason:
+        stderr = f"{stderr.rstrip()}\n{reason}" if stderr else reason
 
     finished_at = _now_iso()
+    duration = time.perf_counter() - started
+    COMMAND_SECONDS.observe(duration, tool_name)
+    COMMAND_EXITS.inc(tool_name, exit_code)
     return ToolResult(
         tool_name=tool_name,
         command=" ".join(command),
@@ -47,21 +124,170 @@ async def _run_command(command: Sequence[str], cwd: Path, tool_name: str, timeou
         stderr=stderr,
         started_at_utc=started_at,
         finished_at_utc=finished_at,
+        stdout_total_bytes=stdout_capture.total_bytes,
+        stdout_total_lines=stdout_capture.total_lines,
+        stderr_total_bytes=stderr_capture.total_bytes,
+        stderr_total_lines=stderr_capture.total_lines,
+        output_truncated=stdout_capture.truncated or stderr_capture.truncated,
+        stdout_spill_path=stdout_capture.spill_path,
+        stderr_spill_path=stderr_capture.spill_path,
+        duration_seconds=round(duration, 6),
     )
 
 
-async def run_read_only_diagnostics(repo_root: Path, timeout: int = 30) -> List[ToolResult]:
-    commands = [
-        ("git_status", ["git", "status", "--short"]),
-        ("git_branch", ["git", "branch", "--show-current"]),
-        ("git_last_commit", ["git", "log", "-1", "--oneline"]),
-        ("kubectl_context", ["kubectl", "config", "current-context"]),
-        ("kubectl_pods_all", ["kubectl", "get", "pods", "-A"]),
-        ("helm_list_all", ["helm", "list", "-A"]),
-    ]
-
-    results: List[ToolResult] = []
-    for tool_name, command in commands:
-        result = await _run_command(command, repo_root, tool_name=tool_name, timeout=timeout)
-        results.append(result)
-    return results
+def _serve_from_cluster_state(
+    command: Sequence[str],
+    tool_name: str,
+    cluster_state: ClusterStateCache,
+    output_limit_bytes: int,
+) -> Optional[ToolResult]:
+    started_at = _now_iso()
+    started = time.perf_counter()
+    served = cluster_state.query(command)
+    if served is None:
+        return None
+    stdout_capture = BoundedCapture(output_limit_bytes)
+    stderr_capture = BoundedCapture(output_limit_bytes)
+    stdout_capture.feed(served[0].encode("utf-8"))
+    stderr_capture.feed(served[1].encode("utf-8"))
+    duration = time.perf_counter() - started
+    COMMAND_SECONDS.observe(duration, tool_name)
+    COMMAND_EXITS.inc(tool_name, 0)
+    return ToolResult(
+        tool_name=tool_name,
+        command=" ".join(command),
+        exit_code=0,
+        stdout=stdout_capture.text(),
+        stderr=stderr_capture.text(),
+        started_at_utc=started_at,
+        finished_at_utc=_now_iso(),
+        stdout_total_bytes=stdout_capture.total_bytes,
+        stdout_total_lines=stdout_capture.total_lines,
+        stderr_total_bytes=stderr_capture.total_bytes,
+        stderr_total_lines=stderr_capture.total_lines,
+        output_truncated=stdout_capture.truncated or stderr_capture.truncated,
+        duration_seconds=round(duration, 6),
+        source="k8s_watch_cache",
+    )
+
+
+@dataclass(frozen=True)
+class DiagnosticCommand:
+    tool_name: str
+    command: Sequence[str]
+    timeout: Optional[int] = None
+    cache_ttl: float = 0.0
+    cluster_scoped: bool = False
+
+
+KUBECTL_CONTEXT = DiagnosticCommand(
+    "kubectl_context", ("kubectl", "config", "current-context"), cache_ttl=5.0
+)
+
+READ_ONLY_DIAGNOSTICS: tuple[DiagnosticCommand, ...] = (
+    DiagnosticCommand("git_status", ("git", "status", "--short"), cache_ttl=2.0),
+    DiagnosticCommand("git_branch", ("git", "branch", "--show-current"), cache_ttl=5.0),
+    DiagnosticCommand("git_last_commit", ("git", "log", "-1", "--oneline"), cache_ttl=5.0),
+    KUBECTL_CONTEXT,
+    DiagnosticCommand(
+        "kubectl_pods_all", ("kubectl", "get", "pods", "-A"), cache_ttl=15.0, cluster_scoped=True
+    ),
+    DiagnosticCommand(
+        "helm_list_all", ("helm", "list", "-A"), cache_ttl=30.0, cluster_scoped=True
+    ),
+)
+
+
+async def run_commands(
+    commands: Sequence[DiagnosticCommand],
+    cwd: Path,
+    timeout: int = 30,
+    max_parallel: int = 1,
+    on_result: Optional[Callable[[ToolResult], None]] = None,
+    cache: Optional[DiagnosticsCache] = None,
+    kube_context: str = "",
+    min_created_at: Optional[float] = None,
+    output_limit_bytes: int = DEFAULT_OUTPUT_LIMIT_BYTES,
+    spill_dir: Optional[Path] = None,
+    policy: Optional[PolicyEngine] = None,
+    cluster_state: Optional[ClusterStateCache] = None,
+) -> List[ToolResult]:
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def execute(item: DiagnosticCommand) -> ToolResult:
+        async with semaphore:
+            return await _run_command(
+                item.command,
+                cwd,
+                tool_name=item.tool_name,
+                timeout=item.timeout or timeout,
+                output_limit_bytes=output_limit_bytes,
+                spill_dir=spill_dir,
+                policy=policy,
+            )
+
+    async def run_one(item: DiagnosticCommand) -> ToolResult:
+        # Authorize ahead of the cache so a reloaded policy also stops cached results.
+        served = _denied_result(item.command, item.tool_name, policy) if policy is not None else None
+        if served is None and cluster_state is not None:
+            served = _serve_from_cluster_state(
+                item.command, item.tool_name, cluster_state, output_limit_bytes
+            )
+        if served is not None:
+            result = served
+        elif cache is not None and item.cache_ttl > 0:
+            result = await cache.get_or_run(
+                (str(cwd), tuple(item.command), kube_context if item.cluster_scoped else ""),
+                item.cache_ttl,
+                lambda: execute(item),
+                min_created_at=min_created_at,
+            )
+        else:
+            result = await execute(item)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return list(await asyncio.gather(*(run_one(item) for item in commands)))
+
+
+async def run_read_only_diagnostics(
+    repo_root: Path,
+    timeout: int = 30,
+    max_parallel: int = 1,
+    on_result: Optional[Callable[[ToolResult], None]] = None,
+    cache: Optional[DiagnosticsCache] = None,
+    force_refresh: bool = False,
+    output_limit_bytes: int = DEFAULT_OUTPUT_LIMIT_BYTES,
+    spill_dir: Optional[Path] = None,
+    policy: Optional[PolicyEngine] = None,
+    commands: Sequence[DiagnosticCommand] = READ_ONLY_DIAGNOSTICS,
+    cluster_state: Optional[ClusterStateCache] = None,
+) -> List[ToolResult]:
+    min_created_at = time.monotonic() if force_refresh else None
+    kube_context = ""
+    if cache is not None and any(item.cluster_scoped for item in commands):
+        context_results = await run_commands(
+            [KUBECTL_CONTEXT],
+            repo_root,
+            timeout=timeout,
+            cache=cache,
+            min_created_at=min_created_at,
+            policy=policy,
+        )
+        kube_context = context_results[0].stdout.strip()
+
+    return await run_commands(
+        commands,
+        repo_root,
+        timeout=timeout,
+        max_parallel=max_parallel,
+        on_result=on_result,
+        cache=cache,
+        kube_context=kube_context,
+        min_created_at=min_created_at,
+        output_limit_bytes=output_limit_bytes,
+        spill_dir=spill_dir,
+        policy=policy,
+        cluster_state=cluster_state,
+    )
@@ -0,0 +1,54 @@
+"""Compare sequential and bounded-parallel diagnostics wall-clock time.
+
+Run with ``python -m benchmarks.diagnostics_parallel``. Each fake
+diagnostic is a ``sleep`` subprocess, so the numbers reflect scheduling
+rather than real cluster latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from agent.tools import DiagnosticCommand, run_commands
+
+
+def _fake_commands(count: int, delay: float) -> list[DiagnosticCommand]:
+    return [
+        DiagnosticCommand(f"slow_{index}", ("sleep", str(delay)))
+        for index in range(count)
+    ]
+
+
+async def _measure(commands: list[DiagnosticCommand], max_parallel: int) -> float:
+    started = time.perf_counter()
+    results = await run_commands(commands, Path.cwd(), timeout=30, max_parallel=max_parallel)
+    elapsed = time.perf_counter() - started
+    assert [result.tool_name for result in results] == [item.tool_name for item in commands]
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=6)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds per fake command")
+    parser.add_argument("--parallel", default="1,2,4,6", help="comma-separated limits")
+    args = parser.parse_args()
+
+    commands = _fake_commands(args.commands, args.delay)
+    print("| Max Parallel | Commands | Delay (s) | Wall Time (s) | Speedup |")
+    print("|---:|---:|---:|---:|---:|")
+    baseline = None
+    for limit in (int(value) for value in args.parallel.split(",") if value):
+        elapsed = asyncio.run(_measure(commands, limit))
+        baseline = baseline or elapsed
+        print(
+            f"| {limit} | {args.commands} | {args.delay} | {elapsed:.3f} | "
+            f"{baseline / elapsed:.2f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from agent.k8s import RESOURCE_PATHS
+from benchmarks.fake_llm import FakeLLMServer
+
+
+LIST_KINDS = {"pods": "PodList", "deployments": "DeploymentList", "events": "EventList"}
+Change = Tuple[int, str, Dict[str, Any]]
+
+
+def _iso(seconds_ago: float = 0.0) -> str:
+    moment = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_pod(
+    namespace: str,
+    name: str,
+    phase: str = "Running",
+    ready: bool = True,
+    restarts: int = 0,
+    waiting_reason: Optional[str] = None,
+    labels: Optional[Dict[str, str]] = None,
+    age_seconds: float = 3600.0,
+) -> Dict[str, Any]:
+    state: Dict[str, Any] = (
+        {"waiting": {"reason": waiting_reason}} if waiting_reason else {"running": {}}
+    )
+    return {
+        "metadata": {
+            "namespace": namespace,
+            "name": name,
+            "labels": labels or {},
+            "creationTimestamp": _iso(age_seconds),
+        },
+        "spec": {"containers": [{"name": "app"}]},
+        "status": {
+            "phase": phase,
+            "containerStatuses": [
+                {"name": "app", "ready": ready, "restartCount": restarts, "state": state}
+            ],
+        },
+    }
+
+
+def make_deployment(
+    namespace: str,
+    name: str,
+    replicas: int = 3,
+    ready: Optional[int] = None,
+    labels: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    ready = replicas if ready is None else ready
+    return {
+        "metadata": {
+            "namespace": namespace,
+            "name": name,
+            "labels": labels or {},
+            "creationTimestamp": _iso(86400),
+        },
+        "spec": {"replicas": replicas},
+        "status": {"readyReplicas": ready, "updatedReplicas": replicas, "availableReplicas": ready},
+    }
+
+
+def make_event(
+    namespace: str,
+    name: str,
+    object_name: str,
+    reason: str,
+    message: str,
+    event_type: str = "Warning",
+    kind: str = "Pod",
+) -> Dict[str, Any]:
+    return {
+        "metadata": {"namespace": namespace, "name": name, "creationTimestamp": _iso(60)},
+        "involvedObject": {"kind": kind, "name": object_name, "namespace": namespace},
+        "type": event_type,
+        "reason": reason,
+        "message": message,
+        "lastTimestamp": _iso(30),
+    }
+
+
+class FakeCluster:
+    def __init__(self, history_limit: int = 10_000) -> None:
+        self._lock = threading.Lock()
+        self.resource_version = 0
+        self.objects: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = {
+            name: {} for name in RESOURCE_PATHS
+        }
+        self.history: Dict[str, Deque[Change]] = {
+            name: deque(maxlen=history_limit) for name in RESOURCE_PATHS
+        }
+        self._oldest: Dict[str, int] = {name: 0 for name in RESOURCE_PATHS}
+        self._watchers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {
+            name: [] for name in RESOURCE_PATHS
+        }
+        self.requests: Counter = Counter()
+
+    def apply(self, resource: str, obj: Dict[str, Any]) -> int:
+        metadata = obj["metadata"]
+        key = (metadata.get("namespace", ""), metadata["name"])
+        with self._lock:
+            event_type = "MODIFIED" if key in self.objects[resource] else "ADDED"
+            self.objects[resource][key] = obj
+            return self._publish(resource, event_type, obj)
+
+    def delete(self, resource: str, namespace: str, name: str) -> Optional[int]:
+        with self._lock:
+            obj = self.objects[resource].pop((namespace, name), None)
+            if obj is None:
+                return None
+            return self._publish(resource, "DELETED", obj)
+
+    def expire_history(self) -> None:
+        with self._lock:
+            for resource, history in self.history.items():
+                history.clear()
+                self._oldest[resource] = self.resource_version
+
+    def _publish(self, resource: str, event_type: str, obj: Dict[str, Any]) -> int:
+        self.resource_version += 1
+        obj = copy.deepcopy(obj)
+        obj["metadata"]["resourceVersion"] = str(self.resource_version)
+        history = self.history[resource]
+        if len(history) == history.maxlen:
+            self._oldest[resource] = history[0][0]
+        change = (self.resource_version, event_type, obj)
+        history.append(change)
+        for loop, queue in self._watchers[resource]:
+            loop.call_soon_threadsafe(queue.put_nowait, change)
+        return self.resource_version
+
+    def list(self, resource: str, namespace: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            items = [
+                copy.deepcopy(obj)
+                for (item_namespace, _), obj in self.objects[resource].items()
+                if namespace is None or item_namespace == namespace
+            ]
+            version = str(self.resource_version)
+        return {
+            "kind": LIST_KINDS[resource],
+            "apiVersion": "v1",
+            "metadata": {"resourceVersion": version},
+            "items": items,
+        }
+
+    def subscribe(self, resource: str, since: int) -> Tuple[Optional[List[Change]], asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._watchers[resource].append((asyncio.get_running_loop(), queue))
+            if since < self._oldest[resource]:
+                return None, queue
+            backlog = [change for change in self.history[resource] if change[0] > since]
+        return backlog, queue
+
+    def unsubscribe(self, resource: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._watchers[resource] = [
+                entry for entry in self._watchers[resource] if entry[1] is not queue
+            ]
+
+
+def create_fake_k8s_app(cluster: FakeCluster) -> FastAPI:
+    app = FastAPI()
+    app.state.cluster = cluster
+
+    async def watch_stream(
+        resource: str, namespace: Optional[str], since: int, timeout_seconds: float
+    ) -> AsyncIterator[str]:
+        backlog, queue = cluster.subscribe(resource, since)
+        try:
+            if backlog is None:
+                gone = {"kind": "Status", "code": 410, "message": "too old resource version"}
+                yield json.dumps({"type": "ERROR", "object": gone}) + "\n"
+                return
+            for change in backlog:
+                queue.put_nowait(change)
+            deadline = time.monotonic() + timeout_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    version, event_type, obj = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    return
+                if version <= since:
+                    continue
+                if namespace is not None and obj["metadata"].get("namespace") != namespace:
+                    continue
+                yield json.dumps({"type": event_type, "object": obj}) + "\n"
+        finally:
+            cluster.unsubscribe(resource, queue)
+
+    async def serve(request: Request, resource: str, namespace: Optional[str] = None) -> Any:
+        if resource not in RESOURCE_PATHS:
+            raise HTTPException(status_code=404, detail=f"unknown resource {resource}")
+        params = request.query_params
+        if params.get("watch") in ("1", "true"):
+            cluster.requests[f"watch:{resource}"] += 1
+            return StreamingResponse(
+                watch_stream(
+                    resource,
+                    namespace,
+                    int(params.get("resourceVersion") or 0),
+                    float(params.get("timeoutSeconds") or 300),
+                ),
+                media_type="application/json",
+            )
+        cluster.requests[f"list:{resource}"] += 1
+        return JSONResponse(cluster.list(resource, namespace))
+
+    @app.get("/api/v1/{resource}")
+    async def core_list(request: Request, resource: str) -> Any:
+        return await serve(request, resource)
+
+    @app.get("/api/v1/namespaces/{namespace}/{resource}")
+    async def core_namespaced(request: Request, namespace: str, resource: str) -> Any:
+        return await serve(request, resource, namespace)
+
+    @app.get("/apis/apps/v1/{resource}")
+    async def apps_list(request: Request, resource: str) -> Any:
+        return await serve(request, resource)
+
+    @app.get("/apis/apps/v1/namespaces/{namespace}/{resource}")
+    async def apps_namespaced(request: Request, namespace: str, resource: str) -> Any:
+        return await serve(request, resource, namespace)
+
+    return app
+
+
+class FakeK8sServer(FakeLLMServer):
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
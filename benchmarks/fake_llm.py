@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_fake_llm_app(
+    latency_seconds: float = 0.05,
+    reply: str = "fake completion",
+    token_interval_seconds: float = 0.0,
+    fail_status: Optional[int] = None,
+    reply_for: Optional[Callable[[Dict[str, Any]], str]] = None,
+) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.latency_seconds = latency_seconds
+    app.state.fail_status = fail_status
+
+    async def stream_tokens(model: str, text: str) -> AsyncIterator[str]:
+        await asyncio.sleep(app.state.latency_seconds)
+        tokens = text.split(" ")
+        for index, token in enumerate(tokens):
+            delta = token if index == 0 else f" {token}"
+            chunk = {
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if token_interval_seconds:
+                await asyncio.sleep(token_interval_seconds)
+        usage = {"completion_tokens": len(tokens)}
+        yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.get("/v1/models", response_model=None)
+    async def models() -> Dict[str, Any] | JSONResponse:
+        if app.state.fail_status:
+            return JSONResponse({"error": "unavailable"}, status_code=app.state.fail_status)
+        return {"object": "list", "data": [{"id": "fake", "object": "model"}]}
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(
+        payload: Dict[str, Any],
+    ) -> Dict[str, Any] | StreamingResponse | JSONResponse:
+        app.state.requests += 1
+        if app.state.fail_status:
+            return JSONResponse({"error": "unavailable"}, status_code=app.state.fail_status)
+        model = payload.get("model", "fake")
+        text = reply_for(payload) if reply_for is not None else reply
+        if payload.get("stream"):
+            return StreamingResponse(stream_tokens(model, text), media_type="text/event-stream")
+        await asyncio.sleep(app.state.latency_seconds)
+        return {
+            "id": f"fake-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeLLMServer:
+    def __init__(self, app: FastAPI, port: int | None = None) -> None:
+        self.app = app
+        self.port = port or _free_port()
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self) -> "FakeLLMServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake LLM server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
@@ -0,0 +1,207 @@
+"""Compare kubectl subprocess diagnostics with the watch-based state cache.
+
+Run with ``python -m benchmarks.k8s_cache``. A fake API server serves list and
+watch responses for a generated cluster, and ``kubectl`` on PATH is replaced by
+``benchmarks.kubectl_stub`` (a Python process that lists from the same server),
+so the subprocess numbers include interpreter startup rather than the real
+kubectl binary. The report also covers the cache's initial sync and how long a
+watched change takes to become visible.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agent.k8s import ClusterStateCache
+from agent.models import ToolResult
+from agent.tools import DiagnosticCommand, run_commands
+from benchmarks.fake_k8s import (
+    FakeCluster,
+    FakeK8sServer,
+    create_fake_k8s_app,
+    make_deployment,
+    make_event,
+    make_pod,
+)
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+AGE = re.compile(r"\b\d+[smhdy](?:\d+[smh])?\b")
+
+
+def _populate(cluster: FakeCluster, namespaces: int, pods_per_namespace: int) -> None:
+    for index in range(namespaces):
+        namespace = f"ns-{index:03d}"
+        apps = max(1, pods_per_namespace // 5)
+        for app in range(apps):
+            cluster.apply("deployments", make_deployment(namespace, f"svc-{app}", replicas=5))
+        for pod in range(pods_per_namespace):
+            app = pod % apps
+            crashing = pod % 97 == 0
+            cluster.apply(
+                "pods",
+                make_pod(
+                    namespace,
+                    f"svc-{app}-{pod:05d}",
+                    ready=not crashing,
+                    restarts=12 if crashing else 0,
+                    waiting_reason="CrashLoopBackOff" if crashing else None,
+                    labels={"app": f"svc-{app}"},
+                ),
+            )
+            if crashing:
+                cluster.apply(
+                    "events",
+                    make_event(
+                        namespace,
+                        f"svc-{app}-{pod:05d}.backoff",
+                        f"svc-{app}-{pod:05d}",
+                        "BackOff",
+                        "Back-off restarting failed container app",
+                    ),
+                )
+
+
+def _install_stub(directory: Path) -> None:
+    stub = directory / "kubectl"
+    stub.write_text(
+        f"#!/bin/sh\nPYTHONPATH={REPO_ROOT} exec {sys.executable} -m benchmarks.kubectl_stub \"$@\"\n"
+    )
+    stub.chmod(0o755)
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def _time_query(
+    argv: Sequence[str], iterations: int, cluster_state: Optional[ClusterStateCache]
+) -> Tuple[List[float], ToolResult]:
+    command = DiagnosticCommand("query", tuple(argv))
+    latencies: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = (
+            await run_commands([command], Path.cwd(), timeout=60, cluster_state=cluster_state)
+        )[0]
+        latencies.append(time.perf_counter() - started)
+        if result.exit_code != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed: {result.stderr}")
+    return latencies, result
+
+
+def _rows(stdout: str) -> List[str]:
+    return sorted(" ".join(AGE.sub("-", line).split()) for line in stdout.splitlines()[1:])
+
+
+async def _run(args: argparse.Namespace, cluster: FakeCluster, base_url: str) -> None:
+    queries: Dict[str, List[str]] = {
+        "pods -A": ["kubectl", "get", "pods", "-A"],
+        "pods in namespace": ["kubectl", "get", "pods", "--namespace=ns-001"],
+        "pods by selector": ["kubectl", "get", "pods", "--namespace=ns-001", "--selector=app=svc-1"],
+        "deployments in namespace": ["kubectl", "get", "deployments", "--namespace=ns-001"],
+        "warning events in namespace": [
+            "kubectl", "get", "events", "--namespace=ns-000", "--field-selector=type=Warning",
+        ],
+    }
+
+    cache = ClusterStateCache(base_url)
+    started = time.perf_counter()
+    cache.start()
+    if not await cache.wait_ready(60):
+        raise RuntimeError(f"cache did not sync: {cache.stats()}")
+    sync_seconds = time.perf_counter() - started
+
+    print("| Query | Rows | kubectl P50 / P95 (ms) | Watch cache P50 / P95 (ms) | Speedup (P50) | Same rows |")
+    print("|---|---:|---:|---:|---:|:---:|")
+    try:
+        for label, argv in queries.items():
+            subprocess_latencies, subprocess_result = await _time_query(
+                argv, args.iterations, None
+            )
+            cache_latencies, cache_result = await _time_query(argv, args.iterations, cache)
+            assert cache_result.source == "k8s_watch_cache", cache_result.source
+            same_rows = _rows(subprocess_result.stdout) == _rows(cache_result.stdout)
+            sub_p50 = statistics.median(subprocess_latencies) * 1000
+            cache_p50 = statistics.median(cache_latencies) * 1000
+            print(
+                f"| {label} | {cache_result.stdout_total_lines - 1} "
+                f"| {sub_p50:.1f} / {_percentile(subprocess_latencies, 0.95) * 1000:.1f} "
+                f"| {cache_p50:.3f} / {_percentile(cache_latencies, 0.95) * 1000:.3f} "
+                f"| {sub_p50 / cache_p50:.0f}x "
+                f"| {'yes' if same_rows else 'no'} |"
+            )
+
+        propagation: List[float] = []
+        pods = cache.resources["pods"]
+        apps = max(1, args.pods_per_namespace // 5)
+        for sample in range(args.propagation_samples):
+            pod = sample * apps % max(1, args.pods_per_namespace)
+            namespace, name = "ns-002", f"svc-0-{pod:05d}"
+            restarts = 100 + sample
+            published = time.perf_counter()
+            cluster.apply(
+                "pods",
+                make_pod(
+                    namespace,
+                    name,
+                    ready=False,
+                    restarts=restarts,
+                    waiting_reason="CrashLoopBackOff",
+                    labels={"app": "svc-0"},
+                ),
+            )
+            while pods.rows.get((namespace, name), {}).get("columns", {}).get("RESTARTS") != str(
+                restarts
+            ):
+                if time.perf_counter() - published > 10:
+                    raise RuntimeError("watch update did not arrive")
+                await asyncio.sleep(0.0005)
+            propagation.append(time.perf_counter() - published)
+    finally:
+        stats = cache.stats()
+        await cache.stop()
+
+    objects = {name: item["objects"] for name, item in stats["resources"].items()}
+    print()
+    print("| Metric | Value |")
+    print("|---|---:|")
+    print(f"| Objects cached | {objects} |")
+    print(f"| Initial list + sync (s) | {sync_seconds:.3f} |")
+    print(
+        f"| Watch propagation P50 / P95 (ms) | {statistics.median(propagation) * 1000:.2f} / "
+        f"{_percentile(propagation, 0.95) * 1000:.2f} |"
+    )
+    print(f"| Queries served / fallbacks | {stats['served']} / {stats['fallbacks']} |")
+    print(f"| API list / watch requests | {dict(cluster.requests)} |")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--namespaces", type=int, default=20)
+    parser.add_argument("--pods-per-namespace", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20, help="runs per query and path")
+    parser.add_argument("--propagation-samples", type=int, default=20)
+    args = parser.parse_args()
+
+    cluster = FakeCluster()
+    _populate(cluster, args.namespaces, args.pods_per_namespace)
+    with FakeK8sServer(create_fake_k8s_app(cluster)) as server, tempfile.TemporaryDirectory() as tmp:
+        _install_stub(Path(tmp))
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{os.environ.get('PATH', '')}"
+        os.environ["FAKE_K8S_API_URL"] = server.base_url
+        asyncio.run(_run(args, cluster, server.base_url))
+
+
+if __name__ == "__main__":
+    main()
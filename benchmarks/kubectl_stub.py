@@ -0,0 +1,42 @@
+"""Minimal ``kubectl`` stand-in used by ``benchmarks.k8s_cache``.
+
+Each invocation is a fresh process that lists the resource from the API server
+named by ``FAKE_K8S_API_URL`` and prints the same table the watch cache renders,
+so the subprocess path pays for process startup and a full list like kubectl.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import urllib.request
+from typing import List
+
+from agent.k8s import RESOURCE_PATHS, ROW_BUILDERS, parse_get_command, render_rows
+
+
+def main(argv: List[str]) -> int:
+    if argv[:2] == ["config", "current-context"]:
+        print("fake-cluster")
+        return 0
+    query = parse_get_command(["kubectl", *argv])
+    if query is None:
+        print(f"unsupported: kubectl {' '.join(argv)}", file=sys.stderr)
+        return 1
+    prefix, plural = RESOURCE_PATHS[query.resource]
+    path = f"{prefix}/namespaces/{query.namespace}/{plural}" if query.namespace else f"{prefix}/{plural}"
+    with urllib.request.urlopen(os.environ["FAKE_K8S_API_URL"] + path, timeout=30) as response:
+        payload = json.load(response)
+    build = ROW_BUILDERS[query.resource]
+    rendered = render_rows(query, [build(item) for item in payload.get("items") or []])
+    if rendered is None:
+        print("unsupported selector", file=sys.stderr)
+        return 1
+    sys.stdout.write(rendered[0])
+    sys.stderr.write(rendered[1])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
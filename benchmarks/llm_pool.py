@@ -0,0 +1,94 @@
+"""Compare a per-call httpx client against the pooled OllamaClient.
+
+Run with ``python -m benchmarks.llm_pool``. Uses a local fake
+chat-completions server, so no model runtime is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from agent.llm import OllamaClient
+from benchmarks.fake_llm import FakeLLMServer, create_fake_llm_app
+
+
+async def _per_call_client(base_url: str, users: int, requests_per_user: int) -> Dict[str, Any]:
+    connections = 0
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        nonlocal connections
+        if event_name == "connection.connect_tcp.complete":
+            connections += 1
+
+    async def user() -> None:
+        for _ in range(requests_per_user):
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.post(
+                    f"{base_url}/chat/completions",
+                    json={"model": "fake", "messages": [], "temperature": 0.2},
+                    extensions={"trace": trace},
+                )
+                response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return {"elapsed": time.perf_counter() - started, "connections": connections}
+
+
+async def _pooled_client(base_url: str, users: int, requests_per_user: int) -> Dict[str, Any]:
+    client = OllamaClient(
+        base_url=base_url,
+        model="fake",
+        timeout_seconds=30,
+        max_connections=users,
+        max_keepalive_connections=users,
+        max_concurrency=users,
+    )
+    await client.start()
+
+    async def user() -> None:
+        for _ in range(requests_per_user):
+            await client.chat("system", "user")
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(user() for _ in range(users)))
+    finally:
+        await client.aclose()
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "connections": client.stats()["pool"]["connections_opened"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", default="10,50", help="comma-separated concurrent users")
+    parser.add_argument("--requests-per-user", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake model latency (s)")
+    args = parser.parse_args()
+
+    levels: List[int] = [int(level) for level in args.levels.split(",") if level]
+    rows = []
+    with FakeLLMServer(create_fake_llm_app(latency_seconds=args.latency)) as server:
+        for users in levels:
+            total = users * args.requests_per_user
+            per_call = asyncio.run(_per_call_client(server.base_url, users, args.requests_per_user))
+            pooled = asyncio.run(_pooled_client(server.base_url, users, args.requests_per_user))
+            rows.append((users, total, per_call, pooled))
+
+    print("| Concurrency | Requests | Mode | Connections Opened | Wall Time (s) | Req/s |")
+    print("|---:|---:|---|---:|---:|---:|")
+    for users, total, per_call, pooled in rows:
+        for mode, result in (("per-call client", per_call), ("pooled client", pooled)):
+            print(
+                f"| {users} | {total} | {mode} | {result['connections']} | "
+                f"{result['elapsed']:.3f} | {total / result['elapsed']:.1f} |"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Run the C1/C2/C3 load profiles from docs/ai-self-hosted-benchmark.md offline.
+
+Run with ``python -m benchmarks.load``. Starts a fake chat-completions server
+and the agent API in-process, replaces ``git``, ``kubectl`` and ``helm`` with
+stub scripts that sleep and print canned output, then drives streaming session
+messages and jobs at each concurrency level. Results are printed (or written
+with ``--output``) as Markdown tables in the benchmark template's format.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import stat
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from benchmarks.fake_llm import FakeLLMServer, create_fake_llm_app
+
+
+STUB_OUTPUTS: Dict[str, str] = {
+    "git": (
+        'case "$1" in\n'
+        '  status) echo " M app/config.yaml" ;;\n'
+        "  branch) echo main ;;\n"
+        '  log) echo "abc1234 Bump chart version" ;;\n'
+        "esac\n"
+    ),
+    "kubectl": (
+        'case "$1" in\n'
+        "  config) echo bench-cluster ;;\n"
+        "  *)\n"
+        '    echo "NAMESPACE   NAME                   READY   STATUS             RESTARTS   AGE"\n'
+        '    echo "payments    api-7d9c5b8f6d-x2k4p   0/1     CrashLoopBackOff   12         41m"\n'
+        '    echo "payments    worker-5f6d7c9b8-q8r7t 1/1     Running            0          3d"\n'
+        "    ;;\n"
+        "esac\n"
+    ),
+    "helm": (
+        'echo "NAME      NAMESPACE  REVISION  STATUS    CHART          APP VERSION"\n'
+        'echo "payments  payments   42        deployed  payments-1.8.0 1.8.0"\n'
+    ),
+}
+
+SESSION_MESSAGE = "Pods in payments are crash looping since the last release, what should I check?"
+JOB_GOAL = "Investigate CrashLoopBackOff for payments api in stage"
+
+
+@dataclass
+class ProfileResult:
+    users: int
+    session_latencies: List[float] = field(default_factory=list)
+    session_ttft: List[float] = field(default_factory=list)
+    tokens_per_second: List[float] = field(default_factory=list)
+    job_latencies: List[float] = field(default_factory=list)
+    job_ttft: List[float] = field(default_factory=list)
+    timeouts: int = 0
+    errors: int = 0
+    attempts: int = 0
+    elapsed: float = 0.0
+
+
+def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def _fmt(value: Optional[float], digits: int = 3) -> str:
+    return "n/a" if value is None else f"{value:.{digits}f}"
+
+
+def _write_stubs(bin_dir: Path, delay: float) -> None:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name, body in STUB_OUTPUTS.items():
+        path = bin_dir / name
+        path.write_text(f"#!/bin/sh\nsleep {delay}\n{body}", encoding="utf-8")
+        path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+async def _session_turn(client: httpx.AsyncClient, result: ProfileResult) -> None:
+    session = (await client.post("/agent/sessions", json={"user_id": "bench"})).json()
+    started = time.perf_counter()
+    first_token: Optional[float] = None
+    done: Optional[Dict[str, Any]] = None
+    async with client.stream(
+        "POST",
+        f"/agent/sessions/{session['session_id']}/messages/stream",
+        json={"message": SESSION_MESSAGE, "environment": "stage"},
+    ) as response:
+        response.raise_for_status()
+        event = ""
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                if event == "token" and first_token is None:
+                    first_token = time.perf_counter()
+                elif event == "done":
+                    done = json.loads(line[len("data:"):])
+    result.session_latencies.append(time.perf_counter() - started)
+    if first_token is not None:
+        result.session_ttft.append(first_token - started)
+    if done and done.get("tokens_per_second"):
+        result.tokens_per_second.append(done["tokens_per_second"])
+
+
+async def _job_run(client: httpx.AsyncClient, result: ProfileResult, timeout: float) -> None:
+    started = time.perf_counter()
+    job = (await client.post("/agent/jobs", json={"goal": JOB_GOAL, "environment": "stage"})).json()
+    since = 0
+    deadline = started + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise httpx.TimeoutException("job did not finish in time")
+        response = await client.get(
+            f"/agent/jobs/{job['job_id']}/events",
+            params={"since": since, "wait": min(remaining, 10.0)},
+        )
+        events = response.json()
+        if events:
+            since = events[-1]["seq"]
+        if any(event["event_type"] in ("job_done", "job_failed") for event in events):
+            break
+    result.job_latencies.append(time.perf_counter() - started)
+    report = (await client.get(f"/agent/jobs/{job['job_id']}/report")).json()
+    if report.get("time_to_first_token_seconds") is not None:
+        result.job_ttft.append(report["time_to_first_token_seconds"])
+
+
+async def _user(client: httpx.AsyncClient, result: ProfileResult, iterations: int, timeout: float) -> None:
+    for _ in range(iterations):
+        for step in (_session_turn(client, result), _job_run(client, result, timeout)):
+            result.attempts += 1
+            try:
+                await asyncio.wait_for(step, timeout=timeout)
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                result.timeouts += 1
+            except httpx.HTTPError:
+                result.errors += 1
+
+
+async def _run_profile(base_url: str, users: int, iterations: int, timeout: float) -> ProfileResult:
+    result = ProfileResult(users=users)
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_user(client, result, iterations, timeout) for _ in range(users)))
+        result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _render(results: List[ProfileResult], runtime: str, model: str) -> str:
+    lines = [
+        "### 4.2 Performance Results",
+        "| Runtime | Model | Concurrency | P50 Latency (s) | P95 Latency (s) | Tokens/s | Timeout Rate |",
+        "|---|---|---:|---:|---:|---:|---:|",
+    ]
+    for result in results:
+        tps = (
+            sum(result.tokens_per_second) / len(result.tokens_per_second)
+            if result.tokens_per_second
+            else None
+        )
+        timeout_rate = result.timeouts / result.attempts if result.attempts else 0.0
+        lines.append(
+            f"| {runtime} | {model} | {result.users} | "
+            f"{_fmt(_percentile(result.session_latencies, 0.5))} | "
+            f"{_fmt(_percentile(result.session_latencies, 0.95))} | "
+            f"{_fmt(tps, 1)} | {timeout_rate:.2%} |"
+        )
+    lines += [
+        "",
+        "### Time to First Token and Jobs",
+        "| Concurrency | Session TTFT P50 (s) | Session TTFT P95 (s) | Job P50 (s) | Job P95 (s) "
+        "| Job TTFT P95 (s) | Error Rate | Throughput (ops/s) |",
+        "|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for result in results:
+        error_rate = result.errors / result.attempts if result.attempts else 0.0
+        completed = len(result.session_latencies) + len(result.job_latencies)
+        lines.append(
+            f"| {result.users} | {_fmt(_percentile(result.session_ttft, 0.5))} | "
+            f"{_fmt(_percentile(result.session_ttft, 0.95))} | "
+            f"{_fmt(_percentile(result.job_latencies, 0.5))} | "
+            f"{_fmt(_percentile(result.job_latencies, 0.95))} | "
+            f"{_fmt(_percentile(result.job_ttft, 0.95))} | {error_rate:.2%} | "
+            f"{completed / result.elapsed:.1f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", default="1,10,50", help="C1,C2,C3 concurrent users")
+    parser.add_argument("--iterations", type=int, default=3, help="session+job rounds per user")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency (s)")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="seconds per token")
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--command-delay", type=float, default=0.05, help="stub command sleep (s)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-operation timeout (s)")
+    parser.add_argument("--output", type=Path, help="write the Markdown tables to this file")
+    args = parser.parse_args()
+
+    reply = " ".join(f"token{index}" for index in range(args.reply_tokens))
+    fake_app = create_fake_llm_app(
+        latency_seconds=args.latency, reply=reply, token_interval_seconds=args.token_interval
+    )
+    with tempfile.TemporaryDirectory() as tmp, FakeLLMServer(fake_app) as llm_server:
+        workdir = Path(tmp)
+        _write_stubs(workdir / "bin", args.command_delay)
+        os.environ["PATH"] = f"{workdir / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"
+        os.environ.update(
+            {
+                "OLLAMA_BASE_URL": llm_server.base_url,
+                "OLLAMA_MODEL": "fake",
+                "AGENT_REPO_ROOT": str(workdir),
+                "AGENT_STORE_BACKEND": os.environ.get("AGENT_STORE_BACKEND", "memory"),
+                "AGENT_STORE_PATH": str(workdir / "agent.sqlite3"),
+                "LLM_HEALTH_CHECK_INTERVAL_SECONDS": "0",
+                "AGENT_POLICY_RELOAD_INTERVAL_SECONDS": "0",
+            }
+        )
+        from agent.api import create_app
+
+        with FakeLLMServer(create_app()) as agent_server:
+            base_url = f"http://127.0.0.1:{agent_server.port}"
+            results = [
+                asyncio.run(_run_profile(base_url, int(users), args.iterations, args.timeout))
+                for users in args.levels.split(",")
+                if users
+            ]
+
+    output = _render(results, runtime="fake (offline)", model="fake")
+    if args.output is not None:
+        args.output.write_text(output, encoding="utf-8")
+    print(output, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure command authorization throughput against large tool-control lists.
+
+Run with ``python -m benchmarks.policy_authorize``. Compares the compiled
+matcher behind ``PolicyEngine.authorize`` with a naive ``fnmatch`` scan over
+every allow and deny glob.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from agent.policy import PolicyEngine
+
+
+TOOLS = ("kubectl", "helm", "git", "make", "curl", "terraform", "aws", "gcloud", "docker", "rg")
+VERBS = ("get", "describe", "logs", "list", "status", "diff", "show", "apply", "plan", "history")
+
+
+def _policy(patterns: int, rng: random.Random) -> Dict[str, Any]:
+    allow = [f"{rng.choice(TOOLS)} {rng.choice(VERBS)}-{index} *" for index in range(patterns)]
+    deny = [f"{rng.choice(TOOLS)} delete-{index}*" for index in range(max(1, patterns // 5))]
+    return {"tool_controls": {"allowlist": allow, "denylist": deny}}
+
+
+def _commands(policy: Dict[str, Any], count: int, rng: random.Random) -> List[str]:
+    allow = policy["tool_controls"]["allowlist"]
+    commands = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            commands.append(rng.choice(allow).replace("*", "--namespace payments -o wide"))
+        elif roll < 0.8:
+            commands.append(f"{rng.choice(TOOLS)} delete-{rng.randrange(50)} thing")
+        else:
+            commands.append(f"{rng.choice(TOOLS)} unknown-{rng.randrange(1000)}")
+    return commands
+
+
+def _naive(policy: Dict[str, Any]) -> Callable[[str], bool]:
+    allow = policy["tool_controls"]["allowlist"]
+    deny = policy["tool_controls"]["denylist"]
+
+    def authorize(command: str) -> bool:
+        if any(fnmatch.fnmatchcase(command, pattern) for pattern in deny):
+            return False
+        return any(fnmatch.fnmatchcase(command, pattern) for pattern in allow)
+
+    return authorize
+
+
+def _rate(func: Callable[[str], Any], commands: List[str]) -> float:
+    started = time.perf_counter()
+    for command in commands:
+        func(command)
+    return len(commands) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patterns", default="50,200,500,1000")
+    parser.add_argument("--commands", type=int, default=20000)
+    args = parser.parse_args()
+
+    print("| Allow patterns | Deny patterns | Compile (ms) | Compiled checks/s | fnmatch scan checks/s |")
+    print("|---:|---:|---:|---:|---:|")
+    for count in (int(value) for value in args.patterns.split(",")):
+        rng = random.Random(count)
+        policy = _policy(count, rng)
+        commands = _commands(policy, args.commands, rng)
+        started = time.perf_counter()
+        engine = PolicyEngine(policy)
+        compile_ms = (time.perf_counter() - started) * 1000
+        compiled_rate = _rate(engine.authorize, commands)
+        naive_rate = _rate(_naive(policy), commands)
+        print(
+            f"| {count} | {len(policy['tool_controls']['denylist'])} | {compile_ms:.1f} | "
+            f"{compiled_rate:,.0f} | {naive_rate:,.0f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Measure job report polling: full reports, revalidation and paged output.
+
+Run with ``python -m benchmarks.report_fetch``. Jobs with generated
+``kubectl``-style diagnostics are written straight into each store backend and
+fetched through the API in-process, so the numbers cover routing, store reads
+and response serialization but not the network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+
+from agent.api import create_app
+from agent.config import get_settings
+from agent.store import Store, _split_outputs
+from benchmarks.store_throughput import _report
+
+
+def _timed(request: Callable[[], object], iterations: int) -> Tuple[float, object]:
+    latencies: List[float] = []
+    response = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = request()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000, response
+
+
+def _stored_bytes(report: Dict[str, object], min_bytes: int) -> Tuple[int, int]:
+    _, outputs = _split_outputs(report, min_bytes)
+    raw = sum(len(item["stdout"].encode("utf-8")) for item in report["diagnostics"])  # type: ignore[index]
+    return raw, sum(len(blob) for blob in outputs.values())
+
+
+def _run(name: str, backend: str, store_path: Path, args: argparse.Namespace) -> None:
+    settings = replace(get_settings(), store_backend=backend, store_path=store_path)
+    app = create_app(settings)
+    with TestClient(app) as client:
+        store: Store = app.state.runtime.store
+        job = store.create_job(
+            {
+                "status": "done",
+                "risk_level": "R0",
+                "environment": "dev",
+                "goal": "benchmark",
+                "required_approvals": 0,
+            }
+        )
+        report = _report(job.job_id, args.stdout_bytes)
+        store.set_job_report(job.job_id, report)
+        url = f"/agent/jobs/{job.job_id}/report"
+        etag = client.get(url).headers["ETag"]
+
+        cases: Dict[str, Callable[[], object]] = {
+            "full report": lambda: client.get(url),
+            "full report, If-None-Match": lambda: client.get(url, headers={"If-None-Match": etag}),
+            "include_output=false": lambda: client.get(url, params={"include_output": "false"}),
+            "one tool, first 8 KiB": lambda: client.get(
+                f"{url}/diagnostics/0/output", params={"limit": 8192}
+            ),
+            "one tool, 50 lines": lambda: client.get(
+                f"{url}/diagnostics/0/output", params={"unit": "lines", "limit": 50}
+            ),
+        }
+        for label, request in cases.items():
+            p50, response = _timed(request, args.iterations)
+            print(
+                f"| {name} | {label} | {response.status_code} "  # type: ignore[attr-defined]
+                f"| {len(response.content):,} | {p50:.3f} |"  # type: ignore[attr-defined]
+            )
+
+    raw, compressed = _stored_bytes(report, settings.store_output_compress_min_bytes)
+    print(f"| {name} | stored tool output | | {raw:,} -> {compressed:,} | |")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stdout-bytes", type=int, default=64 * 1024, help="stdout per tool")
+    parser.add_argument("--iterations", type=int, default=200, help="requests per case")
+    args = parser.parse_args()
+
+    print("| Backend | Request | Status | Response bytes | P50 (ms) |")
+    print("|---|---|---:|---:|---:|")
+    with tempfile.TemporaryDirectory() as tmp:
+        _run("memory", "memory", Path(tmp) / "unused.sqlite3", args)
+        _run("sqlite (WAL)", "sqlite", Path(tmp) / "bench.sqlite3", args)
+
+
+if __name__ == "__main__":
+    main()
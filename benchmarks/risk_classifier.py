@@ -0,0 +1,85 @@
+"""Measure risk classification latency as the keyword list grows.
+
+Run with ``python -m benchmarks.risk_classifier``. Compares the Aho-Corasick
+``RiskClassifier`` with the previous ``keyword in text`` scan over synthetic
+ticket text.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+from typing import Callable, Dict, List, Sequence
+
+from agent.risk import DEFAULT_RISK_KEYWORDS, RiskClassifier
+
+
+def _keywords(count: int, rng: random.Random) -> Dict[str, List[str]]:
+    keywords: Dict[str, List[str]] = {
+        level: list(words) for level, words in DEFAULT_RISK_KEYWORDS.items()
+    }
+    levels = list(keywords)
+    for _ in range(count):
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))]
+        if rng.random() < 0.3:
+            words.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 7))))
+        keywords[rng.choice(levels)].append(" ".join(words))
+    return keywords
+
+
+def _tickets(count: int, rng: random.Random) -> List[str]:
+    filler = "the service returned errors after the rollout please investigate latency".split()
+    phrases = [word for words in DEFAULT_RISK_KEYWORDS.values() for word in words]
+    tickets = []
+    for _ in range(count):
+        words = rng.choices(filler, k=40)
+        words.insert(rng.randrange(len(words)), rng.choice(phrases))
+        tickets.append(" ".join(words))
+    return tickets
+
+
+def _naive(keywords: Dict[str, List[str]]) -> Callable[[str], str]:
+    ordered = sorted(keywords.items(), reverse=True)
+
+    def classify(text: str) -> str:
+        lowered = text.lower()
+        for level, words in ordered:
+            if any(word in lowered for word in words):
+                return level
+        return "R0"
+
+    return classify
+
+
+def _per_text_us(func: Callable[[str], object], texts: Sequence[str]) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        func(text)
+    return (time.perf_counter() - started) / len(texts) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keywords", default="15,100,1000,5000")
+    parser.add_argument("--texts", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = _tickets(args.texts, rng)
+    print("| Keywords | Build (ms) | Aho-Corasick (us/text) | Substring scan (us/text) |")
+    print("|---:|---:|---:|---:|")
+    for extra in (int(value) for value in args.keywords.split(",")):
+        keywords = _keywords(max(0, extra - 15), rng)
+        started = time.perf_counter()
+        classifier = RiskClassifier(keywords)
+        build_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"| {len(classifier)} | {build_ms:.1f} | {_per_text_us(classifier.classify, texts):.1f} | "
+            f"{_per_text_us(_naive(keywords), texts):.1f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
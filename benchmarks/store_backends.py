@@ -0,0 +1,84 @@
+"""Compare event-append and job-lookup throughput of the store backends.
+
+Run with ``python -m benchmarks.store_backends``. The SQLite store is
+created in a temporary directory and removed afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from agent.sqlite_store import SQLiteStore
+from agent.store import InMemoryStore, Store
+from benchmarks.store_throughput import _report
+
+
+def _timed(func: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def _run(name: str, store: Store, jobs: int, events: int, lookups: int, report_bytes: int) -> None:
+    job_ids: List[str] = []
+    for _ in range(jobs):
+        job = store.create_job(
+            {
+                "status": "queued",
+                "risk_level": "R0",
+                "environment": "dev",
+                "goal": "benchmark",
+                "required_approvals": 0,
+            }
+        )
+        store.set_job_report(job.job_id, _report(job.job_id, report_bytes))
+        job_ids.append(job.job_id)
+
+    rng = random.Random(0)
+    event_targets = [rng.choice(job_ids) for _ in range(events)]
+    lookup_targets = [rng.choice(job_ids) for _ in range(lookups)]
+
+    def append_events() -> None:
+        for job_id in event_targets:
+            store.add_job_event(job_id, "tick", "benchmark", {"n": 1})
+        flush = getattr(store, "flush_events", None)
+        if flush is not None:
+            flush()
+
+    append_seconds = _timed(append_events)
+    lookup_seconds = _timed(lambda: [store.get_job(job_id) for job_id in lookup_targets])
+    status_seconds = _timed(
+        lambda: [store.list_jobs(status="queued", limit=20) for _ in range(100)]
+    )
+    print(
+        f"| {name} | {events / append_seconds:,.0f} | {lookups / lookup_seconds:,.0f} | "
+        f"{100 / status_seconds:,.0f} |"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--report-bytes", type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    print("| Backend | Event appends/s | Job lookups/s | Status queries/s |")
+    print("|---|---:|---:|---:|")
+    _run("memory", InMemoryStore(), args.jobs, args.events, args.lookups, args.report_bytes)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(Path(tmp) / "bench.sqlite3")
+        try:
+            _run("sqlite (WAL)", store, args.jobs, args.events, args.lookups, args.report_bytes)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measure InMemoryStore get/update throughput with many jobs and large reports.
+
+Run with ``python -m benchmarks.store_throughput``. The ``deepcopy``
+rows reproduce the cost of the previous store, which copied the whole
+job record (report included) on every read and write.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from copy import deepcopy
+from typing import Any, Callable, Dict, List
+
+from agent.store import InMemoryStore
+
+
+def _report(job_id: str, stdout_bytes: int) -> Dict[str, Any]:
+    line = "default   api-7d9c-xyz   1/1   Running   0   3d\n"
+    stdout = line * max(1, stdout_bytes // len(line))
+    return {
+        "job_id": job_id,
+        "status": "done",
+        "risk_level": "R0",
+        "summary": "ok",
+        "diagnostics": [
+            {
+                "tool_name": f"tool_{index}",
+                "command": "kubectl get pods -A",
+                "exit_code": 0,
+                "stdout": stdout,
+                "stderr": "",
+                "started_at_utc": "",
+                "finished_at_utc": "",
+            }
+            for index in range(6)
+        ],
+        "approvals": [],
+        "updated_at": "",
+    }
+
+
+def _rate(label: str, operations: int, func: Callable[[], None]) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"| {label} | {operations} | {elapsed:.3f} | {operations / elapsed:,.0f} |")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--report-bytes", type=int, default=16 * 1024, help="stdout per tool")
+    parser.add_argument("--operations", type=int, default=20000)
+    args = parser.parse_args()
+
+    store = InMemoryStore()
+    job_ids: List[str] = []
+    legacy: Dict[str, Dict[str, Any]] = {}
+    for _ in range(args.jobs):
+        job = store.create_job(
+            {
+                "status": "queued",
+                "risk_level": "R0",
+                "environment": "dev",
+                "goal": "benchmark",
+                "required_approvals": 0,
+            }
+        )
+        report = _report(job.job_id, args.report_bytes)
+        store.set_job_report(job.job_id, report)
+        job_ids.append(job.job_id)
+        legacy[job.job_id] = {"job_id": job.job_id, "status": "done", "report": report}
+
+    rng = random.Random(0)
+    picks = [rng.choice(job_ids) for _ in range(args.operations)]
+    legacy_ops = max(1, args.operations // 20)
+
+    print("| Operation | Ops | Wall Time (s) | Ops/s |")
+    print("|---|---:|---:|---:|")
+    _rate("get_job", args.operations, lambda: [store.get_job(job_id) for job_id in picks])
+    _rate(
+        "set_job_status",
+        args.operations,
+        lambda: [store.set_job_status(job_id, "running") for job_id in picks],
+    )
+    _rate(
+        "add_job_event",
+        args.operations,
+        lambda: [store.add_job_event(job_id, "tick", "benchmark") for job_id in picks],
+    )
+    _rate(
+        "deepcopy get (previous store)",
+        legacy_ops,
+        lambda: [deepcopy(legacy[job_id]) for job_id in picks[:legacy_ops]],
+    )
+
+
+if __name__ == "__main__":
+    main()
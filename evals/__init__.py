@@ -0,0 +1 @@
+"""Offline eval replay for docs/ai-agent-eval-suite.md."""
@@ -0,0 +1,70 @@
+"""Check that a policy reload stops cached diagnostics from being served.
+
+Run with ``python -m evals.policy_reload``. A read-only command is run through
+``run_commands`` with a ``DiagnosticsCache`` so its result is cached, the policy
+file is rewritten to deny it and hot-reloaded, and the next run must return the
+exit 126 denial instead of the cached output. Exits non-zero otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+from agent.cache import DiagnosticsCache
+from agent.policy import PolicyEngine
+from agent.tools import DiagnosticCommand, run_commands
+
+
+COMMAND = DiagnosticCommand("echo_cached", ("echo", "cached"), cache_ttl=300.0)
+
+
+def _write_policy(path: Path, data: Dict[str, Any]) -> None:
+    path.write_text(yaml.safe_dump(data), encoding="utf-8")
+
+
+async def _run(policy_path: Path) -> List[Tuple[str, int, int]]:
+    _write_policy(policy_path, {"tool_controls": {"allowlist": ["echo *"]}})
+    policy = PolicyEngine.from_file(policy_path)
+    cache = DiagnosticsCache()
+    steps: List[Tuple[str, int, int]] = []
+
+    for label in ("allowed, cold", "allowed, cached"):
+        (result,) = await run_commands([COMMAND], policy_path.parent, cache=cache, policy=policy)
+        steps.append((label, 0, result.exit_code))
+
+    _write_policy(
+        policy_path,
+        {"tool_controls": {"allowlist": ["echo *"], "denylist": ["echo cached*"]}},
+    )
+    if not policy.reload_if_changed():
+        raise RuntimeError(f"policy reload failed: {policy.stats()}")
+    (result,) = await run_commands([COMMAND], policy_path.parent, cache=cache, policy=policy)
+    steps.append(("denied after reload", 126, result.exit_code))
+    return steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        steps = asyncio.run(_run(Path(tmp) / "policy.yaml"))
+    failures = 0
+    print("| Step | Expected exit | Exit | Outcome |")
+    print("|---|---:|---:|---|")
+    for label, expected, exit_code in steps:
+        ok = exit_code == expected
+        failures += not ok
+        print(f"| {label} | {expected} | {exit_code} | {'pass' if ok else 'FAIL'} |")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
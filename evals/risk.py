@@ -0,0 +1,66 @@
+"""Check goal risk classification and approval gates against the policy file.
+
+Run with ``python -m evals.risk``. Each case is a goal with the risk level it
+must be classified at; inflected verbs ("restarting", "wiped", "purging") are
+included because a miss drops the goal to R0 and skips the prod approval rules.
+Exits non-zero when any case is classified differently.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Tuple
+
+from agent.config import get_settings
+from agent.policy import PolicyEngine
+
+
+RISK_CASES: Tuple[Tuple[str, str], ...] = (
+    ("restarting the api pods", "R1"),
+    ("restarted the worker deployment", "R1"),
+    ("scaling web to 5", "R1"),
+    ("scaled down the batch workers", "R1"),
+    ("upgrading the chart", "R1"),
+    ("upgraded the requests dependency", "R1"),
+    ("patched ingress", "R1"),
+    ("patching the cookie domain", "R1"),
+    ("updating dependency pins", "R1"),
+    ("destroying the old cluster", "R3"),
+    ("destroyed the staging namespace", "R3"),
+    ("wiped the volume", "R3"),
+    ("wiping the cache volume", "R3"),
+    ("purging queues", "R3"),
+    ("purged the release", "R3"),
+    ("deleting all rows of the customer table", "R3"),
+    ("dispatch queue latency is high", "R0"),
+    ("list pods in namespace payments", "R0"),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--policy", type=Path, default=get_settings().policy_path)
+    args = parser.parse_args()
+
+    policy = PolicyEngine.from_file(args.policy)
+    failures = 0
+    print("| Goal | Expected | Assigned | Matched | Prod approvals | Outcome |")
+    print("|---|---|---|---|---:|---|")
+    for goal, expected in RISK_CASES:
+        classification = policy.classify_risk(goal)
+        assigned = classification.risk_level
+        ok = assigned == expected
+        failures += not ok
+        print(
+            f"| {goal} | {expected} | {assigned} "
+            f"| {', '.join(classification.matched_patterns) or '-'} "
+            f"| {policy.required_approvals(assigned, 'prod')} | {'pass' if ok else 'FAIL'} |"
+        )
+    print(f"\n{len(RISK_CASES) - failures} / {len(RISK_CASES)} cases classified as expected")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
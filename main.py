@@ -1,4 +1,7 @@
-from agent.api import app
+from agent.api import create_app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":